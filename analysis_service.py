@@ -0,0 +1,183 @@
+"""
+Week analysis shared by the HTML (/analyze) and JSON (/api/v1) routes of app.py.
+
+Runs main_pipeline.run_app_review_analysis for one week of an uploaded file
+or of the memory-mapped corpus, with the app profile WEB_APP_ID from
+APPS_CONFIG (Groww defaults if either is missing), and keeps the last few
+results per worker process so repeated requests for the same file and week
+(paging through reviews, polling stats) do not rerun the pipeline.
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from metrics import CACHE_REQUESTS
+
+# Analyses kept per process (each holds one week of tagged reviews)
+MAX_CACHED_ANALYSES = 16
+
+# App profile (tagging backend, sampling, pulse mode, theme legend) used for
+# uploads and the corpus
+APPS_CONFIG = os.environ.get(
+    "APPS_CONFIG", os.path.join(os.path.dirname(os.path.abspath(__file__)), "apps.json")
+)
+WEB_APP_ID = os.environ.get("WEB_APP_ID", "groww")
+
+_cache = OrderedDict()
+_weeks_cache = {}
+_cache_lock = threading.Lock()
+
+def dataset_version(filepath):
+    """
+    Cheap version string for a file: changes whenever the file is replaced.
+    """
+    stat = os.stat(filepath)
+    return f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+
+def web_profile():
+    """
+    App profile for the web routes: WEB_APP_ID's entry in APPS_CONFIG, or the
+    Groww defaults when the config or the entry is missing. The config is
+    only re-read when the file changes.
+    """
+    from app_profiles import get_app_profile, make_profile
+
+    return get_app_profile(WEB_APP_ID, APPS_CONFIG) or make_profile()
+
+def _corpus_hook(corpus, target_week):
+    """
+    node_hook that feeds the pipeline one week of the corpus.
+
+    The corpus holds cleaned, week-sorted reviews, so upload_reviews returns
+    the zero-copy week slice (only this week is materialized) and cleaning
+    and week filtering pass it through.
+    """
+    def hook(name, fn, *args, **kwargs):
+        if name == "upload_reviews":
+            return corpus.week(target_week)
+        if name in ("clean_and_bucket", "filter_target_week"):
+            return args[0]
+        return fn(*args, **kwargs)
+    return hook
+
+def run_week_analysis(filepath, target_week, use_corpus=False, refresh=False):
+    """
+    Analyze one week of reviews.
+
+    Args:
+        filepath (str): Uploaded CSV / JSON lines file, or the .arrow corpus
+        target_week (str): Week start date "YYYY-MM-DD"
+        use_corpus (bool): filepath is a memory-mapped corpus (nodes/review_corpus.py)
+        refresh (bool): Rerun the pipeline even if the result is cached
+            (e.g. to profile it)
+
+    Returns:
+        dict: total_reviews, week_reviews, reviews_week_tagged,
+        tagging_stats, themes_week_stats, weekly_note_and_email and
+        parsed_email
+    """
+    # The web routes analyze one week at a time
+    profile = dict(web_profile(), granularity="week")
+    key = (os.path.abspath(filepath), dataset_version(filepath), target_week, use_corpus,
+           json.dumps(profile, sort_keys=True))
+    with _cache_lock:
+        if key in _cache and not refresh:
+            _cache.move_to_end(key)
+            CACHE_REQUESTS.inc(cache="analysis", result="hit")
+            return _cache[key]
+    CACHE_REQUESTS.inc(cache="analysis", result="miss")
+
+    from main_pipeline import run_app_review_analysis
+
+    node_hook = None
+    if use_corpus:
+        from nodes.review_corpus import open_corpus
+
+        corpus = open_corpus(filepath)
+        node_hook = _corpus_hook(corpus, target_week)
+
+    # Snapshots, summary rows and the search index belong to the weekly job;
+    # week_summary stores this result's summary rows under the dataset key
+    results = run_app_review_analysis(
+        filepath, target_week, None, profile, snapshot_dir=None,
+        summary_db=None, search_db=None, node_hook=node_hook,
+        ingest_source="corpus" if use_corpus else "upload",
+    )
+
+    result = {
+        "total_reviews": corpus.num_rows if use_corpus else len(results["reviews_raw"]),
+        "week_reviews": len(results["reviews_week"]),
+        "reviews_week_tagged": results["reviews_week_tagged"],
+        "tagging_stats": results["tagging_stats"],
+        "themes_week_stats": results["themes_week_stats"],
+        "weekly_note_and_email": results["weekly_note_and_email"],
+        "parsed_email": results["parsed_email"],
+    }
+    with _cache_lock:
+        _cache[key] = result
+        while len(_cache) > MAX_CACHED_ANALYSES:
+            _cache.popitem(last=False)
+    return result
+
+def list_weeks(filepath, use_corpus=False):
+    """
+    Week start dates present in a file, oldest first.
+    """
+    if use_corpus:
+        from nodes.review_corpus import open_corpus
+
+        return open_corpus(filepath).weeks
+
+    key = (os.path.abspath(filepath), dataset_version(filepath))
+    with _cache_lock:
+        if key in _weeks_cache:
+            CACHE_REQUESTS.inc(cache="weeks", result="hit")
+            return _weeks_cache[key]
+    CACHE_REQUESTS.inc(cache="weeks", result="miss")
+
+    from nodes.upload_reviews import upload_reviews
+    from nodes.clean_and_bucket import clean_and_bucket
+
+    reviews_clean = clean_and_bucket(upload_reviews(filepath))
+    weeks = sorted(str(w) for w in reviews_clean["week_start"].dropna().unique())
+    with _cache_lock:
+        _weeks_cache[key] = weeks
+    return weeks
+
+def week_summary(filepath, target_week, dataset, use_corpus=False, summary_db="summaries.db", refresh=False):
+    """
+    Precomputed summary rows for one week (nodes/summary_tables.py).
+
+    Rows are computed with run_week_analysis and stored the first time a
+    file version and week are requested; later requests, from any worker or
+    after a restart, read them straight from SQLite.
+
+    Args:
+        filepath (str): Uploaded file or the .arrow corpus
+        target_week (str): Week start date "YYYY-MM-DD"
+        dataset (str): Key the rows are stored under (upload id or "corpus")
+        use_corpus (bool): filepath is a memory-mapped corpus
+        summary_db (str): SQLite database file
+        refresh (bool): Recompute and store the rows even if they exist
+
+    Returns:
+        dict: Output of load_week_summary
+    """
+    from nodes.summary_tables import load_week_summary, save_week_summary
+
+    version = dataset_version(filepath)
+    summary = None if refresh else load_week_summary(dataset, target_week, version, summary_db)
+    if summary is not None:
+        CACHE_REQUESTS.inc(cache="summary", result="hit")
+        return summary
+    CACHE_REQUESTS.inc(cache="summary", result="miss")
+
+    analysis = run_week_analysis(filepath, target_week, use_corpus, refresh)
+    save_week_summary(
+        dataset, target_week, analysis["themes_week_stats"], analysis["reviews_week_tagged"],
+        analysis["parsed_email"], total_reviews=analysis["total_reviews"],
+        source_version=version, db_path=summary_db,
+    )
+    return load_week_summary(dataset, target_week, version, summary_db)
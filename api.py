@@ -0,0 +1,223 @@
+"""
+JSON API for programmatic access to the analyzer, registered by app.py under /api/v1.
+
+    POST /api/v1/datasets                               submit reviews (multipart "file"
+                                                        field, or a text/csv or
+                                                        application/x-ndjson body)
+    GET  /api/v1/datasets/<id>/weeks                    weeks present in a dataset
+    GET  /api/v1/datasets/<id>/weeks/<week>/stats       theme stats
+    GET  /api/v1/datasets/<id>/weeks/<week>/reviews     tagged reviews (?page, ?per_page,
+                                                        ?theme, ?sentiment)
+    GET  /api/v1/datasets/<id>/weeks/<week>/note        weekly note and email draft
+
+The dataset id "corpus" refers to the memory-mapped standard corpus. GET
+responses carry an ETag derived from the dataset version and the request,
+so a poll with If-None-Match gets a 304 without rerunning the analysis.
+"""
+
+import hashlib
+import json
+import os
+import re
+
+from flask import Blueprint, current_app, jsonify, request
+from werkzeug.exceptions import HTTPException
+
+from analysis_service import dataset_version
+from upload_store import UploadRejected, store_stream
+
+api = Blueprint("api", __name__, url_prefix="/api/v1")
+
+CORPUS_DATASET_ID = "corpus"
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+REVIEW_FIELDS = ["review_id", "date", "rating", "source", "theme", "sentiment", "summary_1line", "full_text"]
+
+# Datasets are named by the SHA-256 of their content
+_DATASET_ID = re.compile(r"^[0-9a-f]{64}$")
+_WEEK = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+@api.errorhandler(ApiError)
+def handle_api_error(error):
+    return jsonify({"error": error.message}), error.status
+
+@api.errorhandler(HTTPException)
+def handle_http_error(error):
+    return jsonify({"error": error.description}), error.code
+
+@api.errorhandler(Exception)
+def handle_unexpected_error(error):
+    current_app.logger.exception("API request failed")
+    return jsonify({"error": f"Analysis failed: {error}"}), 500
+
+def _dataset_path(dataset_id):
+    """
+    Resolve a dataset id to (path, is_corpus), or raise a 404.
+    """
+    if dataset_id == CORPUS_DATASET_ID:
+        path = current_app.config["REVIEW_CORPUS"]
+        if not os.path.exists(path):
+            raise ApiError("Review corpus not found", 404)
+        return path, True
+
+    if _DATASET_ID.match(dataset_id):
+        for ext in (".csv", ".jsonl"):
+            path = os.path.join(current_app.config["UPLOAD_FOLDER"], f"{dataset_id}{ext}")
+            if os.path.exists(path):
+                return path, False
+    raise ApiError(f"Unknown dataset: {dataset_id}", 404)
+
+def _check_week(week):
+    if not _WEEK.match(week):
+        raise ApiError("Week must be YYYY-MM-DD")
+
+def _etag(path):
+    """
+    ETag for the current request against a dataset version.
+    """
+    key = f"{path}|{dataset_version(path)}|{request.full_path}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+def _conditional(path, build):
+    """
+    Return 304 if the client's ETag is current, otherwise build the JSON body.
+    """
+    etag = _etag(path)
+    if etag in request.if_none_match:
+        response = current_app.response_class(status=304)
+    else:
+        response = jsonify(build())
+    response.set_etag(etag)
+    # Cacheable, but clients must revalidate (cheaply) on every poll
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+def _records(df):
+    return json.loads(df.to_json(orient="records", date_format="iso"))
+
+@api.route("/datasets", methods=["POST"])
+def submit_dataset():
+    """
+    Store submitted reviews and return the new dataset id and its weeks.
+    """
+    try:
+        upload = request.files.get("file")
+        if upload is not None:
+            if not upload.filename.lower().endswith((".csv", ".jsonl")):
+                raise ApiError("Multipart uploads must be a .csv or .jsonl file")
+            stored = upload.stream.finish()
+        elif request.mimetype in ("application/x-ndjson", "application/jsonl", "application/json-lines"):
+            stored = store_stream(request.stream, current_app.config["UPLOAD_FOLDER"], ".jsonl",
+                                  current_app.config.get("MAX_CONTENT_LENGTH"))
+        elif request.mimetype == "text/csv":
+            stored = store_stream(request.stream, current_app.config["UPLOAD_FOLDER"], ".csv",
+                                  current_app.config.get("MAX_CONTENT_LENGTH"))
+        else:
+            raise ApiError("Send a multipart 'file' field, or a text/csv or application/x-ndjson body", 415)
+    except UploadRejected as e:
+        raise ApiError(e.message, e.status)
+
+    from analysis_service import list_weeks
+
+    try:
+        weeks = list_weeks(stored.path)
+    except (ValueError, KeyError) as e:
+        os.remove(stored.path)
+        raise ApiError(f"Invalid reviews file: {e}", 422)
+
+    response = jsonify({
+        "dataset_id": stored.dataset_id,
+        "bytes": stored.size,
+        "reused": stored.reused,
+        "weeks": weeks,
+    })
+    # An identical earlier upload is the same resource
+    response.status_code = 200 if stored.reused else 201
+    return response
+
+@api.route("/datasets/<dataset_id>/weeks")
+def dataset_weeks(dataset_id):
+    path, is_corpus = _dataset_path(dataset_id)
+
+    from analysis_service import list_weeks
+
+    return _conditional(path, lambda: {"dataset_id": dataset_id, "weeks": list_weeks(path, is_corpus)})
+
+def _analysis(dataset_id, week):
+    path, is_corpus = _dataset_path(dataset_id)
+    _check_week(week)
+
+    from analysis_service import run_week_analysis
+
+    return path, lambda: run_week_analysis(path, week, is_corpus)
+
+@api.route("/datasets/<dataset_id>/weeks/<week>/stats")
+def week_stats(dataset_id, week):
+    path, analysis = _analysis(dataset_id, week)
+
+    def build():
+        result = analysis()
+        return {
+            "dataset_id": dataset_id,
+            "week": week,
+            "total_reviews": result["total_reviews"],
+            "week_reviews": result["week_reviews"],
+            "themes": _records(result["themes_week_stats"]),
+        }
+
+    return _conditional(path, build)
+
+@api.route("/datasets/<dataset_id>/weeks/<week>/reviews")
+def week_reviews(dataset_id, week):
+    path, analysis = _analysis(dataset_id, week)
+    page = request.args.get("page", 1, type=int)
+    per_page = request.args.get("per_page", DEFAULT_PAGE_SIZE, type=int)
+    if page < 1 or not 1 <= per_page <= MAX_PAGE_SIZE:
+        raise ApiError(f"page must be >= 1 and per_page between 1 and {MAX_PAGE_SIZE}")
+    theme = request.args.get("theme")
+    sentiment = request.args.get("sentiment")
+
+    def build():
+        reviews = analysis()["reviews_week_tagged"]
+        if theme:
+            reviews = reviews[reviews["theme"] == theme]
+        if sentiment:
+            reviews = reviews[reviews["sentiment"] == sentiment.upper()]
+        start = (page - 1) * per_page
+        page_df = reviews.iloc[start:start + per_page]
+        fields = [c for c in REVIEW_FIELDS if c in page_df.columns]
+        return {
+            "dataset_id": dataset_id,
+            "week": week,
+            "page": page,
+            "per_page": per_page,
+            "total": len(reviews),
+            "pages": -(-len(reviews) // per_page),
+            "reviews": _records(page_df[fields]),
+        }
+
+    return _conditional(path, build)
+
+@api.route("/datasets/<dataset_id>/weeks/<week>/note")
+def week_note(dataset_id, week):
+    path, analysis = _analysis(dataset_id, week)
+
+    def build():
+        email = analysis()["parsed_email"].iloc[0]
+        return {
+            "dataset_id": dataset_id,
+            "week": week,
+            "weekly_note_md": email["weekly_note_md"],
+            "email_subject": email["email_subject"],
+            "email_body": email["email_body"],
+        }
+
+    return _conditional(path, build)
@@ -2,34 +2,107 @@
 Flask web application for the App Review Insights Analyzer
 """
 
-from flask import Flask, render_template, request, redirect, url_for, flash, send_file, jsonify
-import pandas as pd
+from flask import Flask, render_template, request, redirect, url_for, flash, send_file, jsonify, g
+import json
 import os
+import re
+import time
 from werkzeug.utils import secure_filename
-from nodes.upload_reviews import upload_reviews
-from nodes.clean_and_bucket import clean_and_bucket
-from nodes.filter_target_week import filter_target_week
-from nodes.llm_tag_theme_sentiment import llm_tag_theme_sentiment
-from nodes.theme_stats import theme_stats
-from nodes.llm_weekly_pulse import llm_weekly_pulse
-from nodes.parse_email_json import parse_email_json
 import subprocess
 import sys
 
+# pandas and the pipeline nodes are imported inside the routes that use them so
+# that gunicorn workers boot without paying for them up front.
+
+from upload_store import UploadRejected, UploadRequest
+from metrics import REQUEST_SECONDS, render as render_metrics
+
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
 
+# Uploaded files are streamed to disk, validated and stored by content hash
+# as they arrive (see upload_store.py)
+app.request_class = UploadRequest
+
 # Configuration
 UPLOAD_FOLDER = 'uploads'
 ALLOWED_EXTENSIONS = {'csv'}
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_UPLOAD_MB', 50)) * 1024 * 1024
 
 # Create upload folder if it doesn't exist
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
+# Memory-mapped corpus written by combine_reviews.py; shared read-only by all
+# workers via the page cache (see nodes/review_corpus.py)
+CORPUS_PATH = os.environ.get(
+    'REVIEW_CORPUS', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'all_reviews.arrow')
+)
+app.config['REVIEW_CORPUS'] = CORPUS_PATH
+
+# Precomputed weekly summary rows behind the results and showcase pages
+# (see nodes/summary_tables.py); shared with run_weekly_job / main_pipeline
+SUMMARY_DB = os.environ.get(
+    'SUMMARY_DB', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'summaries.db')
+)
+
+# Full-text search index over all ingested reviews (see nodes/review_search.py)
+SEARCH_DB = os.environ.get(
+    'SEARCH_DB', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'review_search.db')
+)
+
+# ?profile=1 (or an X-Profile header) on /analyze reruns the week under a
+# profiler (see profiling.py); off unless ALLOW_PROFILING=1
+ALLOW_PROFILING = os.environ.get('ALLOW_PROFILING') == '1'
+
+# JSON API (/api/v1) for dashboards and scripts
+from api import api as api_blueprint
+app.register_blueprint(api_blueprint)
+
 # Serve static files
 app.static_folder = 'static'
 
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_latency(response):
+    # Label by route pattern, not path, so /analyze?... and /api/v1/datasets/<id>
+    # each stay one series
+    if 'request_start' in g:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        REQUEST_SECONDS.observe(time.perf_counter() - g.request_start,
+                                route=route, method=request.method, status=response.status_code)
+    return response
+
+@app.route('/metrics')
+def metrics():
+    """
+    Prometheus metrics summed over all workers (see metrics.py).
+    """
+    return app.response_class(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+def requested_profile_mode():
+    """
+    Profiler mode asked for by the request ("sample" or "cprofile"), or None.
+    """
+    if not ALLOW_PROFILING:
+        return None
+    flag = (request.args.get('profile') or request.headers.get('X-Profile') or '').lower()
+    if flag in ('', '0', 'false'):
+        return None
+    return 'cprofile' if flag == 'cprofile' else 'sample'
+
+@app.route('/profiles/<path:filename>')
+def download_profile(filename):
+    from flask import abort, send_from_directory
+    from profiling import PROFILES_DIR
+
+    if not ALLOW_PROFILING:
+        abort(404)
+    return send_from_directory(PROFILES_DIR, filename, as_attachment=True)
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
@@ -39,82 +112,201 @@ def index():
 
 @app.route('/showcase')
 def showcase():
-    return render_template('showcase.html')
+    from nodes.summary_tables import load_weekly_trend
+
+    # Weekly trend of the app tracked by run_weekly_job, from the summary tables
+    dataset = request.args.get('dataset', 'groww')
+    trend = load_weekly_trend(dataset, db_path=SUMMARY_DB)
+    return render_template('showcase.html', dataset=dataset, trend=trend)
+
+@app.errorhandler(413)
+def upload_too_large(error):
+    if request.path.startswith('/api/'):
+        return jsonify({"error": "Upload exceeds the size limit"}), 413
+    flash(f"File too large. The limit is {app.config['MAX_CONTENT_LENGTH'] // (1024 * 1024)} MB.")
+    return redirect(url_for('index'))
 
 @app.route('/upload', methods=['POST'])
 def upload_file():
+    # Parsing the form streams the file to disk and validates it on the way
+    try:
+        files = request.files
+    except UploadRejected as e:
+        flash(f'Invalid file: {e.message}')
+        return redirect(url_for('index'))
+
     # Check if file is present in request
-    if 'file' not in request.files:
+    if 'file' not in files:
         flash('No file selected')
-        return redirect(request.url)
+        return redirect(url_for('index'))
     
-    file = request.files['file']
+    file = files['file']
     
     # Check if file is selected
     if file.filename == '':
         flash('No file selected')
-        return redirect(request.url)
+        return redirect(url_for('index'))
     
     # Check if file type is allowed
     if file and allowed_file(file.filename):
-        filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
+        try:
+            stored = file.stream.finish()
+        except UploadRejected as e:
+            flash(f'Invalid file: {e.message}')
+            return redirect(url_for('index'))
+        if stored.reused:
+            print(f"Upload matches existing file {stored.filename}; reusing it")
         
         # Store filepath in session or pass as parameter
-        return redirect(url_for('analyze', filename=filename))
+        return redirect(url_for('analyze', filename=stored.filename, name=secure_filename(file.filename)))
     else:
         flash('Invalid file type. Please upload a CSV file.')
-        return redirect(request.url)
+        return redirect(url_for('index'))
 
 @app.route('/analyze')
 def analyze():
+    # ?corpus=1 analyzes the standard combined corpus instead of an upload
+    use_corpus = request.args.get('corpus') == '1'
     filename = request.args.get('filename')
-    if not filename:
+    if use_corpus:
+        filepath = CORPUS_PATH
+        filename = os.path.basename(CORPUS_PATH)
+    elif not filename:
         flash('No file specified')
         return redirect(url_for('index'))
-    
-    filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+    else:
+        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
     
     # Check if file exists
     if not os.path.exists(filepath):
-        flash('File not found')
+        flash('Review corpus not found. Run combine_reviews.py first.' if use_corpus else 'File not found')
         return redirect(url_for('index'))
     
     # Get target week from query parameters or use default
     target_week = request.args.get('week', '2025-11-17')
     
     try:
-        # Run the analysis pipeline
-        reviews_raw = upload_reviews(filepath)
-        reviews_clean = clean_and_bucket(reviews_raw)
-        reviews_week = filter_target_week(reviews_clean, target_week)
-        reviews_week_tagged = llm_tag_theme_sentiment(reviews_week)
-        themes_week_stats = theme_stats(reviews_week_tagged)
-        weekly_note_and_email = llm_weekly_pulse(themes_week_stats, reviews_week_tagged, target_week)
-        email_df = pd.DataFrame([{"content": weekly_note_and_email}])
-        parsed_email = parse_email_json(email_df)
+        from analysis_service import week_summary
+
+        # Read the precomputed summary rows; the pipeline only runs the first
+        # time a file version and week are requested
+        dataset = 'corpus' if use_corpus else os.path.splitext(filename)[0]
+        profile_mode = requested_profile_mode()
+        if profile_mode:
+            from profiling import profiled
+
+            # Recompute instead of reading stored rows, so the profile shows the pipeline
+            with profiled(f"analyze-{dataset}-{target_week}", mode=profile_mode) as profile_run:
+                summary = week_summary(filepath, target_week, dataset, use_corpus, SUMMARY_DB, refresh=True)
+        else:
+            summary = week_summary(filepath, target_week, dataset, use_corpus, SUMMARY_DB)
         
         # Store results for display
         results = {
-            "filename": filename,
+            "filename": request.args.get('name') or filename,
             "target_week": target_week,
-            "total_reviews": len(reviews_raw),
-            "filtered_reviews": len(reviews_week),
-            "themes_stats": themes_week_stats.to_dict('records'),
-            "weekly_note": parsed_email.iloc[0]['weekly_note_md'],
-            "email_subject": parsed_email.iloc[0]['email_subject'],
-            "email_body": parsed_email.iloc[0]['email_body']
+            "total_reviews": summary["total_reviews"],
+            "filtered_reviews": summary["week_reviews"],
+            "themes_stats": summary["themes_stats"],
+            "rating_histogram": summary["rating_histogram"],
+            "sentiment_counts": summary["sentiment_counts"],
+            "weekly_note": summary["weekly_note_md"],
+            "email_subject": summary["email_subject"],
+            "email_body": summary["email_body"]
         }
         
-        return render_template('results.html', results=results)
+        response = app.make_response(render_template('results.html', results=results))
+        if profile_mode:
+            for kind, path in profile_run.paths.items():
+                response.headers[f'X-Profile-{kind.title()}'] = url_for('download_profile', filename=os.path.basename(path))
+        return response
         
     except Exception as e:
         flash(f'Error processing file: {str(e)}')
         return redirect(url_for('index'))
 
+@app.route('/search')
+def search():
+    """
+    Full-text search over indexed reviews.
+
+    Query parameters: q (required), app (app profile id), week, theme,
+    sentiment, rating, order ("recent", the default, or "relevance"), page and per_page.
+    Reviews of a week tagged from a sample (tagging_sample_size) are only
+    labeled when they or a near-duplicate were sampled; the rest have a null
+    theme and sentiment and never match those filters.
+    """
+    from nodes.review_search import DEFAULT_LIMIT, MAX_LIMIT, search_reviews
+
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', DEFAULT_LIMIT, type=int)
+    if page < 1 or not 1 <= per_page <= MAX_LIMIT:
+        return jsonify({"error": f"page must be >= 1 and per_page between 1 and {MAX_LIMIT}"}), 400
+    
+    try:
+        found = search_reviews(
+            request.args.get('q', ''),
+            week=request.args.get('week'),
+            theme=request.args.get('theme'),
+            sentiment=request.args.get('sentiment'),
+            rating=request.args.get('rating', type=int),
+            app_id=request.args.get('app'),
+            limit=per_page,
+            offset=(page - 1) * per_page,
+            order=request.args.get('order', 'recent'),
+            db_path=SEARCH_DB,
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    return jsonify({
+        "query": request.args.get('q'),
+        "page": page,
+        "per_page": per_page,
+        "total": found["total"],
+        "pages": -(-found["total"] // per_page),
+        "results": found["results"],
+    })
+
+@app.route('/ingest', methods=['POST'])
+def ingest():
+    """
+    Accept a JSON lines batch of reviews for near-real-time tagging
+    (see review_stream.py). ?dataset= names the stream (default "stream").
+    """
+    from review_stream import DEFAULT_DATASET, IngestRejected, append_batch, ensure_batcher, parse_batch
+
+    ensure_batcher()
+    try:
+        accepted = append_batch(parse_batch(request.get_data()), request.args.get('dataset', DEFAULT_DATASET))
+    except IngestRejected as e:
+        response = jsonify({"error": e.message})
+        response.status_code = e.status
+        if e.retry_after:
+            response.headers['Retry-After'] = str(e.retry_after)
+        return response
+    return jsonify(accepted), 202
+
+@app.route('/ingest/stats')
+def ingest_stats():
+    """
+    Theme stats of the streamed reviews tagged so far. Query parameters:
+    dataset and week (defaults to the current week).
+    """
+    from review_stream import DEFAULT_DATASET, ensure_batcher, week_stats
+
+    ensure_batcher()
+    week = request.args.get('week')
+    if week and not re.match(r'^\d{4}-\d{2}-\d{2}$', week):
+        return jsonify({"error": "week must be YYYY-MM-DD"}), 400
+    stats = week_stats(week, request.args.get('dataset', DEFAULT_DATASET))
+    stats["themes"] = json.loads(stats.pop("themes_week_stats").to_json(orient="records"))
+    return jsonify(stats)
+
 @app.route('/download_sample')
 def download_sample():
+    import pandas as pd
+
     # Create a sample CSV file for download
     sample_data = {
         "date": ["2025-11-17", "2025-11-18", "2025-11-19", "2025-11-20", "2025-11-21"],
@@ -0,0 +1,148 @@
+"""
+App profiles for configuration-driven analysis runs.
+
+A profile describes one tracked app: where its reviews come from, the theme
+legend used for tagging, and who receives its weekly report. Profiles are
+loaded from a JSON file such as apps.json:
+
+{
+  "apps": [
+    {
+      "app_id": "groww",
+      "app_name": "Groww",
+      "playstore_id": "com.nextbillion.groww",
+      "trustpilot_url": "https://www.trustpilot.com/review/groww.in",
+      "recipients": ["pm-team@example.com"]
+    }
+  ]
+}
+
+Any field left out falls back to the Groww defaults below. An app with no
+recipients gets no email unless "recipients_env" names an env var holding
+comma-separated recipients, e.g. "RECIPIENT_EMAIL" for the default inbox.
+"""
+
+import copy
+import json
+import os
+import threading
+
+from nodes.theme_legend import DEFAULT_THEME_KEYWORDS
+from nodes.time_buckets import GRANULARITIES
+
+# App config read by the long-running services (web app, streaming ingest)
+DEFAULT_APPS_CONFIG = os.environ.get(
+    "APPS_CONFIG", os.path.join(os.path.dirname(os.path.abspath(__file__)), "apps.json")
+)
+
+SUPPORTED_SOURCES = ("playstore", "trustpilot")
+TAGGING_BACKENDS = ("llm", "embedding", "cascade")
+PULSE_MODES = ("auto", "single", "map_reduce", "template")
+
+GROWW_PROFILE = {
+    "app_id": "groww",
+    "app_name": "Groww",
+    "sources": ["playstore", "trustpilot"],
+    "playstore_id": "com.nextbillion.groww",
+    "playstore_count": 100,
+    "trustpilot_url": "https://www.trustpilot.com/review/groww.in",
+    "trustpilot_pages": 3,
+    "theme_keywords": DEFAULT_THEME_KEYWORDS,
+    "tagging_backend": "llm",
+    "tagging_workers": 1,
+    "tagging_sample_size": 0,
+    "pulse_mode": "auto",
+    "granularity": "week",
+    "recipients": [],
+    "recipients_env": None,
+}
+
+def make_profile(overrides=None):
+    """
+    Build a profile from the Groww defaults plus overrides.
+
+    Args:
+        overrides (dict): Fields to override
+
+    Returns:
+        dict: Validated app profile
+    """
+    profile = copy.deepcopy(GROWW_PROFILE)
+    profile.update(overrides or {})
+
+    if not profile.get("app_id"):
+        raise ValueError("App profile is missing 'app_id'")
+    if not isinstance(profile["theme_keywords"], dict) or not profile["theme_keywords"]:
+        raise ValueError(f"App '{profile['app_id']}': 'theme_keywords' must be a non-empty object")
+    unknown = [s for s in profile["sources"] if s not in SUPPORTED_SOURCES]
+    if unknown:
+        raise ValueError(f"App '{profile['app_id']}': unsupported sources {unknown}")
+    if profile["tagging_backend"] not in TAGGING_BACKENDS:
+        raise ValueError(f"App '{profile['app_id']}': unknown tagging_backend '{profile['tagging_backend']}'")
+    sample_size = profile["tagging_sample_size"]
+    if isinstance(sample_size, bool) or not isinstance(sample_size, int) or sample_size < 0:
+        raise ValueError(f"App '{profile['app_id']}': 'tagging_sample_size' must be a non-negative integer")
+    if profile["pulse_mode"] not in PULSE_MODES:
+        raise ValueError(f"App '{profile['app_id']}': unknown pulse_mode '{profile['pulse_mode']}'")
+    if profile["granularity"] not in GRANULARITIES:
+        raise ValueError(f"App '{profile['app_id']}': granularity must be one of {GRANULARITIES}")
+    if isinstance(profile["recipients"], str):
+        profile["recipients"] = [r.strip() for r in profile["recipients"].split(",") if r.strip()]
+
+    return profile
+
+def load_app_profiles(path):
+    """
+    Load app profiles from a JSON config file.
+
+    Args:
+        path (str): Path to the JSON config
+
+    Returns:
+        list: App profiles, in file order
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"App config not found: {path}")
+
+    with open(path) as f:
+        config = json.load(f)
+
+    entries = config.get("apps", []) if isinstance(config, dict) else config
+    profiles = [make_profile(entry) for entry in entries]
+
+    seen = set()
+    for profile in profiles:
+        if profile["app_id"] in seen:
+            raise ValueError(f"Duplicate app_id in {path}: {profile['app_id']}")
+        seen.add(profile["app_id"])
+
+    return profiles
+
+_profiles_cache = {}
+_profiles_lock = threading.Lock()
+
+def get_app_profile(app_id, path=DEFAULT_APPS_CONFIG):
+    """
+    The profile with this app_id in a config file, re-read only when the
+    file changes.
+
+    Args:
+        app_id (str): App to look up
+        path (str): Path to the JSON config
+
+    Returns:
+        dict or None: The app profile, or None if the file or app is missing
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    path = os.path.abspath(path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    with _profiles_lock:
+        cached = _profiles_cache.get(path)
+    if cached is None or cached[0] != version:
+        cached = (version, {profile["app_id"]: profile for profile in load_app_profiles(path)})
+        with _profiles_lock:
+            _profiles_cache[path] = cached
+    return cached[1].get(app_id)
@@ -47,21 +47,16 @@ def update_reviews():
 def setup_auto_update():
     """
     Set up automatic review updates
+    
+    Runs the scheduler service, which persists the last successful run,
+    catches up a missed daily window after a restart and never overlaps runs.
     """
+    from scheduler_service import SchedulerService
+
     print("Setting up automatic review updates...")
     print("Updates will run daily at 2:00 AM")
-    print("Press Ctrl+C to stop")
     
-    # Schedule daily update at 2:00 AM
-    schedule.every().day.at("02:00").do(update_reviews)
-    
-    # Also run an update immediately
-    update_reviews()
-    
-    # Keep the script running
-    while True:
-        schedule.run_pending()
-        time.sleep(60)  # Check every minute
+    SchedulerService(daily_at="02:00").run_forever()
 
 def setup_frequent_updates():
     """
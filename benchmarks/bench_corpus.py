@@ -0,0 +1,128 @@
+"""
+Compare per-worker memory and week-slice latency of the CSV path
+(upload_reviews + clean_and_bucket + filter_target_week) with the
+memory-mapped Arrow corpus (nodes/review_corpus.py).
+
+Starts --workers processes for each mode, like gunicorn workers, that all
+load the same corpus and analyze one week, then reports each worker's
+private memory (USS) and proportional share (PSS) from
+/proc/<pid>/smaps_rollup. Mapped corpus pages are shared between workers, so
+their USS stays small. Linux only for the memory columns.
+
+Usage:
+    python benchmarks/bench_corpus.py                  # 1,000,000 reviews, 4 workers
+    python benchmarks/bench_corpus.py --n 200000 --workers 2
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+def make_reviews_csv(path, n, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2025-09-01", periods=84, freq="D").strftime("%Y-%m-%d").to_numpy(dtype=object)
+    texts = np.array([
+        "App keeps crashing after the update", "SIP amount deducted twice",
+        "KYC pending for a week", "Withdrawal not credited to bank",
+        "Great app, easy to use", "Statement download fails",
+    ], dtype=object)
+    pd.DataFrame({
+        "date": dates[rng.integers(0, len(dates), size=n)],
+        "rating": rng.integers(1, 6, size=n),
+        "review_title": "Review",
+        "review_text": texts[rng.integers(0, len(texts), size=n)] + " #" + pd.Series(np.arange(n)).astype(str),
+    }).to_csv(path, index=False)
+
+def memory_kb():
+    """
+    (USS, PSS) of this process in kB, or (None, None) off Linux.
+    """
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+    except OSError:
+        return None, None
+    kb = lambda name: int(fields.get(name, "0 kB").split()[0])
+    return kb("Private_Clean") + kb("Private_Dirty"), kb("Pss")
+
+def worker(mode, path, week, barrier, results):
+    sys.path.append(ROOT)
+    start = time.perf_counter()
+    if mode == "csv":
+        from nodes.upload_reviews import upload_reviews
+        from nodes.clean_and_bucket import clean_and_bucket
+        from nodes.filter_target_week import filter_target_week
+
+        reviews_clean = clean_and_bucket(upload_reviews(path))
+        reviews_week = filter_target_week(reviews_clean, week)
+    else:
+        from nodes.review_corpus import open_corpus
+
+        corpus = open_corpus(path)
+        reviews_week = corpus.week(week)
+        # Touch the whole corpus once, as a long-running worker would over time
+        for name in corpus.table.column_names:
+            for chunk in corpus.table.column(name).chunks:
+                for buf in chunk.buffers():
+                    if buf is not None:
+                        np.frombuffer(buf, dtype=np.uint8).sum()
+    elapsed = time.perf_counter() - start
+
+    # Hold the data until every worker has loaded it, then measure
+    barrier.wait()
+    uss, pss = memory_kb()
+    results.put((mode, elapsed, len(reviews_week), uss, pss))
+    barrier.wait()
+
+def run_mode(mode, path, week, workers):
+    ctx = multiprocessing.get_context("spawn")
+    barrier = ctx.Barrier(workers)
+    results = ctx.Queue()
+    procs = [ctx.Process(target=worker, args=(mode, path, week, barrier, results)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    rows = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the memory-mapped review corpus")
+    parser.add_argument("--n", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    from nodes.clean_and_bucket import clean_and_bucket
+    from nodes.review_corpus import corpus_path_for, write_corpus
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "all_reviews.csv")
+        make_reviews_csv(csv_path, args.n)
+        start = time.perf_counter()
+        reviews_clean = clean_and_bucket(pd.read_csv(csv_path))
+        corpus_path = write_corpus(reviews_clean, corpus_path_for(csv_path))
+        print(f"Wrote corpus for {args.n:,} reviews in {time.perf_counter() - start:.1f}s "
+              f"({os.path.getsize(corpus_path) / 1e6:.0f} MB)")
+        week = str(reviews_clean["week_start"].iloc[0])
+        del reviews_clean
+
+        print(f"{'mode':<8} {'load+slice':>11} {'week rows':>10} {'USS/worker':>12} {'PSS/worker':>12}")
+        for mode, path in (("csv", csv_path), ("arrow", corpus_path)):
+            rows = run_mode(mode, path, week, args.workers)
+            elapsed = np.mean([r[1] for r in rows])
+            uss = [r[3] for r in rows if r[3] is not None]
+            pss = [r[4] for r in rows if r[4] is not None]
+            fmt = lambda values: f"{np.mean(values) / 1024:.0f} MB" if values else "n/a"
+            print(f"{mode:<8} {elapsed:>10.2f}s {rows[0][2]:>10,} {fmt(uss):>12} {fmt(pss):>12}")
+
+if __name__ == "__main__":
+    main()
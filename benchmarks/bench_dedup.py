@@ -0,0 +1,115 @@
+"""
+Benchmark near-duplicate detection (nodes/dedup_reviews.py) on synthetic reviews.
+
+The corpus mixes template spam (the same templates as generate_sample_reviews,
+with small random edits) and unique reviews built from a random vocabulary.
+Reports throughput, how many reviews would still need tagging, and pairwise
+precision/recall of the clusters against the known template of each review.
+
+Usage:
+    python benchmarks/bench_dedup.py               # 1,000,000 reviews
+    python benchmarks/bench_dedup.py --n 100000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nodes.dedup_reviews import dedup_reviews
+from scrape_playstore_real import generate_sample_reviews
+
+VOCAB = (
+    "app slow crash login otp kyc sip payment upi failed withdraw delay support "
+    "statement report chart order stock mutual fund portfolio update bug screen "
+    "money account bank refund charge fee good bad great poor easy hard fast"
+).split()
+
+def make_corpus(n, spam_fraction=0.6, seed=0):
+    """
+    Build n synthetic reviews.
+
+    Returns:
+        pandas.DataFrame: full_text plus a 'source_id' ground-truth column
+        (template index for spam, -1 for unique reviews)
+    """
+    rng = np.random.default_rng(seed)
+    templates = sorted({r["review_text"] for r in generate_sample_reviews("Groww", count=2000)})
+
+    n_spam = int(n * spam_fraction)
+    template_ids = rng.integers(0, len(templates), size=n_spam)
+    # Near-duplicates: random suffixes and punctuation changes
+    suffixes = np.array(["", "", "", "!", " !!", " Groww", " pls fix", "."])
+    spam_text = (
+        pd.Series(np.array(templates, dtype=object)[template_ids])
+        + pd.Series(suffixes[rng.integers(0, len(suffixes), size=n_spam)])
+    )
+
+    n_unique = n - n_spam
+    lengths = rng.integers(8, 20, size=n_unique)
+    words = np.array(VOCAB, dtype=object)[rng.integers(0, len(VOCAB), size=int(lengths.sum()))]
+    splits = np.split(words, np.cumsum(lengths)[:-1])
+    unique_text = pd.Series([" ".join(w) for w in splits], dtype=object)
+
+    df = pd.DataFrame({
+        "full_text": pd.concat([spam_text, unique_text], ignore_index=True),
+        "source_id": np.concatenate([template_ids, np.full(n_unique, -1)]),
+    })
+    return df.sample(frac=1, random_state=seed).reset_index(drop=True)
+
+def pairwise_quality(df, sample=20000, seed=1):
+    """
+    Estimate pairwise precision and recall on a random sample of rows.
+    """
+    sample_df = df.sample(n=min(sample, len(df)), random_state=seed)
+    truth = sample_df["source_id"].to_numpy()
+    pred = sample_df["dup_cluster"].to_numpy()
+
+    # Unique reviews only match themselves; give each its own truth id
+    truth = np.where(truth < 0, -1 - np.arange(len(truth)), truth)
+
+    def same_pairs(labels):
+        counts = pd.Series(labels).value_counts().to_numpy()
+        return int((counts * (counts - 1) // 2).sum())
+
+    both = same_pairs(pd.Series(list(zip(truth, pred))).factorize()[0])
+    predicted = same_pairs(pred)
+    actual = same_pairs(truth)
+    precision = both / predicted if predicted else 1.0
+    recall = both / actual if actual else 1.0
+    return precision, recall
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark MinHash/LSH review dedup")
+    parser.add_argument("--n", type=int, default=1_000_000)
+    parser.add_argument("--threshold", type=float, default=0.8)
+    parser.add_argument("--num-perm", type=int, default=64)
+    parser.add_argument("--bands", type=int, default=16)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    corpus = make_corpus(args.n)
+    print(f"Generated {len(corpus):,} reviews in {time.perf_counter() - start:.1f}s")
+
+    start = time.perf_counter()
+    deduped = dedup_reviews(corpus, threshold=args.threshold, num_perm=args.num_perm, bands=args.bands)
+    elapsed = time.perf_counter() - start
+
+    representatives = int(deduped["is_representative"].sum())
+    spam_rows = int(deduped["is_template_spam"].sum())
+    precision, recall = pairwise_quality(deduped)
+
+    print(f"Dedup time:            {elapsed:.2f}s ({len(corpus) / elapsed:,.0f} reviews/s)")
+    print(f"Clusters to tag:       {representatives:,} ({representatives / len(corpus):.1%} of reviews)")
+    print(f"Tagging calls saved:   {len(corpus) - representatives:,}")
+    print(f"Template spam rows:    {spam_rows:,}")
+    print(f"Pairwise precision:    {precision:.3f}")
+    print(f"Pairwise recall:       {recall:.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark the local embedding tagger against the rule-based (mock LLM) tagger.
+
+The corpus is built from short theme-specific phrases mixed with generic
+filler, so every review has a known theme. Reports throughput of both
+backends, their accuracy against the known theme, how often they agree,
+and how many rows the embedding backend escalates to the LLM.
+
+Usage:
+    python benchmarks/bench_embedding_tagger.py                # 20,000 reviews
+    python benchmarks/bench_embedding_tagger.py --n 100000 --rule-sample 20000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nodes.llm_tag_theme_sentiment import llm_tag_theme_sentiment
+
+THEME_PHRASES = {
+    "Onboarding & KYC": [
+        "KYC verification pending for days", "account opening is stuck",
+        "PAN and Aadhaar documents rejected", "sign up asks for selfie again",
+        "registration never completes", "e-sign step fails during onboarding",
+    ],
+    "Payments & SIP": [
+        "SIP amount deducted twice", "UPI payment failed", "autopay mandate not working",
+        "add money transaction pending", "mutual fund purchase order failed",
+        "payment debited but investment not shown",
+    ],
+    "Withdrawals & Payouts": [
+        "cannot withdraw my funds", "withdrawal delayed for a week",
+        "money not credited to bank account", "redemption amount stuck",
+        "payout after selling shares is late", "refund still not received",
+    ],
+    "Statements & Reports": [
+        "capital gains statement download fails", "P&L report shows wrong numbers",
+        "tax report missing trades", "contract note pdf not available",
+        "ledger and holdings history incomplete", "cannot download the statement",
+    ],
+    "App Performance & Bugs": [
+        "app keeps crashing", "very slow and laggy", "screen freezes on loading",
+        "bug after the latest update", "app hangs and logs me out",
+        "charts not working, error every time",
+    ],
+}
+
+FILLER = [
+    "", "", "please fix", "very disappointed", "otherwise good app", "since yesterday",
+    "using Groww for two years", "support did not help", "kindly look into this",
+]
+
+def make_corpus(n, seed=0):
+    """
+    Build n reviews with a known 'true_theme' column.
+    """
+    rng = np.random.default_rng(seed)
+    themes = list(THEME_PHRASES)
+    theme_ids = rng.integers(0, len(themes), size=n)
+    phrases = [
+        THEME_PHRASES[themes[t]][i % len(THEME_PHRASES[themes[t]])]
+        for t, i in zip(theme_ids, rng.integers(0, 6, size=n))
+    ]
+    filler = np.array(FILLER, dtype=object)[rng.integers(0, len(FILLER), size=n)]
+    text = pd.Series(phrases, dtype=object) + ". " + pd.Series(filler, dtype=object)
+
+    return pd.DataFrame({
+        "full_text": text.str.strip(". "),
+        "rating": rng.integers(1, 6, size=n),
+        "true_theme": np.array(themes, dtype=object)[theme_ids],
+    })
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the embedding tagging backend")
+    parser.add_argument("--n", type=int, default=20000)
+    parser.add_argument("--rule-sample", type=int, default=20000,
+                        help="Rows tagged with the (slow) rule tagger for comparison")
+    parser.add_argument("--min-confidence", type=float, default=0.05)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.n)
+
+    start = time.perf_counter()
+    embedded = llm_tag_theme_sentiment(corpus, backend="embedding", min_confidence=0.0)
+    embed_time = time.perf_counter() - start
+
+    sample = corpus.head(args.rule_sample)
+    start = time.perf_counter()
+    ruled = llm_tag_theme_sentiment(sample, backend="llm")
+    rule_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    cascaded = llm_tag_theme_sentiment(sample, backend="embedding", min_confidence=args.min_confidence)
+    cascade_time = time.perf_counter() - start
+
+    embedded_sample = embedded.head(len(sample))
+    escalated = (cascaded["tagged_by"] == "llm").mean()
+
+    print(f"Reviews:                    {len(corpus):,} (rule sample {len(sample):,})")
+    print(f"Embedding throughput:       {len(corpus) / embed_time:,.0f} reviews/s")
+    print(f"Rule tagger throughput:     {len(sample) / rule_time:,.0f} reviews/s")
+    print(f"Embedding + escalation:     {len(sample) / cascade_time:,.0f} reviews/s "
+          f"({escalated:.1%} escalated at min_confidence={args.min_confidence})")
+    print(f"Embedding theme accuracy:   {(embedded['theme'] == embedded['true_theme']).mean():.3f}")
+    print(f"Rule theme accuracy:        {(ruled['theme'] == ruled['true_theme']).mean():.3f}")
+    print(f"Theme agreement:            {(embedded_sample['theme'] == ruled['theme']).mean():.3f}")
+    print(f"Sentiment agreement:        {(embedded_sample['sentiment'] == ruled['sentiment']).mean():.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Benchmark the scraper fetch control (fetch_control.py) against a local fake
+review server that rate-limits and injects errors.
+
+The server answers /review/app?page=N with a small page. It:
+
+- returns 429 with Retry-After when the client exceeds --server-rate
+  requests per second;
+- returns 503 for a random --error-rate share of requests;
+- serves a challenge page for the --challenge-pages requests after
+  --challenge-at pages (0 disables this).
+
+Each scenario fetches --pages pages twice. The first run uses the previous
+scraper loop (fixed 2-5 s sleep between pages, stop at the first error or
+challenge). The second uses FetchController with the Trustpilot limits.
+All times are divided by --scale so a run takes seconds. Reported pages/s
+are converted back to real time.
+
+Usage:
+    python benchmarks/bench_fetch_control.py
+    python benchmarks/bench_fetch_control.py --pages 200 --error-rate 0.1
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fetch_control import SOURCE_LIMITS, FetchController, FetchError
+from scrape_trustpilot import looks_like_challenge
+
+class FakeReviewServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, server_rate, error_rate, challenge_at, challenge_pages, seed=0):
+        super().__init__(("127.0.0.1", 0), FakeReviewHandler)
+        self.server_rate = server_rate
+        self.error_rate = error_rate
+        self.challenge_at = challenge_at
+        self.challenge_pages = challenge_pages
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.tokens = 2.0
+        self.updated = time.monotonic()
+        self.served = 0
+        self.challenges_left = challenge_pages
+        self.counts = {"ok": 0, "429": 0, "503": 0, "challenge": 0}
+
+    def respond(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(2.0, self.tokens + (now - self.updated) * self.server_rate)
+            self.updated = now
+            if self.tokens < 1:
+                self.counts["429"] += 1
+                return 429, "Too Many Requests"
+            self.tokens -= 1
+            if self.rng.random() < self.error_rate:
+                self.counts["503"] += 1
+                return 503, "Service Unavailable"
+            if self.challenge_at and self.served >= self.challenge_at and self.challenges_left > 0:
+                self.challenges_left -= 1
+                self.counts["challenge"] += 1
+                return 200, "<html><title>Just a moment</title>Complete the CAPTCHA challenge</html>"
+            self.served += 1
+            self.counts["ok"] += 1
+            return 200, '<html><script id="__NEXT_DATA__" type="application/json">{"props": {}}</script></html>'
+
+class FakeReviewHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        status, body = self.server.respond()
+        data = body.encode()
+        self.send_response(status)
+        if status == 429:
+            self.send_header("Retry-After", f"{1 / self.server.server_rate:.3f}")
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+def fixed_delay_loop(session, url, pages, scale, rng):
+    """
+    The scraper loop before fetch_control: fixed politeness delay, stop at the
+    first error or challenge page.
+    """
+    fetched = 0
+    for page in range(1, pages + 1):
+        try:
+            response = session.get(f"{url}?page={page}", timeout=10)
+            response.raise_for_status()
+        except requests.RequestException:
+            break
+        if looks_like_challenge(response.text):
+            break
+        fetched += 1
+        time.sleep(rng.uniform(2, 5) / scale)
+    return fetched
+
+def controller_loop(session, url, pages, scale):
+    limits = {source: {key: value * scale if key != "burst" else value for key, value in limit.items()}
+              for source, limit in SOURCE_LIMITS.items()}
+    controller = FetchController(limits=limits, backoff_base=1.0 / scale, backoff_max=60.0 / scale,
+                                 breaker_cooldown=15 * 60 / scale)
+    fetched = 0
+    for page in range(1, pages + 1):
+        try:
+            controller.get(session, f"{url}?page={page}", source="trustpilot", is_challenge=looks_like_challenge)
+        except FetchError as e:
+            print(f"  stopped at page {page}: {type(e).__name__}: {e}")
+            break
+        fetched += 1
+    return fetched
+
+def run(strategy, args):
+    server = FakeReviewServer(args.server_rate * args.scale, args.error_rate, args.challenge_at,
+                              args.challenge_pages, seed=args.seed)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/review/app"
+    session = requests.Session()
+    start = time.perf_counter()
+    try:
+        if strategy == "fixed delay":
+            fetched = fixed_delay_loop(session, url, args.pages, args.scale, random.Random(args.seed))
+        else:
+            fetched = controller_loop(session, url, args.pages, args.scale)
+    finally:
+        elapsed = (time.perf_counter() - start) * args.scale
+        server.shutdown()
+        server.server_close()
+    return fetched, elapsed, server.counts
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark scraper fetch control against a fake server")
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--server-rate", type=float, default=0.8, help="Requests/s the server allows (real time)")
+    parser.add_argument("--error-rate", type=float, default=0.05, help="Share of requests answered with 503")
+    parser.add_argument("--challenge-at", type=int, default=60, help="Serve challenge pages after this many pages")
+    parser.add_argument("--challenge-pages", type=int, default=2, help="Number of challenge pages served")
+    parser.add_argument("--scale", type=float, default=50.0, help="Speed-up applied to all delays")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{args.pages} pages, server allows {args.server_rate} req/s, {args.error_rate:.0%} 503s, "
+          f"{args.challenge_pages} challenge pages after page {args.challenge_at}\n")
+    rows = []
+    for strategy in ["fixed delay", "fetch_control"]:
+        print(f"{strategy}:")
+        rows.append((strategy,) + run(strategy, args))
+
+    print(f"\n{'strategy':<15} {'pages':>6} {'pages/s':>8} {'429s':>6} {'503s':>6} {'challenges':>11}")
+    for strategy, fetched, elapsed, counts in rows:
+        print(f"{strategy:<15} {fetched:>6} {fetched / elapsed:>8.2f} {counts['429']:>6} {counts['503']:>6} "
+              f"{counts['challenge']:>11}")
+
+if __name__ == "__main__":
+    main()
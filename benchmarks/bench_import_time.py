@@ -0,0 +1,138 @@
+"""
+Benchmark cold-start import latency of the web app and CLI entry points.
+
+Each module is imported in a fresh interpreter with `python -X importtime`,
+and the cumulative import time reported for the module itself is collected.
+Results can be appended to a JSON history file to track cold start over time.
+
+Usage:
+    python benchmarks/bench_import_time.py
+    python benchmarks/bench_import_time.py --runs 10 --history bench_import_history.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = ["app", "main_pipeline", "run_weekly_job"]
+
+def parse_importtime(stderr_text, module):
+    """
+    Extract the cumulative import time (microseconds) of a module from
+    `-X importtime` output, plus the heaviest imports it pulled in directly.
+
+    Args:
+        stderr_text (str): stderr captured from `python -X importtime`
+        module (str): Module name to look up
+
+    Returns:
+        tuple: (cumulative_us or None, list of (name, cumulative_us))
+    """
+    entries = []
+    for line in stderr_text.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            cum_us = int(parts[1].strip())
+        except ValueError:
+            continue  # header line
+        name = parts[2]
+        # Nesting is shown by two spaces of indentation per level, and a
+        # module's children are printed immediately before it.
+        indent = len(name) - len(name.lstrip(" "))
+        entries.append((indent, name.strip(), cum_us))
+
+    for i in range(len(entries) - 1, -1, -1):
+        indent, name, cum_us = entries[i]
+        if name != module:
+            continue
+        children = []
+        j = i - 1
+        while j >= 0 and entries[j][0] > indent:
+            if entries[j][0] == indent + 2:
+                children.append((entries[j][1], entries[j][2]))
+            j -= 1
+        children.sort(key=lambda item: item[1], reverse=True)
+        return cum_us, children
+    return None, []
+
+def measure_module(module, runs=5):
+    """
+    Import a module in `runs` fresh interpreters and collect timings.
+
+    Args:
+        module (str): Module name to import
+        runs (int): Number of cold-start runs
+
+    Returns:
+        dict: Median/min import and wall times (ms) plus heaviest imports
+    """
+    import_ms = []
+    wall_ms = []
+    heaviest = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=REPO_ROOT, capture_output=True, text=True
+        )
+        wall_ms.append((time.perf_counter() - start) * 1000)
+        if result.returncode != 0:
+            raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+        cumulative, top_level = parse_importtime(result.stderr, module)
+        if cumulative is not None:
+            import_ms.append(cumulative / 1000)
+        heaviest = top_level[:5]
+
+    return {
+        "module": module,
+        "runs": runs,
+        "import_ms_median": round(statistics.median(import_ms), 2) if import_ms else None,
+        "import_ms_min": round(min(import_ms), 2) if import_ms else None,
+        "wall_ms_median": round(statistics.median(wall_ms), 2),
+        "heaviest_imports": [{"name": n, "ms": round(us / 1000, 2)} for n, us in heaviest],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start import latency")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--history", help="JSON file to append results to")
+    args = parser.parse_args()
+
+    results = [measure_module(m, args.runs) for m in args.modules]
+
+    print(f"{'module':<18}{'import ms (median)':>20}{'import ms (min)':>18}{'process ms':>14}")
+    print("-" * 70)
+    for r in results:
+        print(f"{r['module']:<18}{str(r['import_ms_median']):>20}"
+              f"{str(r['import_ms_min']):>18}{r['wall_ms_median']:>14}")
+        for heavy in r["heaviest_imports"]:
+            print(f"    {heavy['name']:<30}{heavy['ms']:>10} ms")
+
+    if args.history:
+        history = []
+        if os.path.exists(args.history):
+            with open(args.history) as f:
+                history = json.load(f)
+        history.append({
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "results": results,
+        })
+        with open(args.history, "w") as f:
+            json.dump(history, f, indent=2)
+        print(f"\nAppended results to {args.history}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Memory report for tagged review frames: plain string labels vs the compact
+categorical/int8 schema (nodes/review_schema.py).
+
+Builds a tagged frame shaped like the pipeline's reviews_week_tagged output,
+once with Python object strings and int64 ratings (how the columns were
+stored before) and once compacted, then reports bytes per review for each
+column and the time theme_stats takes on both.
+
+Usage:
+    python benchmarks/bench_memory.py              # 1,000,000 reviews
+    python benchmarks/bench_memory.py --n 200000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nodes.review_schema import SENTIMENTS, compact_columns, compact_labels, memory_report
+from nodes.theme_legend import DEFAULT_THEME_KEYWORDS
+from nodes.theme_stats import theme_stats
+
+def make_tagged_frame(n, seed=0):
+    """
+    Build n tagged reviews with object string labels and int64 ratings.
+    """
+    rng = np.random.default_rng(seed)
+    themes = np.array(list(DEFAULT_THEME_KEYWORDS), dtype=object)
+    weeks = pd.date_range("2025-09-01", periods=12, freq="7D").strftime("%Y-%m-%d").to_numpy(dtype=object)
+    sources = np.array(["playstore", "trustpilot"], dtype=object)
+    texts = np.array([
+        "App keeps crashing after the update", "SIP amount deducted twice",
+        "KYC pending for a week", "Withdrawal not credited to bank",
+        "Great app, easy to use", "Statement download fails",
+    ], dtype=object)
+
+    full_text = texts[rng.integers(0, len(texts), size=n)]
+    return pd.DataFrame({
+        "rating": rng.integers(1, 6, size=n).astype("int64"),
+        "week_start": pd.Series(weeks[rng.integers(0, len(weeks), size=n)], dtype=object),
+        "source": pd.Series(sources[rng.integers(0, len(sources), size=n)], dtype=object),
+        "full_text": pd.Series(full_text, dtype=object),
+        "theme": pd.Series(themes[rng.integers(0, len(themes), size=n)], dtype=object),
+        "sentiment": pd.Series(np.array(SENTIMENTS, dtype=object)[rng.integers(0, 4, size=n)], dtype=object),
+    })
+
+def time_theme_stats(df, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        theme_stats(df)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory report for tagged review frames")
+    parser.add_argument("--n", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    before = make_tagged_frame(args.n)
+    after = compact_labels(compact_columns(before.copy()))
+
+    report_before = memory_report(before)
+    report_after = memory_report(after)
+
+    print(f"Reviews: {args.n:,}")
+    print(f"{'column':<12} {'before B/row':>13} {'after B/row':>12}  dtype")
+    for col in before.columns:
+        print(f"{col:<12} {report_before['columns'][col] / args.n:>13.1f} "
+              f"{report_after['columns'][col] / args.n:>12.1f}  {after[col].dtype}")
+    print(f"{'total':<12} {report_before['bytes_per_row']:>13.1f} {report_after['bytes_per_row']:>12.1f}")
+    label_cols = [c for c in before.columns if c != "full_text"]
+    label_before = sum(report_before["columns"][c] for c in label_cols) / args.n
+    label_after = sum(report_after["columns"][c] for c in label_cols) / args.n
+    print(f"Label columns (excluding full_text): {label_before:.1f} -> {label_after:.1f} bytes/review "
+          f"({label_before / label_after:.0f}x smaller)")
+
+    print(f"theme_stats on string labels:      {time_theme_stats(before) * 1000:.0f} ms")
+    print(f"theme_stats on categorical labels: {time_theme_stats(after) * 1000:.0f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Scaling benchmark for multi-process local tagging (llm_tag_theme_sentiment
+with workers > 1) from 1 to N worker processes.
+
+Escalation to the LLM is disabled so only the CPU-bound local step is timed.
+Checks that every worker count produces exactly the single-process labels.
+
+Usage:
+    python benchmarks/bench_parallel_tagging.py                     # 400,000 reviews, 1..cpu_count workers
+    python benchmarks/bench_parallel_tagging.py --n 1000000 --max-workers 8 --backend cascade
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_embedding_tagger import make_corpus
+from nodes.llm_tag_theme_sentiment import llm_tag_theme_sentiment
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark multi-process local tagging")
+    parser.add_argument("--n", type=int, default=400_000)
+    parser.add_argument("--backend", choices=["embedding", "cascade"], default="embedding")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.n)
+    worker_counts = sorted({1, 2, 4, 8, 16, args.max_workers} & set(range(1, args.max_workers + 1)))
+
+    print(f"{args.n:,} reviews, backend={args.backend}, {os.cpu_count()} CPUs available")
+    print(f"{'workers':>7} {'time':>8} {'reviews/s':>11} {'speedup':>8}  identical")
+    baseline = None
+    for workers in worker_counts:
+        start = time.perf_counter()
+        tagged = llm_tag_theme_sentiment(corpus, backend=args.backend, min_confidence=0.0, workers=workers)
+        elapsed = time.perf_counter() - start
+        labels = tagged[["theme", "sentiment", "summary_1line", "theme_confidence"]]
+        if baseline is None:
+            baseline = (elapsed, labels)
+        identical = labels.equals(baseline[1])
+        print(f"{workers:>7} {elapsed:>7.2f}s {args.n / elapsed:>11,.0f} {baseline[0] / elapsed:>7.2f}x  {identical}")
+
+if __name__ == "__main__":
+    main()
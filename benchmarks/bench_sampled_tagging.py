@@ -0,0 +1,68 @@
+"""
+Benchmark the stratified sampling mode (nodes/sample_reviews.py) against
+tagging every review of a large week.
+
+The whole week is tagged once with the embedding backend as ground truth.
+Samples of each --sizes are then drawn with --repeats seeds, their rows keep
+the ground-truth labels, and theme_stats estimates the theme counts and
+negative shares. Reports the LLM calls (and time at --latency per call) a
+full LLM tagging would need against the sample, the mean estimation
+error, and how often the confidence intervals contain the true values.
+
+Usage:
+    python benchmarks/bench_sampled_tagging.py
+    python benchmarks/bench_sampled_tagging.py --n 200000 --sizes 1000 5000 --repeats 50
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_embedding_tagger import make_corpus
+from nodes.llm_tag_theme_sentiment import llm_tag_theme_sentiment
+from nodes.sample_reviews import sample_reviews
+from nodes.theme_stats import theme_stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark stratified sampling for theme stats")
+    parser.add_argument("--n", type=int, default=50000)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 2000, 5000])
+    parser.add_argument("--repeats", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds per LLM tagging call")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    week = make_corpus(args.n)
+    week["source"] = rng.choice(["playstore", "trustpilot"], args.n, p=[0.8, 0.2])
+    start = time.perf_counter()
+    tagged = llm_tag_theme_sentiment(week, backend="embedding", min_confidence=0)
+    print(f"Tagged {args.n:,} reviews as ground truth in {time.perf_counter() - start:.1f}s\n")
+    truth = theme_stats(tagged).set_index("theme")
+    true_share = (tagged["sentiment"].astype(str) == "NEGATIVE").groupby(tagged["theme"].astype(str)).mean()
+
+    print(f"{'sample':>7} {'LLM calls':>10} {'LLM time':>9} {'count err':>10} {'share err':>10} "
+          f"{'count CI hit':>13} {'share CI hit':>13} {'CI width':>9}")
+    print(f"{args.n:>7,} {args.n:>10,} {args.n * args.latency / 60:>7.0f}m {'-':>10} {'-':>10} {'-':>13} {'-':>13} {'-':>9}")
+    for size in args.sizes:
+        count_errors, share_errors, count_hits, share_hits, widths = [], [], [], [], []
+        for seed in range(args.repeats):
+            estimate = theme_stats(sample_reviews(tagged, size, seed=seed)).set_index("theme")
+            for theme, row in estimate.iterrows():
+                true_count = truth.loc[theme, "review_count"]
+                count_errors.append(abs(row.review_count - true_count) / true_count)
+                share_errors.append(abs(row.neg_share - true_share[theme]))
+                count_hits.append(row.review_count_low <= true_count <= row.review_count_high)
+                # Interval bounds are rounded to 2 decimals
+                share_hits.append(row.neg_share_low - 0.005 <= true_share[theme] <= row.neg_share_high + 0.005)
+                widths.append(row.neg_share_high - row.neg_share_low)
+        print(f"{size:>7,} {size:>10,} {size * args.latency / 60:>7.0f}m {np.mean(count_errors):>9.1%} "
+              f"{np.mean(share_errors):>10.3f} {np.mean(count_hits):>13.1%} {np.mean(share_hits):>13.1%} "
+              f"{np.mean(widths):>9.3f}")
+
+if __name__ == "__main__":
+    main()
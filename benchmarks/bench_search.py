@@ -0,0 +1,107 @@
+"""
+Benchmark the full-text search index (nodes/review_search.py) against
+grepping full_text with pandas, which is what answering a search question
+took before the index existed.
+
+Indexes --n reviews spread over 12 weeks, re-indexes them with 1% new
+reviews to show the incremental path, then times a few searches with and
+without week / theme / sentiment / rating filters. The pandas column times
+the scan of an already-loaded frame only; before the index, a search also
+had to read and clean the combined CSV first.
+
+Usage:
+    python benchmarks/bench_search.py               # 1,000,000 reviews
+    python benchmarks/bench_search.py --n 200000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_embedding_tagger import make_corpus
+from nodes.clean_and_bucket import clean_and_bucket
+from nodes.review_search import index_reviews, search_reviews, update_labels
+
+QUERIES = [
+    ("upi payment failed", {}),
+    ("withdraw*", {}),
+    ("statement download", {"sentiment": "NEGATIVE"}),
+    ("crashing", {"rating": 1}),
+]
+
+def make_reviews(n, seed=0):
+    corpus = make_corpus(n, seed)
+    # Separate stream from make_corpus so dates do not correlate with themes
+    rng = np.random.default_rng(seed + 1000)
+    dates = pd.date_range("2025-09-01", periods=84, freq="D").strftime("%Y-%m-%d").to_numpy(dtype=object)
+    reviews = clean_and_bucket(pd.DataFrame({
+        "date": dates[rng.integers(0, len(dates), size=n)],
+        "rating": corpus["rating"],
+        # Numbered so every review is distinct
+        "review_text": corpus["full_text"] + f" #{seed}-" + pd.Series(np.arange(n)).astype(str),
+    }))
+    return reviews.assign(theme=corpus["true_theme"].to_numpy(),
+                          sentiment=np.where(corpus["rating"].to_numpy() <= 2, "NEGATIVE", "POSITIVE"))
+
+def timed(fn, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return result, float(np.median(times))
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the full-text review search index")
+    parser.add_argument("--n", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    reviews = make_reviews(args.n)
+    week = reviews["week_start"].iloc[0]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, "review_search.db")
+
+        start = time.perf_counter()
+        added = index_reviews(reviews, db)
+        print(f"Indexed {added:,} reviews in {time.perf_counter() - start:.1f}s "
+              f"({os.path.getsize(db) / 1e6:.0f} MB)")
+
+        start = time.perf_counter()
+        update_labels(reviews, db)
+        print(f"Stored labels for {len(reviews):,} reviews in {time.perf_counter() - start:.1f}s")
+
+        new = make_reviews(max(1, args.n // 100), seed=1)
+        start = time.perf_counter()
+        added = index_reviews(pd.concat([reviews, new], ignore_index=True), db)
+        print(f"Re-indexed {len(reviews) + len(new):,} reviews ({added:,} new) "
+              f"in {time.perf_counter() - start:.1f}s")
+
+        print(f"\n{'query':<22} {'filters':<42} {'matches':>9} {'recent':>9} {'relevance':>10} {'pandas':>9}")
+        for query, filters in QUERIES + [("upi payment failed", {"week": week, "theme": "Payments & SIP"})]:
+            found, recent_s = timed(lambda: search_reviews(query, db_path=db, **filters))
+            _, relevance_s = timed(lambda: search_reviews(query, order="relevance", db_path=db, **filters))
+
+            def grep():
+                mask = pd.Series(True, index=reviews.index)
+                for word in query.split():
+                    mask &= reviews["full_text"].str.contains(word.rstrip("*"), case=False, regex=False)
+                for column, value in filters.items():
+                    key = "week_start" if column == "week" else column
+                    mask &= reviews[key] == value
+                return reviews[mask]
+
+            _, grep_s = timed(grep, repeat=1)
+            label = ", ".join(f"{k}={v}" for k, v in filters.items()) or "-"
+            print(f"{query:<22} {label:<42} {found['total']:>9,} {recent_s * 1000:>7.1f}ms "
+                  f"{relevance_s * 1000:>8.1f}ms {grep_s * 1000:>7.0f}ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Replay benchmark for theme spike detection (spike_detector.py).
+
+Builds --weeks of hourly review traffic per theme with a day/night profile
+and injects two incidents in the last week: a payments outage (volume x3,
+85% negative for 3 hours) and an onboarding volume spike (x4 for 2 hours).
+The reviews are replayed through SpikeDetector in time order. Reports
+cost per review, how long after each incident started it was flagged
+(against waiting for the Monday pulse), and alerts outside the incidents.
+
+--csv replays a tagged reviews file instead (date, theme and sentiment
+columns) and lists the alerts it raises.
+
+Usage:
+    python benchmarks/bench_spike_replay.py
+    python benchmarks/bench_spike_replay.py --weeks 12 --rate 200
+    python benchmarks/bench_spike_replay.py --csv reports/reviews_week_tagged.csv
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_embedding_tagger import THEME_PHRASES
+from spike_detector import SpikeDetector, describe_alert
+
+# Replay starts on a Monday 00:00 UTC
+START = datetime(2025, 9, 1, tzinfo=timezone.utc).timestamp()
+
+BASE_NEGATIVE_SHARE = 0.25
+
+def make_traffic(weeks, rate, seed=0):
+    """
+    Synthetic reviews with injected incidents.
+
+    Returns:
+        tuple: (DataFrame of theme, timestamp, negative sorted by time,
+        list of incident dicts)
+    """
+    rng = np.random.default_rng(seed)
+    themes = list(THEME_PHRASES)
+    hours = weeks * 7 * 24
+    last_week = hours - 7 * 24
+    incidents = [
+        {"theme": "Payments & SIP", "start": last_week + 2 * 24 + 13, "hours": 3, "volume": 3.0, "negative": 0.85},
+        {"theme": "Onboarding & KYC", "start": last_week + 4 * 24 + 10, "hours": 2, "volume": 4.0,
+         "negative": BASE_NEGATIVE_SHARE},
+    ]
+
+    hour_of_day = np.arange(hours) % 24
+    # Quiet at night (IST is UTC+5:30), busiest in the evening
+    diurnal = 0.2 + 1.6 * np.sin(np.pi * ((hour_of_day + 5.5 - 4) % 24) / 24) ** 2
+    frames = []
+    for theme in themes:
+        volume = np.full(hours, rate / len(themes)) * diurnal
+        negative_share = np.full(hours, BASE_NEGATIVE_SHARE)
+        for incident in incidents:
+            if incident["theme"] == theme:
+                span = slice(incident["start"], incident["start"] + incident["hours"])
+                volume[span] *= incident["volume"]
+                negative_share[span] = incident["negative"]
+        counts = rng.poisson(volume)
+        hour = np.repeat(np.arange(hours), counts)
+        frames.append(pd.DataFrame({
+            "theme": theme,
+            "timestamp": START + (hour + rng.random(len(hour))) * 3600,
+            "negative": rng.random(len(hour)) < negative_share[hour],
+        }))
+    traffic = pd.concat(frames).sort_values("timestamp", kind="stable").reset_index(drop=True)
+    return traffic, incidents
+
+def replay(traffic):
+    detector = SpikeDetector()
+    alerts = []
+    start = time.perf_counter()
+    for theme, timestamp, negative in zip(traffic["theme"], traffic["timestamp"], traffic["negative"]):
+        for alert in detector.observe(theme, timestamp, negative):
+            alert["detected_at"] = timestamp
+            alerts.append(alert)
+    return alerts, time.perf_counter() - start
+
+def hours_until_monday_pulse(timestamp):
+    """
+    Hours from timestamp until the next Monday 00:00 UTC weekly run.
+    """
+    week = 7 * 24 * 3600
+    return (week - (timestamp - START) % week) / 3600
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay reviews through the theme spike detector")
+    parser.add_argument("--weeks", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=60.0, help="Average reviews per hour over all themes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--csv", help="Tagged reviews to replay instead of synthetic traffic")
+    args = parser.parse_args()
+
+    if args.csv:
+        reviews = pd.read_csv(args.csv)
+        timestamps = pd.to_datetime(reviews["date"], errors="coerce", utc=True)
+        reviews = reviews[timestamps.notna()].assign(timestamp=timestamps.dropna().astype("int64") / 1e9)
+        traffic = pd.DataFrame({
+            "theme": reviews["theme"].astype(str),
+            "timestamp": reviews["timestamp"],
+            "negative": reviews["sentiment"].astype(str) == "NEGATIVE",
+        }).sort_values("timestamp", kind="stable")
+        alerts, seconds = replay(traffic)
+        print(f"Replayed {len(traffic):,} reviews in {seconds:.2f}s "
+              f"({seconds / max(len(traffic), 1) * 1e6:.1f} µs/review), {len(alerts)} alerts")
+        for alert in alerts:
+            print(f"  {describe_alert(alert)}")
+        return
+
+    traffic, incidents = make_traffic(args.weeks, args.rate, args.seed)
+    alerts, seconds = replay(traffic)
+    print(f"Replayed {len(traffic):,} reviews over {args.weeks} weeks ({args.rate:g}/hour, "
+          f"{len(THEME_PHRASES)} themes) in {seconds:.2f}s: {seconds / len(traffic) * 1e6:.1f} µs/review\n")
+
+    matched = set()
+    print(f"{'incident':<34} {'first alert':>12} {'kind':>22} {'Monday pulse':>13}")
+    for incident in incidents:
+        start = START + incident["start"] * 3600
+        end = start + (incident["hours"] + 1) * 3600
+        hits = [i for i, a in enumerate(alerts)
+                if a["theme"] == incident["theme"] and start <= a["detected_at"] < end]
+        matched.update(hits)
+        label = f"{incident['theme']} ({incident['hours']}h)"
+        if hits:
+            first = alerts[hits[0]]
+            delay = f"{(first['detected_at'] - start) / 60:.0f} min"
+            kinds = ",".join(sorted({alerts[i]["kind"] for i in hits}))
+        else:
+            delay, kinds = "missed", "-"
+        print(f"{label:<34} {delay:>12} {kinds:>22} {hours_until_monday_pulse(start):>11.0f} h")
+
+    false_alerts = [a for i, a in enumerate(alerts) if i not in matched]
+    theme_hours = args.weeks * 7 * 24 * len(THEME_PHRASES)
+    print(f"\nAlerts outside incidents: {len(false_alerts)} over {theme_hours:,} theme-hours")
+    for alert in false_alerts[:10]:
+        print(f"  {describe_alert(alert)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark streaming ingest (review_stream.py): producers post JSON lines
+batches while a MicroBatcher tags them in the background.
+
+Reports ingest throughput, how many batches were refused by backpressure,
+and the lag from ingest until a review appears in the week's theme stats
+(median and max over all reviews).
+
+Usage:
+    python benchmarks/bench_stream_ingest.py
+    python benchmarks/bench_stream_ingest.py --n 100000 --batch 500 --max-pending 20000
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import review_stream
+from benchmarks.bench_embedding_tagger import make_corpus
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark streaming ingest and micro-batch tagging")
+    parser.add_argument("--n", type=int, default=20000)
+    parser.add_argument("--batch", type=int, default=200, help="Reviews per /ingest request")
+    parser.add_argument("--interval", type=float, default=1.0, help="Micro-batch interval in seconds")
+    parser.add_argument("--max-pending", type=int, default=review_stream.MAX_PENDING_REVIEWS)
+    args = parser.parse_args()
+
+    review_stream.MAX_PENDING_REVIEWS = args.max_pending
+    db_path = os.path.join(tempfile.mkdtemp(), "stream.db")
+    corpus = make_corpus(args.n)
+    today = date.today().isoformat()
+    lines = [json.dumps({"date": today, "rating": int(rating), "review_text": text})
+             for text, rating in zip(corpus["full_text"], corpus["rating"])]
+    bodies = ["\n".join(lines[i:i + args.batch]).encode("utf-8") for i in range(0, len(lines), args.batch)]
+
+    batcher = review_stream.MicroBatcher(db_path, interval=args.interval).start()
+    refused = 0
+    start = time.perf_counter()
+    for body in bodies:
+        while True:
+            try:
+                review_stream.append_batch(review_stream.parse_batch(body), db_path=db_path)
+                break
+            except review_stream.IngestRejected as e:
+                if e.status != 503:
+                    raise
+                refused += 1
+                time.sleep(args.interval / 2)
+    ingest_seconds = time.perf_counter() - start
+
+    while review_stream.week_stats(db_path=db_path)["pending"]:
+        time.sleep(0.1)
+    total_seconds = time.perf_counter() - start
+    batcher.stop()
+
+    conn = review_stream.connect(db_path)
+    lags = np.array([row[0] for row in conn.execute(
+        "SELECT r.tagged_at - l.received_at FROM stream_reviews r JOIN stream_log l ON l.id = r.log_id"
+    )])
+    conn.close()
+    stats = review_stream.week_stats(db_path=db_path)
+
+    print(f"\nReviews: {args.n:,} in batches of {args.batch}, micro-batch every {args.interval:g}s, "
+          f"at most {args.max_pending:,} pending")
+    print(f"Ingest:   {args.n / ingest_seconds:,.0f} reviews/s ({ingest_seconds:.2f}s, {refused} batches refused)")
+    print(f"Tagged:   {stats['week_reviews']:,} reviews, all done after {total_seconds:.2f}s")
+    print(f"Lag:      median {np.median(lags):.2f}s, max {lags.max():.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmark the confidence-gated tagging cascade against tagging every review
+with the LLM.
+
+The mock LLM answers instantly, so each call is padded with a simulated
+latency (--llm-latency-ms) to approximate a real model. Reports end-to-end
+time for each backend, the fraction of reviews escalated to the LLM, and how
+often the cheaper backends agree with the all-LLM labels.
+
+Usage:
+    python benchmarks/bench_tagging_cascade.py
+    python benchmarks/bench_tagging_cascade.py --n 5000 --llm-latency-ms 20
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import nodes.llm_tag_theme_sentiment as tagger
+from benchmarks.bench_embedding_tagger import make_corpus
+
+def with_latency(llm_call, seconds):
+    def delayed(*args, **kwargs):
+        time.sleep(seconds)
+        return llm_call(*args, **kwargs)
+    return delayed
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the tagging cascade")
+    parser.add_argument("--n", type=int, default=2000)
+    parser.add_argument("--llm-latency-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.n)
+    tagger.mock_llm_call = with_latency(tagger.mock_llm_call, args.llm_latency_ms / 1000)
+
+    results = {}
+    for backend in ("llm", "cascade", "embedding"):
+        start = time.perf_counter()
+        tagged = tagger.llm_tag_theme_sentiment(corpus, backend=backend)
+        results[backend] = (tagged, time.perf_counter() - start)
+
+    llm_tagged, llm_time = results["llm"]
+    print(f"\nReviews: {len(corpus):,}, simulated LLM latency {args.llm_latency_ms:g} ms/call")
+    print(f"{'backend':<10} {'time':>8} {'escalated':>10} {'theme agree':>12} {'sentiment agree':>16} {'time saved':>11}")
+    for backend, (tagged, elapsed) in results.items():
+        stats = tagged.attrs["tagging_stats"]
+        theme_agree = (tagged["theme"] == llm_tagged["theme"]).mean()
+        sentiment_agree = (tagged["sentiment"] == llm_tagged["sentiment"]).mean()
+        print(f"{backend:<10} {elapsed:>7.2f}s {stats['escalated_fraction']:>10.1%} "
+              f"{theme_agree:>12.3f} {sentiment_agree:>16.3f} {1 - elapsed / llm_time:>11.1%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark the template weekly pulse (nodes/template_pulse.py) against the
+model-written pulse (nodes/llm_weekly_pulse.py) on the same week.
+
+The mock model answers instantly, so every model call is padded with a
+simulated latency (--llm-latency-ms). Checks that the template output goes
+through parse_email_json and stays within the note's word budget.
+
+Usage:
+    python benchmarks/bench_template_pulse.py
+    python benchmarks/bench_template_pulse.py --n 50000 --llm-latency-ms 2000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import nodes.llm_weekly_pulse as pulse
+from benchmarks.bench_embedding_tagger import make_corpus
+from nodes.parse_email_json import parse_email_json
+from nodes.template_pulse import MAX_NOTE_WORDS
+from nodes.theme_stats import theme_stats
+
+def delayed(llm_call, seconds):
+    def call(*args):
+        time.sleep(seconds)
+        return llm_call(*args)
+    return call
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the template weekly pulse")
+    parser.add_argument("--n", type=int, default=5000)
+    parser.add_argument("--llm-latency-ms", type=float, default=1000.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.n)
+    reviews = corpus.assign(theme=corpus["true_theme"],
+                            sentiment=np.where(corpus["rating"] <= 2, "NEGATIVE", "POSITIVE"),
+                            summary_1line=corpus["full_text"].str.slice(0, 80))
+    stats = theme_stats(reviews)
+
+    latency = args.llm_latency_ms / 1000
+    pulse.mock_llm_call = delayed(pulse.mock_llm_call, latency)
+    pulse.mock_summary_call = delayed(pulse.mock_summary_call, latency)
+
+    # First run includes building the hashing vectorizer
+    pulse.llm_weekly_pulse(stats, reviews, "2025-11-17", mode="template")
+
+    print(f"Reviews: {len(reviews):,}, simulated latency {args.llm_latency_ms:g} ms/call\n")
+    print(f"{'mode':<12} {'time':>10}")
+    for mode in ["template", "single", "map_reduce"]:
+        runs = args.repeat if mode == "template" else 1
+        start = time.perf_counter()
+        for _ in range(runs):
+            output = pulse.llm_weekly_pulse(stats, reviews, "2025-11-17", mode=mode)
+        elapsed = (time.perf_counter() - start) / runs
+        print(f"{mode:<12} {elapsed * 1000:>8.1f}ms")
+        if mode == "template":
+            template_output = output
+
+    parsed = parse_email_json(pd.DataFrame([{"content": template_output}])).iloc[0]
+    words = len(parsed["email_body"].split())
+    assert parsed["email_subject"] and words <= MAX_NOTE_WORDS, "template note did not parse or is too long"
+    print(f"\nTemplate note: {words} words, subject {parsed['email_subject']!r}\n")
+    print(parsed["email_body"])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark the time bucketing in clean_and_bucket (nodes/time_buckets.py).
+
+Compares the previous week bucket (subtract the weekday, strftime every row)
+with integer flooring plus one label per distinct week, times each
+granularity, and checks the buckets against pandas' floor / to_period.
+Finally builds daily theme stats for a month from the same cleaned frame.
+
+Usage:
+    python benchmarks/bench_time_buckets.py
+    python benchmarks/bench_time_buckets.py --n 5000000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nodes.filter_target_week import filter_bucket
+from nodes.theme_stats import theme_stats
+from nodes.time_buckets import GRANULARITIES, bucket_labels, bucket_starts
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+def strftime_weeks(dates):
+    return (dates - pd.to_timedelta(dates.dt.weekday, unit="D")).dt.strftime("%Y-%m-%d")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark time bucketing")
+    parser.add_argument("--n", type=int, default=1000000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    seconds = rng.integers(0, 2 * 365 * 86400, args.n)
+    dates = pd.Series(pd.Timestamp("2024-01-01") + pd.to_timedelta(seconds, unit="s"))
+
+    old, old_seconds = timed(lambda: strftime_weeks(dates))
+    new, new_seconds = timed(lambda: bucket_labels(bucket_starts(dates, "week"), "week"))
+    assert (new.astype(str).to_numpy() == old.to_numpy()).all()
+    print(f"Dates: {args.n:,} over 2 years\n")
+    print(f"week_start labels: strftime {old_seconds * 1000:,.0f} ms, "
+          f"floor + labels {new_seconds * 1000:,.0f} ms ({old_seconds / new_seconds:.0f}x)\n")
+
+    expected = {
+        "hour": dates.dt.floor("h"),
+        "day": dates.dt.floor("D"),
+        "week": dates.dt.to_period("W-SUN").dt.start_time,
+        "month": dates.dt.to_period("M").dt.start_time,
+    }
+    print(f"{'granularity':<12} {'buckets':>8} {'starts':>10}")
+    for granularity in GRANULARITIES:
+        starts, seconds_taken = timed(lambda: bucket_starts(dates, granularity))
+        assert (starts.to_numpy() == expected[granularity].to_numpy(dtype="datetime64[ns]")).all()
+        print(f"{granularity:<12} {starts.nunique():>8,} {seconds_taken * 1000:>7,.0f} ms")
+
+    # Daily dashboard rows for one month, from the same frame
+    reviews = pd.DataFrame({
+        "date": dates,
+        "full_text": "review",
+        "rating": rng.integers(1, 6, args.n),
+        "theme": pd.Categorical(rng.choice(["Payments & SIP", "Onboarding & KYC", "App Performance & Bugs"], args.n)),
+        "sentiment": rng.choice(["POSITIVE", "NEGATIVE", "MIXED"], args.n),
+    })
+    reviews["day_start"] = bucket_starts(reviews["date"], "day")
+    month, filter_seconds = timed(lambda: filter_bucket(reviews, "2024-11", "month"))
+    daily, stats_seconds = timed(lambda: theme_stats(month, granularity="day"))
+    seconds_taken = filter_seconds + stats_seconds
+    print(f"\nNovember 2024: {len(month):,} reviews -> {len(daily)} daily theme rows in {seconds_taken * 1000:,.0f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Benchmark Trustpilot page parsing (scrape_trustpilot.py): the embedded
+__NEXT_DATA__ JSON path against walking the review cards with BeautifulSoup.
+
+Builds fixture pages shaped like Trustpilot review pages (page chrome, 20
+review cards with nested markup, and the same reviews in a __NEXT_DATA__
+script), checks that both paths return the same reviews, and reports pages
+per second for:
+
+    json          parse_review_page on a page with embedded JSON (new path)
+    dom           parse_reviews_dom on the same page (previous behaviour)
+    dom fallback  parse_review_page on a page without the script
+
+Usage:
+    python benchmarks/bench_trustpilot_parse.py               # 50 pages
+    python benchmarks/bench_trustpilot_parse.py --pages 200
+"""
+
+import argparse
+import html
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrape_playstore_real import generate_sample_reviews
+from scrape_trustpilot import parse_review_page, parse_reviews_dom
+
+REVIEWS_PER_PAGE = 20
+
+CHROME_LINKS = 150
+
+def make_card(review):
+    stars = "".join(f'<svg class="star_{i}" viewBox="0 0 16 16"><path d="M8 0l2 6h6l-5 4 2 6-5-4-5 4 2-6-5-4h6z"/></svg>'
+                    for i in range(5))
+    return f"""
+<article class="paper_paper styles_reviewCard" data-service-review-card-paper="true" data-review-id="{review['id']}">
+  <div class="styles_reviewCardInner">
+    <aside class="styles_consumerInfoWrapper">
+      <a href="/users/{review['id']}" class="link_internal"><span data-consumer-name-typography="true" class="typography_heading-xxs">{html.escape(review['consumer']['displayName'])}</span></a>
+      <div class="styles_consumerExtraDetails"><span class="typography_body-m">IN</span><span>3 reviews</span></div>
+    </aside>
+    <section class="styles_reviewContentwrapper">
+      <div class="styles_reviewHeader" data-service-review-rating="{review['rating']}">
+        <div class="star-rating_starRating"><img alt="Rated {review['rating']} out of 5 stars" src="/stars-{review['rating']}.svg"></div>
+        <div class="styles_reviewStars">{stars}</div>
+        <time datetime="{review['dates']['publishedDate']}" class="">Nov 17, 2025</time>
+      </div>
+      <div class="styles_reviewContent" data-review-content="true">
+        <a href="/reviews/{review['id']}" class="link_internal"><h2 data-review-title-typography="true" class="typography_heading-s">{html.escape(review['title'])}</h2></a>
+        <p data-service-review-text-typography="true" data-review-content-typography="true" class="typography_body-l">{html.escape(review['text'])}</p>
+        <p class="typography_body-m"><b>Date of experience</b>: November 17, 2025</p>
+      </div>
+    </section>
+    <div class="styles_reviewActions"><button class="link_button">Useful</button><button class="link_button">Share</button></div>
+  </div>
+</article>"""
+
+def make_page(reviews, embed_json=True):
+    nav = "".join(f'<li class="nav_item"><a href="/categories/c{i}" class="link_internal">Category {i}</a></li>'
+                  for i in range(CHROME_LINKS))
+    cards = "".join(make_card(review) for review in reviews)
+    script = ""
+    if embed_json:
+        data = {"props": {"pageProps": {"reviews": reviews, "businessUnit": {"displayName": "Groww"},
+                                        "filters": {"pagination": {"currentPage": 1, "perPage": REVIEWS_PER_PAGE}}}},
+                "page": "/review/[businessUnit]", "buildId": "fixture"}
+        script = f'<script id="__NEXT_DATA__" type="application/json">{json.dumps(data)}</script>'
+    return f"""<!DOCTYPE html><html lang="en"><head><title>Groww Reviews | Read Customer Service Reviews of groww.in</title>
+<meta charset="utf-8"><link rel="stylesheet" href="/styles.css"></head>
+<body><header><nav><ul>{nav}</ul></nav></header>
+<main><section class="styles_reviewsContainer">{cards}</section></main>
+<footer><ul>{nav}</ul></footer>{script}</body></html>"""
+
+def make_pages(n_pages, seed=0):
+    """
+    Build fixture pages with and without embedded JSON.
+
+    Returns:
+        tuple: (pages with __NEXT_DATA__, the same pages without it)
+    """
+    samples = generate_sample_reviews("Groww", count=n_pages * REVIEWS_PER_PAGE, seed=seed)
+    with_json, without_json = [], []
+    for page in range(n_pages):
+        reviews = [
+            {
+                "id": f"{seed}{page:04d}{i:02d}",
+                "title": sample["review_title"],
+                "text": sample["review_text"],
+                "rating": sample["rating"],
+                "dates": {"publishedDate": f"{sample['date']}T10:15:00.000Z", "experiencedDate": f"{sample['date']}T00:00:00.000Z"},
+                "consumer": {"displayName": f"Reviewer {page}-{i}", "countryCode": "IN"},
+            }
+            for i, sample in enumerate(samples[page * REVIEWS_PER_PAGE:(page + 1) * REVIEWS_PER_PAGE])
+        ]
+        with_json.append(make_page(reviews))
+        without_json.append(make_page(reviews, embed_json=False))
+    return with_json, without_json
+
+def pages_per_second(parse, pages):
+    start = time.perf_counter()
+    results = [parse(page) for page in pages]
+    return results, len(pages) / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Trustpilot page parsing")
+    parser.add_argument("--pages", type=int, default=50)
+    args = parser.parse_args()
+
+    with_json, without_json = make_pages(args.pages)
+    print(f"{args.pages} pages of {REVIEWS_PER_PAGE} reviews, "
+          f"{sum(map(len, with_json)) / len(with_json) / 1000:.0f} KB each")
+
+    json_results, json_rate = pages_per_second(parse_review_page, with_json)
+    dom_results, dom_rate = pages_per_second(parse_reviews_dom, with_json)
+    fallback_results, fallback_rate = pages_per_second(parse_review_page, without_json)
+
+    assert all(source == "json" for _, source in json_results)
+    assert all(source == "dom" for _, source in fallback_results)
+    assert [reviews for reviews, _ in json_results] == dom_results == [reviews for reviews, _ in fallback_results], \
+        "JSON and DOM paths returned different reviews"
+
+    print(f"\n{'path':<14} {'pages/s':>9} {'speedup':>8}")
+    for name, rate in [("json", json_rate), ("dom", dom_rate), ("dom fallback", fallback_rate)]:
+        print(f"{name:<14} {rate:>9.1f} {rate / dom_rate:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
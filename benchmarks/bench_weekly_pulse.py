@@ -0,0 +1,65 @@
+"""
+Benchmark the map-reduce weekly pulse (nodes/llm_weekly_pulse.py) against
+the single-prompt pulse that only sees the first 150 reviews.
+
+The mock model answers instantly, so every call is padded with a simulated
+latency (--llm-latency-ms). Reports end-to-end time, model calls, the largest
+prompt sent and how many of the week's reviews the note is based on.
+
+Usage:
+    python benchmarks/bench_weekly_pulse.py
+    python benchmarks/bench_weekly_pulse.py --n 20000 --llm-latency-ms 800
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import nodes.llm_weekly_pulse as pulse
+from benchmarks.bench_embedding_tagger import make_corpus
+from nodes.theme_stats import theme_stats
+
+def instrument(llm_call, seconds, calls):
+    def delayed(*args):
+        # Prompt size: system + user prompt for the note, the prompt for summaries
+        calls.append(sum(len(arg) for arg in args if isinstance(arg, str)))
+        time.sleep(seconds)
+        return llm_call(*args)
+    return delayed
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark map-reduce weekly pulse summarization")
+    parser.add_argument("--n", type=int, default=5000)
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0)
+    parser.add_argument("--workers", type=int, default=pulse.SUMMARY_WORKERS)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.n)
+    reviews = corpus.assign(theme=corpus["true_theme"],
+                            sentiment=np.where(corpus["rating"] <= 2, "NEGATIVE", "POSITIVE"))
+    stats = theme_stats(reviews)
+
+    calls = []
+    latency = args.llm_latency_ms / 1000
+    pulse.mock_llm_call = instrument(pulse.mock_llm_call, latency, calls)
+    pulse.mock_summary_call = instrument(pulse.mock_summary_call, latency, calls)
+
+    print(f"Reviews: {len(reviews):,}, simulated latency {args.llm_latency_ms:g} ms/call\n")
+    print(f"{'mode':<24} {'time':>8} {'calls':>6} {'max prompt':>11} {'reviews covered':>16}")
+    for label, mode, workers in [("single (first 150)", "single", 1),
+                                 ("map_reduce, 1 worker", "map_reduce", 1),
+                                 (f"map_reduce, {args.workers} workers", "map_reduce", args.workers)]:
+        calls.clear()
+        start = time.perf_counter()
+        pulse.llm_weekly_pulse(stats, reviews, "2025-11-17", mode=mode, summary_workers=workers)
+        elapsed = time.perf_counter() - start
+        covered = min(len(reviews), pulse.REVIEW_PROMPT_LIMIT) if mode == "single" else len(reviews)
+        print(f"{label:<24} {elapsed:>7.2f}s {len(calls):>6} {max(calls):>9,}ch {covered:>16,}")
+
+if __name__ == "__main__":
+    main()
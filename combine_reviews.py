@@ -7,13 +7,52 @@ import glob
 import os
 from datetime import datetime
 
-def combine_review_files(pattern="*reviews*.csv", output_file="combined_reviews.csv"):
+def save_review_corpus(reviews_clean, output_file):
+    """
+    Write the cleaned reviews as a memory-mapped Arrow corpus next to the CSV.
+    Skipped (with a message) if pyarrow is not installed.
+    """
+    from nodes.review_corpus import corpus_available, corpus_path_for, write_corpus
+
+    if not corpus_available():
+        print("pyarrow not installed; skipping memory-mapped corpus")
+        return None
+    try:
+        corpus_file = write_corpus(reviews_clean, corpus_path_for(output_file))
+    except Exception as e:
+        print(f"Error writing review corpus: {e}")
+        return None
+    print(f"Saved memory-mapped corpus to {corpus_file}")
+    return corpus_file
+
+def save_search_index(reviews_clean, search_db, app_id="groww"):
+    """
+    Add new reviews to the full-text search index (nodes/review_search.py).
+    """
+    from nodes.review_search import index_reviews
+
+    try:
+        added = index_reviews(reviews_clean, search_db, app_id)
+    except Exception as e:
+        print(f"Error updating search index: {e}")
+        return 0
+    print(f"Indexed {added} new reviews for search in {search_db}")
+    return added
+
+def combine_review_files(pattern="*reviews*.csv", output_file="combined_reviews.csv", write_corpus_file=True,
+                         search_db="review_search.db", app_id="groww"):
     """
     Combine multiple review CSV files into a single file
     
     Args:
         pattern (str): File pattern to match
         output_file (str): Output combined CSV filename
+        write_corpus_file (bool): Also write a memory-mapped .arrow corpus
+            next to the CSV for the web app
+        search_db (str): Full-text search index to add new reviews to;
+            None skips it
+        app_id (str): App the reviews are indexed under; the weekly pipeline
+            labels them under the same app profile id
     """
     
     # Find all CSV files matching the pattern
@@ -65,6 +104,17 @@ def combine_review_files(pattern="*reviews*.csv", output_file="combined_reviews.
     print(f"\nCombined {len(combined_df)} reviews from {len(csv_files)} files")
     print(f"Saved to {output_file}")
     
+    # Also save the cleaned corpus for memory-mapped reads by the web app,
+    # and index new reviews for search
+    if write_corpus_file or search_db:
+        from nodes.clean_and_bucket import clean_and_bucket
+
+        reviews_clean = clean_and_bucket(combined_df)
+        if write_corpus_file:
+            save_review_corpus(reviews_clean, output_file)
+        if search_db:
+            save_search_index(reviews_clean, search_db, app_id)
+    
     # Show summary
     print("\nSummary:")
     print(f"  Total reviews: {len(combined_df)}")
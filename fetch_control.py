@@ -0,0 +1,401 @@
+"""
+Shared fetch control for the scrapers: rate limiting, retries and a circuit
+breaker per review source.
+
+    from fetch_control import get_controller
+
+    response = get_controller().get(session, page_url, source="trustpilot",
+                                    is_challenge=looks_like_challenge)
+
+- Every request first takes a token from its host's bucket. The bucket
+  starts at the source's rate and adapts: each success adds a little rate up
+  to max_rate, and each 429 or challenge page halves it (AIMD).
+- 429 and 5xx responses, connection errors and timeouts are retried with
+  exponential backoff and full jitter, honouring Retry-After. Other errors
+  (404 / app not found, other 4xx, bad arguments) would fail the same way
+  again, so they raise FetchRejected at once and do not count against the
+  breaker.
+- Challenge (CAPTCHA) pages and requests that still fail after all retries
+  count against the source's circuit breaker. After BREAKER_THRESHOLD of
+  them in a row the source is paused for BREAKER_COOLDOWN seconds. After
+  that, one trial request decides whether it resumes.
+
+State is per process, shared by every scrape in it (e.g. all the apps a
+multi_app_runner worker handles). Retries, pauses, limiter waits and fetch
+latency are reported through metrics.py.
+"""
+
+import random
+import re
+import threading
+import time
+from urllib.parse import urlparse
+
+from metrics import (SCRAPE_CIRCUIT_OPENS, SCRAPE_PAGE_SECONDS, SCRAPE_RATE_LIMIT_WAIT,
+                     SCRAPE_RETRIES)
+
+# Requests per second per host: starting rate, ceiling and burst size
+SOURCE_LIMITS = {
+    "trustpilot": {"rate": 0.3, "max_rate": 1.0, "burst": 1},
+    "playstore": {"rate": 1.0, "max_rate": 2.0, "burst": 2},
+}
+DEFAULT_LIMITS = {"rate": 0.5, "max_rate": 1.0, "burst": 1}
+
+# Rate added per successful request, as a fraction of max_rate
+RATE_INCREASE = 0.05
+
+MAX_RETRIES = 4
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+
+BREAKER_THRESHOLD = 3
+BREAKER_COOLDOWN = 15 * 60
+
+class FetchError(Exception):
+    """
+    A fetch that failed after all retries.
+    """
+
+class FetchRejected(FetchError):
+    """
+    A permanent error (e.g. 404 or another 4xx); not retried.
+    """
+
+class ChallengeError(FetchError):
+    """
+    The source kept answering with a challenge (CAPTCHA) page and is paused.
+    """
+
+class CircuitOpenError(FetchError):
+    """
+    The source is paused after repeated challenges or failures.
+    """
+
+class TokenBucket:
+    """
+    Token bucket whose refill rate adapts to how the server responds.
+    """
+
+    def __init__(self, rate, max_rate=None, burst=1, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.max_rate = max_rate or rate
+        # Never slow below one request per minute
+        self.min_rate = min(rate, 1 / 60)
+        self.burst = burst
+        self.tokens = burst
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """
+        Take one token, waiting for it if needed.
+
+        Returns:
+            float: Seconds waited
+        """
+        waited = 0.0
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                wait = (1 - self.tokens) / self.rate
+            self.sleep(wait)
+            waited += wait
+
+    def speed_up(self):
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + RATE_INCREASE * self.max_rate)
+
+    def slow_down(self):
+        with self.lock:
+            self._refill()
+            self.rate = max(self.min_rate, self.rate / 2)
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker (closed -> open -> half-open).
+    """
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN, clock=time.monotonic):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+        self.lock = threading.Lock()
+
+    def allow(self):
+        """
+        Whether a request may go out now; after the cooldown lets one trial through.
+        """
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if self.trial_running or self.clock() - self.opened_at < self.cooldown:
+                return False
+            self.trial_running = True
+            return True
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def record_failure(self):
+        """
+        Returns:
+            bool: True if this failure opened the breaker
+        """
+        with self.lock:
+            self.failures += 1
+            reopened = self.trial_running
+            self.trial_running = False
+            if reopened or (self.opened_at is None and self.failures >= self.threshold):
+                self.opened_at = self.clock()
+                return True
+            return False
+
+    def release(self):
+        """
+        End a half-open trial without a verdict, e.g. after a 404 that says
+        nothing about the source's health.
+        """
+        with self.lock:
+            self.trial_running = False
+
+    def remaining(self):
+        with self.lock:
+            if self.opened_at is None:
+                return 0.0
+            return max(0.0, self.cooldown - (self.clock() - self.opened_at))
+
+class FetchController:
+    """
+    Per-host rate limiters and per-source circuit breakers.
+    """
+
+    def __init__(self, limits=None, max_retries=MAX_RETRIES, backoff_base=BACKOFF_BASE,
+                 backoff_max=BACKOFF_MAX, breaker_threshold=BREAKER_THRESHOLD,
+                 breaker_cooldown=BREAKER_COOLDOWN, clock=time.monotonic, sleep=time.sleep):
+        self.limits = limits or SOURCE_LIMITS
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.clock = clock
+        self.sleep = sleep
+        self.buckets = {}
+        self.breakers = {}
+        self.lock = threading.Lock()
+
+    def bucket(self, source, host):
+        with self.lock:
+            if host not in self.buckets:
+                limits = self.limits.get(source, DEFAULT_LIMITS)
+                self.buckets[host] = TokenBucket(limits["rate"], limits.get("max_rate"), limits.get("burst", 1),
+                                                 self.clock, self.sleep)
+            return self.buckets[host]
+
+    def breaker(self, source):
+        with self.lock:
+            if source not in self.breakers:
+                self.breakers[source] = CircuitBreaker(self.breaker_threshold, self.breaker_cooldown, self.clock)
+            return self.breakers[source]
+
+    def backoff(self, attempt, retry_after=None):
+        """
+        Full-jitter exponential backoff; never shorter than the server's Retry-After.
+        """
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_max))
+        return delay
+
+    def _run(self, source, host, attempt_fn, description):
+        breaker = self.breaker(source)
+        bucket = self.bucket(source, host)
+        # Checked once per fetch: retries of an admitted (or trial) fetch go ahead
+        if not breaker.allow():
+            raise CircuitOpenError(f"{source} paused for another {breaker.remaining():.0f}s")
+        outcome, error = None, None
+        for attempt in range(self.max_retries + 1):
+            SCRAPE_RATE_LIMIT_WAIT.observe(bucket.acquire(), source=source)
+
+            start = time.perf_counter()
+            try:
+                result, outcome, retry_after, error = attempt_fn()
+            except BaseException:
+                # Never leave a half-open trial running
+                breaker.release()
+                raise
+            SCRAPE_PAGE_SECONDS.observe(time.perf_counter() - start, source=source, outcome=outcome)
+
+            if outcome == "ok":
+                breaker.record_success()
+                bucket.speed_up()
+                return result
+            if outcome == "rejected":
+                breaker.release()
+                raise FetchRejected(f"{description}: {error}") from error
+            if outcome in ("rate_limited", "captcha"):
+                bucket.slow_down()
+            if outcome == "captcha" and breaker.record_failure():
+                SCRAPE_CIRCUIT_OPENS.inc(source=source)
+                raise ChallengeError(f"{source} keeps serving challenge pages; paused for {breaker.cooldown:.0f}s")
+            if attempt == self.max_retries:
+                break
+
+            delay = self.backoff(attempt, retry_after)
+            SCRAPE_RETRIES.inc(source=source, reason=outcome)
+            print(f"{description}: {outcome}{f' ({error})' if error else ''}, "
+                  f"retrying in {delay:.1f}s ({attempt + 1}/{self.max_retries})")
+            self.sleep(delay)
+
+        # Challenges were already counted above
+        if outcome != "captcha" and breaker.record_failure():
+            SCRAPE_CIRCUIT_OPENS.inc(source=source)
+        if outcome == "captcha":
+            raise ChallengeError(f"{description}: still a challenge page after {self.max_retries + 1} attempts")
+        raise FetchError(f"{description}: {outcome} after {self.max_retries + 1} attempts") from error
+
+    def get(self, session, url, source, timeout=10, is_challenge=None):
+        """
+        GET a page under the source's rate limit, retry policy and breaker.
+
+        Args:
+            session (requests.Session): Session to send the request with
+            url (str): Page URL
+            source (str): Review source, e.g. "trustpilot"
+            timeout (float): Per-request timeout in seconds
+            is_challenge (callable): Takes the page text, True for challenge pages
+
+        Returns:
+            requests.Response: Successful response
+
+        Raises:
+            FetchError: Retries exhausted (ChallengeError / CircuitOpenError if
+                the source is paused); FetchRejected for other 4xx responses
+                and invalid requests
+        """
+        import requests
+
+        def attempt():
+            try:
+                response = session.get(url, timeout=timeout)
+            except requests.RequestException as e:
+                return None, "error" if is_transient(e) else "rejected", None, e
+            if response.status_code == 429:
+                return None, "rate_limited", _retry_after(response), None
+            if response.status_code >= 500:
+                return None, "server_error", _retry_after(response), None
+            try:
+                response.raise_for_status()
+            except requests.HTTPError as e:
+                return None, "rejected", None, e
+            if is_challenge is not None and is_challenge(response.text):
+                return None, "captcha", None, None
+            return response, "ok", None, None
+
+        return self._run(source, urlparse(url).netloc, attempt, f"GET {url}")
+
+    def call(self, fn, *args, source, host=None, **kwargs):
+        """
+        Call a scraping library function (which does its own HTTP) under the
+        source's rate limit, retry policy and breaker. Exceptions that
+        is_transient accepts are retried; any other raises FetchRejected.
+
+        Returns:
+            The function's return value
+        """
+        def attempt():
+            try:
+                return fn(*args, **kwargs), "ok", None, None
+            except Exception as e:
+                return None, "error" if is_transient(e) else "rejected", None, e
+
+        return self._run(source, host or source, attempt, f"{source} {getattr(fn, '__name__', 'call')}")
+
+def is_transient(error):
+    """
+    Whether a failed request may succeed if retried: connection errors,
+    timeouts, 429 and 5xx responses (including google_play_scraper's
+    "Status code N" errors and its rate-limit PlayGatewayError).
+    """
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None) if response is not None else getattr(error, "code", None)
+    if not isinstance(status, int):
+        match = re.search(r"[Ss]tatus code (\d{3})", str(error))
+        status = int(match.group(1)) if match else None
+    if status is not None:
+        return status == 429 or status >= 500
+    if "PlayGatewayError" in str(error):
+        return True
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+
+    from urllib.error import HTTPError, URLError
+
+    if isinstance(error, URLError) and not isinstance(error, HTTPError):
+        return True
+    try:
+        import requests
+    except ImportError:
+        return False
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+def _retry_after(response):
+    value = response.headers.get("Retry-After")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        # HTTP-date form; fall back to plain backoff
+        return None
+
+_controller = None
+_controller_lock = threading.Lock()
+
+def get_controller():
+    """
+    This process's shared FetchController.
+    """
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            _controller = FetchController()
+        return _controller
+
+# Example usage
+if __name__ == "__main__":
+    # A flaky source: two dropped connections, then success
+    responses = iter([ConnectionError("reset"), ConnectionError("reset"), ["review 1", "review 2"]])
+
+    def flaky_fetch():
+        result = next(responses)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    controller = FetchController(limits={"example": {"rate": 5.0, "max_rate": 10.0, "burst": 1}},
+                                 backoff_base=0.1)
+    print(controller.call(flaky_fetch, source="example"))
+
+    # A permanent error is raised at once
+    def missing_app():
+        raise LookupError("App not found(404).")
+
+    try:
+        controller.call(missing_app, source="example")
+    except FetchRejected as e:
+        print(f"Not retried: {e}")
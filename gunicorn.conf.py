@@ -0,0 +1,10 @@
+"""
+Gunicorn settings; gunicorn reads this file automatically (Procfile: gunicorn app:app).
+"""
+
+def on_starting(server):
+    # Workers write their metrics to per-process files (metrics.py); start
+    # each server with empty counters instead of summing a previous run's files
+    from metrics import clear_metrics_dir
+
+    clear_metrics_dir()
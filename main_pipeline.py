@@ -2,74 +2,212 @@
 Main pipeline that connects all nodes for the App Review Insights Analyzer.
 """
 
-import pandas as pd
 import sys
 import os
 
 # Add the current directory to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from nodes.upload_reviews import upload_reviews
-from nodes.clean_and_bucket import clean_and_bucket
-from nodes.filter_target_week import filter_target_week
-from nodes.llm_tag_theme_sentiment import llm_tag_theme_sentiment
-from nodes.theme_stats import theme_stats
-from nodes.llm_weekly_pulse import llm_weekly_pulse
-from nodes.parse_email_json import parse_email_json
-from nodes.send_weekly_email import send_weekly_email
-
-def run_app_review_analysis(csv_file_path, target_week_start, email_config=None):
+def run_app_review_analysis(csv_file_path, target_week_start, email_config=None, app_profile=None,
+                            snapshot_dir="snapshots", dedup=True, summary_db="summaries.db",
+                            search_db="review_search.db", node_hook=None, ingest_source="pipeline"):
     """
     Run the complete app review analysis pipeline.
     
     Args:
         csv_file_path (str): Path to the CSV file containing reviews
-        target_week_start (str): Target week start date in format "YYYY-MM-DD"
+        target_week_start (str): Target week start date in format "YYYY-MM-DD";
+            with a profile granularity other than "week", any date in the
+            hour, day or month to analyze (e.g. "2025-11" for November)
         email_config (dict): Optional configuration for sending email
+        app_profile (dict): Optional app profile (see app_profiles.py) with the
+            app name, theme legend, tagging backend and report granularity;
+            defaults to Groww
+        snapshot_dir (str): Directory for weekly snapshots used for the
+            week-over-week diff; None disables snapshots
+        dedup (bool): Tag one representative per near-duplicate cluster and
+            copy its labels to the other cluster members
+        summary_db (str): SQLite file for the precomputed weekly summary rows
+            read by the web pages; None disables them
+        search_db (str): Full-text search index that new reviews and this
+            week's labels are added to; None disables it
+        node_hook (callable): Optional node_hook(node_name, node_fn, *args, **kwargs)
+            that runs each transform node in place of a direct call, e.g. to
+            record or time it (see pipeline_replay.py)
+        ingest_source (str): source label for the reviews_ingested_total
+            metric, so callers (web upload, corpus, scheduler, CLI) can be
+            told apart
         
     Returns:
         dict: Results from each step of the pipeline
     """
+    # Imported here rather than at module level so that importing this module
+    # (e.g. from run_weekly_job) stays cheap until the pipeline actually runs.
+    import pandas as pd
+    from nodes.upload_reviews import upload_reviews
+    from nodes.clean_and_bucket import clean_and_bucket
+    from nodes.filter_target_week import filter_bucket, filter_target_week
+    from nodes.time_buckets import bucket_label
+    from nodes.llm_tag_theme_sentiment import llm_tag_theme_sentiment
+    from nodes.theme_stats import theme_stats
+    from nodes.llm_weekly_pulse import llm_weekly_pulse
+    from nodes.parse_email_json import parse_email_json
+    from nodes.send_weekly_email import send_weekly_email
+    from nodes.weekly_snapshot import load_previous_snapshot, save_weekly_snapshot
+    from nodes.theme_diff import theme_diff
+    from nodes.dedup_reviews import dedup_reviews, broadcast_labels
+    from nodes.sample_reviews import sample_reviews
+    from nodes.summary_tables import save_week_summary
+    from nodes.review_search import index_reviews, update_labels
+    from metrics import EMAILS_SENT, NODE_SECONDS, REVIEWS_INGESTED, REVIEWS_TAGGED
+    
+    app_profile = app_profile or {}
+    app_id = app_profile.get("app_id", "groww")
+    app_name = app_profile.get("app_name", "Groww")
+    theme_keywords = app_profile.get("theme_keywords")
+    tagging_backend = app_profile.get("tagging_backend", "llm")
+    tagging_workers = app_profile.get("tagging_workers", 1)
+    tagging_sample_size = app_profile.get("tagging_sample_size", 0)
+    granularity = app_profile.get("granularity", "week")
+    
+    # Daily, hourly and monthly runs report on the bucket's label (e.g.
+    # "2025-11") and keep their snapshots and summary rows apart from the
+    # weekly ones
+    if granularity == "week":
+        period = target_week_start
+        snapshot_key, summary_key = app_id, app_id
+    else:
+        period = bucket_label(target_week_start, granularity)
+        snapshot_key = os.path.join(app_id, granularity)
+        summary_key = f"{app_id}:{granularity}"
+    
+    def run_node(name, fn, *args, **kwargs):
+        with NODE_SECONDS.time(node=name):
+            if node_hook is None:
+                return fn(*args, **kwargs)
+            return node_hook(name, fn, *args, **kwargs)
     
     print("Starting App Review Insights Analysis Pipeline")
     print("=" * 50)
     
     # Node 1: Upload Reviews
     print("Node 1: Uploading reviews...")
-    reviews_raw = upload_reviews(csv_file_path)
+    reviews_raw = run_node("upload_reviews", upload_reviews, csv_file_path)
     print(f"Uploaded {len(reviews_raw)} reviews")
+    REVIEWS_INGESTED.inc(len(reviews_raw), source=ingest_source)
     
     # Node 2: Clean + Add Week Bucket
     print("\nNode 2: Cleaning and bucketing reviews...")
-    reviews_clean = clean_and_bucket(reviews_raw)
+    if granularity == "week":
+        reviews_clean = run_node("clean_and_bucket", clean_and_bucket, reviews_raw)
+    else:
+        reviews_clean = run_node("clean_and_bucket", clean_and_bucket, reviews_raw, (granularity,))
     print(f"Cleaned {len(reviews_clean)} reviews")
     
-    # Node 3: Pick the Week to Analyze
-    print(f"\nNode 3: Filtering for week starting {target_week_start}...")
-    reviews_week = filter_target_week(reviews_clean, target_week_start)
-    print(f"Filtered to {len(reviews_week)} reviews for target week")
+    # Node 2b: Python – Index New Reviews for Search
+    if search_db:
+        print("\nNode 2b: Updating search index...")
+        print(f"Indexed {index_reviews(reviews_clean, search_db, app_id)} new reviews")
+    
+    # Node 3: Pick the Week (or hour, day, month) to Analyze
+    if granularity == "week":
+        print(f"\nNode 3: Filtering for week starting {target_week_start}...")
+        reviews_week = run_node("filter_target_week", filter_target_week, reviews_clean, target_week_start)
+    else:
+        print(f"\nNode 3: Filtering for {granularity} {period}...")
+        reviews_week = run_node("filter_target_week", filter_bucket, reviews_clean, period, granularity)
+    print(f"Filtered to {len(reviews_week)} reviews for target {granularity}")
+    
+    # Node 3b: Python – Near-Duplicate & Template Spam Detection
+    if dedup:
+        print("\nNode 3b: Detecting near-duplicate reviews...")
+        reviews_week = run_node("dedup_reviews", dedup_reviews, reviews_week, group_by=["rating"])
+        representatives = reviews_week[reviews_week["is_representative"]]
+        print(f"Found {len(representatives)} distinct reviews "
+              f"({len(reviews_week) - len(representatives)} near-duplicates, "
+              f"{int(reviews_week['is_template_spam'].sum())} template spam)")
+    else:
+        representatives = reviews_week
+    
+    # Node 3c: Python – Stratified Review Sample (only for weeks above tagging_sample_size)
+    sampled = bool(tagging_sample_size) and len(representatives) > tagging_sample_size
+    if sampled:
+        print("\nNode 3c: Sampling reviews to tag...")
+        representatives = run_node("sample_reviews", sample_reviews, representatives, tagging_sample_size)
+        sampling = representatives.attrs["sampling"]
+        print(f"Tagging a stratified sample of {sampling['sampled']} of {sampling['population']} reviews "
+              f"({sampling['strata']} strata by {', '.join(sampling['strata_columns']) or 'nothing'})")
     
     # Node 4: LLM – Tag Theme + Sentiment Per Review
     print("\nNode 4: Tagging themes and sentiment...")
-    reviews_week_tagged = llm_tag_theme_sentiment(reviews_week)
-    print("Tagged all reviews with themes and sentiment")
+    reviews_week_tagged = run_node("llm_tag_theme_sentiment", llm_tag_theme_sentiment,
+                                   representatives, app_name, theme_keywords,
+                                   backend=tagging_backend, workers=tagging_workers)
+    tagging_stats = reviews_week_tagged.attrs.get("tagging_stats")
+    if "tagged_by" in reviews_week_tagged.columns:
+        for tagged_by, count in reviews_week_tagged["tagged_by"].value_counts().items():
+            REVIEWS_TAGGED.inc(int(count), tagged_by=tagged_by)
+    else:
+        REVIEWS_TAGGED.inc(len(reviews_week_tagged), tagged_by=tagging_backend)
+    if dedup and not sampled:
+        reviews_week_tagged = run_node("broadcast_labels", broadcast_labels, reviews_week_tagged, reviews_week)
+    if sampled:
+        print("Tagged the sample; theme stats are estimates with confidence intervals")
+    else:
+        print("Tagged all reviews with themes and sentiment")
+    if search_db:
+        labeled = reviews_week_tagged
+        if sampled and dedup:
+            # Near-duplicates of sampled reviews share their labels; reviews
+            # outside the sample stay unlabeled in the search index
+            labeled = broadcast_labels(reviews_week_tagged, reviews_week)
+            labeled = labeled[labeled["theme"].notna()]
+        update_labels(labeled, search_db, app_id)
     
     # Node 5: Python – Aggregate Theme Stats
     print("\nNode 5: Aggregating theme statistics...")
-    themes_week_stats = theme_stats(reviews_week_tagged)
+    themes_week_stats = run_node("theme_stats", theme_stats, reviews_week_tagged)
     print("Aggregated theme statistics")
     
+    # Node 5b: Python – Week-over-Week Theme Diff
+    themes_week_diff = None
+    if snapshot_dir:
+        print("\nNode 5b: Comparing with previous week snapshot...")
+        previous_snapshot = load_previous_snapshot(period, snapshot_dir, snapshot_key)
+        themes_week_diff = run_node("theme_diff", theme_diff, themes_week_stats, previous_snapshot)
+        if previous_snapshot is None:
+            print("No previous snapshot found")
+        else:
+            print(f"Compared with {granularity} of {previous_snapshot['week_start']}")
+    
     # Node 6: LLM – Build Weekly One-Page Note (≤250 words)
     print("\nNode 6: Generating weekly pulse note...")
-    weekly_note_and_email = llm_weekly_pulse(themes_week_stats, reviews_week_tagged, target_week_start)
+    weekly_note_and_email = run_node(
+        "llm_weekly_pulse", llm_weekly_pulse,
+        themes_week_stats, reviews_week_tagged, period, app_name, themes_week_diff,
+        mode=app_profile.get("pulse_mode", "auto"), granularity=granularity
+    )
     print("Generated weekly pulse note and email content")
     
+    if snapshot_dir:
+        snapshot_file = save_weekly_snapshot(
+            themes_week_stats, reviews_week_tagged, period, snapshot_dir, snapshot_key
+        )
+        print(f"Saved weekly snapshot to {snapshot_file}")
+    
     # Node 7: Extract JSON (Optional Python Helper)
     print("\nNode 7: Parsing email JSON...")
     email_df = pd.DataFrame([{"content": weekly_note_and_email}])
-    parsed_email = parse_email_json(email_df)
+    parsed_email = run_node("parse_email_json", parse_email_json, email_df)
     print("Parsed email components")
     
+    # Node 7b: Python – Materialize Weekly Summary Tables
+    if summary_db:
+        print("\nNode 7b: Storing weekly summary tables...")
+        save_week_summary(summary_key, period, themes_week_stats, reviews_week_tagged,
+                          parsed_email, total_reviews=len(reviews_raw), db_path=summary_db)
+        print(f"Stored weekly summaries in {summary_db}")
+    
     # Node 8: Send Email
     if email_config:
         print("\nNode 8: Sending weekly email...")
@@ -88,6 +226,7 @@ def run_app_review_analysis(csv_file_path, target_week_start, email_config=None)
                     sender_email=email_config.get('sender_email'),
                     sender_password=email_config.get('sender_password')
                 )
+                EMAILS_SENT.inc(outcome="sent" if success else "failed")
                 if not success:
                     raise Exception("Failed to send email. Check logs for details.")
             else:
@@ -102,7 +241,9 @@ def run_app_review_analysis(csv_file_path, target_week_start, email_config=None)
         "reviews_clean": reviews_clean,
         "reviews_week": reviews_week,
         "reviews_week_tagged": reviews_week_tagged,
+        "tagging_stats": tagging_stats,
         "themes_week_stats": themes_week_stats,
+        "themes_week_diff": themes_week_diff,
         "weekly_note_and_email": weekly_note_and_email,
         "parsed_email": parsed_email
     }
@@ -115,6 +256,8 @@ def run_app_review_analysis(csv_file_path, target_week_start, email_config=None)
 
 # Example usage
 if __name__ == "__main__":
+    import pandas as pd
+
     # Create sample data for demonstration
     sample_data = {
         "date": ["2025-11-17", "2025-11-18", "2025-11-19", "2025-11-20", "2025-11-21"],
@@ -140,9 +283,12 @@ if __name__ == "__main__":
     sample_df.to_csv("sample_reviews.csv", index=False)
     print("Created sample_reviews.csv for demonstration")
     
-    # Run the pipeline
+    # Run the pipeline (--profile saves a flamegraph and hotspot summary to profiles/)
+    from profiling import profile_if_requested
+
     target_week = "2025-11-17"
-    results = run_app_review_analysis("sample_reviews.csv", target_week)
+    with profile_if_requested(f"main_pipeline-{target_week}"):
+        results = run_app_review_analysis("sample_reviews.csv", target_week)
     
     # Display final results
     print("\nFINAL RESULTS:")
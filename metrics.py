@@ -0,0 +1,422 @@
+"""
+Prometheus-style metrics shared by the web app, the pipeline and the scrapers.
+
+Each process keeps its counters and histograms in memory and periodically
+writes them to <METRICS_DIR>/<pid>-<random>.json. GET /metrics (app.py) sums
+the files of every process, so all gunicorn workers and any pipeline runs that
+share the directory (e.g. run_weekly_job on the same host) appear in one
+scrape. When a process exits, or a scrape finds a file whose process is gone,
+its values are added to <METRICS_DIR>/aggregate.json and its file is removed,
+so counters never go backwards and the directory does not grow with every
+CLI run. The random suffix keeps a process that reuses a PID from replacing
+an exited process's file. gunicorn.conf.py clears the directory when the
+server starts.
+
+    from metrics import NODE_SECONDS, REVIEWS_INGESTED
+
+    with NODE_SECONDS.time(node="theme_stats"):
+        ...
+    REVIEWS_INGESTED.inc(len(reviews_raw), source="pipeline")
+
+Only the standard library is used, so importing this module is cheap.
+"""
+
+import atexit
+import json
+import math
+import os
+import secrets
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+METRICS_DIR = os.environ.get(
+    "METRICS_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "metrics_data")
+)
+
+# Seconds between writes of this process's values to METRICS_DIR
+FLUSH_INTERVAL = 1.0
+
+# Summed values of exited processes, and the lock guarding merges into it
+AGGREGATE_FILE = "aggregate.json"
+LOCK_FILE = "metrics.lock"
+
+# Request latency buckets (seconds)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Pipeline node and scrape buckets; tagging a large week can take minutes
+SLOW_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+class _Registry:
+    """
+    This process's metrics and the background thread that writes them out.
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.pid = None
+        self.filename = None
+        self.dirty = False
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def changed(self):
+        """
+        Mark values as changed; starts the flush thread in a new process
+        (including a worker forked after this module was imported).
+        """
+        pid = os.getpid()
+        if self.pid != pid:
+            if self.pid is not None:
+                # Forked child: drop the values inherited from the parent
+                for metric in self.metrics.values():
+                    metric.values.clear()
+            self.pid = pid
+            self.filename = f"{pid}-{secrets.token_hex(4)}.json"
+            thread = threading.Thread(target=self._flush_loop, name="metrics-flush", daemon=True)
+            thread.start()
+        self.dirty = True
+
+    def _flush_loop(self):
+        pid = os.getpid()
+        while self.pid == pid:
+            time.sleep(FLUSH_INTERVAL)
+            if self.dirty:
+                self.flush()
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                name: {"type": metric.type, "help": metric.help, "buckets": list(getattr(metric, "buckets", ())),
+                       "values": [[list(labels), value] for labels, value in metric.values.items()]}
+                for name, metric in self.metrics.items() if metric.values
+            }
+
+    def flush(self):
+        """
+        Write this process's values to METRICS_DIR/<pid>-<random>.json.
+        """
+        if self.pid != os.getpid():
+            return
+        with self.flush_lock:
+            self.dirty = False
+            data = self.snapshot()
+            try:
+                os.makedirs(METRICS_DIR, exist_ok=True)
+                _write_json(os.path.join(METRICS_DIR, self.filename), data)
+            except OSError as e:
+                print(f"Could not write metrics: {e}")
+
+    def retire(self):
+        """
+        At exit: add this process's values to the aggregate file and remove
+        its own file.
+        """
+        if self.pid != os.getpid():
+            return
+        with self.flush_lock:
+            data = self.snapshot()
+            self.pid = None
+            try:
+                os.makedirs(METRICS_DIR, exist_ok=True)
+                with _dir_lock(METRICS_DIR):
+                    aggregate_path = os.path.join(METRICS_DIR, AGGREGATE_FILE)
+                    aggregate = _merge(_merge({}, _read_json(aggregate_path)), data)
+                    _write_json(aggregate_path, _to_file_format(aggregate))
+                    _remove(os.path.join(METRICS_DIR, self.filename))
+            except OSError as e:
+                print(f"Could not write metrics: {e}")
+
+def _write_json(path, data):
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(f"{path}.tmp", path)
+
+def _read_json(path):
+    """
+    A metrics file's contents, or {} if it is missing or being replaced.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+@contextmanager
+def _dir_lock(metrics_dir):
+    """
+    Exclusive lock on the directory, so a retiring process is never counted
+    both in its own file and in the aggregate.
+    """
+    with open(os.path.join(metrics_dir, LOCK_FILE), "a+b") as f:
+        if os.name == "posix":
+            import fcntl
+
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            import msvcrt
+
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if os.name == "posix":
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+def _process_alive(pid):
+    """
+    Whether a process with this PID exists. Only checked on POSIX (os.kill
+    terminates the process on Windows); elsewhere files are only merged by
+    the exiting process itself.
+    """
+    if os.name != "posix":
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def _merge(merged, data):
+    """
+    Add one file's values into merged (metric name -> {"type", "help",
+    "buckets", "values": {labels tuple: value}}).
+    """
+    for metric_name, metric in data.items():
+        target = merged.setdefault(metric_name, {
+            "type": metric["type"], "help": metric["help"], "buckets": metric["buckets"], "values": {},
+        })
+        for labels, value in metric["values"]:
+            key = tuple(labels)
+            if metric["type"] == "histogram":
+                current = target["values"].get(key)
+                target["values"][key] = value if current is None else [a + b for a, b in zip(current, value)]
+            else:
+                target["values"][key] = target["values"].get(key, 0) + value
+    return merged
+
+def _to_file_format(merged):
+    return {
+        name: {"type": metric["type"], "help": metric["help"], "buckets": metric["buckets"],
+               "values": [[list(labels), value] for labels, value in metric["values"].items()]}
+        for name, metric in merged.items()
+    }
+
+_registry = _Registry()
+atexit.register(_registry.retire)
+
+class _Metric:
+    type = None
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self.values = {}
+        _registry.register(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} takes labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with _registry.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+        _registry.changed()
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with _registry.lock:
+            # [per-bucket counts..., +Inf count, sum]
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            else:
+                state[len(self.buckets)] += 1
+            state[-1] += value
+        _registry.changed()
+
+    @contextmanager
+    def time(self, **labels):
+        """
+        Observe the duration of the with-block, also when it raises.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+# Web app
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Flask request latency by route", ("route", "method", "status")
+)
+CACHE_REQUESTS = Counter(
+    "analysis_cache_requests_total", "Analysis cache lookups by cache and result", ("cache", "result")
+)
+
+# Pipeline
+NODE_SECONDS = Histogram(
+    "pipeline_node_duration_seconds", "Run time of each pipeline node", ("node",), SLOW_BUCKETS
+)
+REVIEWS_INGESTED = Counter("reviews_ingested_total", "Reviews read into the pipeline", ("source",))
+REVIEWS_TAGGED = Counter("reviews_tagged_total", "Reviews tagged with theme and sentiment", ("tagged_by",))
+EMAILS_SENT = Counter("emails_sent_total", "Weekly emails by outcome", ("outcome",))
+
+# Scheduler service
+SCHEDULER_STAGE_SECONDS = Histogram(
+    "scheduler_stage_duration_seconds", "Run time of each scheduler stage", ("stage", "status"), SLOW_BUCKETS
+)
+SCHEDULER_RUN_SECONDS = Histogram(
+    "scheduler_run_duration_seconds", "Run time of whole scheduler runs", ("status",), SLOW_BUCKETS
+)
+
+# Streaming ingest
+STREAM_REJECTED = Counter("stream_ingest_rejected_total", "Ingest batches refused, by reason", ("reason",))
+STREAM_LAG_SECONDS = Histogram(
+    "stream_ingest_lag_seconds", "Time from ingest until a review is tagged", (), SLOW_BUCKETS
+)
+SPIKE_ALERTS = Counter("theme_spike_alerts_total", "Theme spikes flagged by the stream, by kind", ("kind",))
+
+# Scrapers
+SCRAPE_PAGE_SECONDS = Histogram(
+    "scraper_page_fetch_duration_seconds", "Time to fetch one review page", ("source", "outcome"), SLOW_BUCKETS
+)
+SCRAPE_CAPTCHA_STOPS = Counter(
+    "scraper_captcha_stops_total", "Scrapes stopped by a CAPTCHA or challenge page", ("source",)
+)
+SCRAPE_RETRIES = Counter("scraper_retries_total", "Fetches retried after an error, by reason", ("source", "reason"))
+SCRAPE_CIRCUIT_OPENS = Counter(
+    "scraper_circuit_opens_total", "Times a source was paused after repeated challenges or failures", ("source",)
+)
+SCRAPE_RATE_LIMIT_WAIT = Histogram(
+    "scraper_rate_limit_wait_seconds", "Time a fetch waited for the rate limiter", ("source",), SLOW_BUCKETS
+)
+SCRAPE_SAMPLE_FALLBACKS = Counter(
+    "scraper_sample_fallbacks_total", "Scrapes that failed and were replaced by sample reviews", ("source",)
+)
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def _format_labels(pairs):
+    if not pairs:
+        return ""
+    escaped = (
+        f'{name}="' + str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for name, value in pairs
+    )
+    return "{" + ",".join(escaped) + "}"
+
+def collect(metrics_dir=None):
+    """
+    Sum the values written by every process, first folding the files of
+    processes that have exited into the aggregate file.
+
+    Returns:
+        dict: metric name -> {"type", "help", "buckets", "values": {labels: value}}
+    """
+    _registry.flush()
+    metrics_dir = metrics_dir or METRICS_DIR
+    if not os.path.isdir(metrics_dir):
+        return {}
+    with _dir_lock(metrics_dir):
+        aggregate_path = os.path.join(metrics_dir, AGGREGATE_FILE)
+        aggregate = _merge({}, _read_json(aggregate_path))
+        live = []
+        dead = []
+        for name in sorted(os.listdir(metrics_dir)):
+            if not name.endswith(".json") or name == AGGREGATE_FILE:
+                continue
+            pid = name[:-len(".json")].split("-")[0]
+            if pid.isdigit() and int(pid) != os.getpid() and not _process_alive(int(pid)):
+                dead.append(name)
+            else:
+                live.append(name)
+        if dead:
+            for name in dead:
+                _merge(aggregate, _read_json(os.path.join(metrics_dir, name)))
+            _write_json(aggregate_path, _to_file_format(aggregate))
+            for name in dead:
+                _remove(os.path.join(metrics_dir, name))
+        merged = aggregate
+        for name in live:
+            # A file replaced or removed while reading arrives next scrape
+            _merge(merged, _read_json(os.path.join(metrics_dir, name)))
+    return merged
+
+def render(metrics_dir=None):
+    """
+    All processes' metrics in the Prometheus text exposition format.
+    """
+    label_names = {name: metric.label_names for name, metric in _registry.metrics.items()}
+    lines = []
+    for name, metric in sorted(collect(metrics_dir).items()):
+        names = label_names.get(name, ())
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        for key, value in sorted(metric["values"].items()):
+            pairs = list(zip(names, key))
+            if metric["type"] != "histogram":
+                lines.append(f"{name}{_format_labels(pairs)} {_format_value(value)}")
+                continue
+            cumulative = 0
+            for bound, count in zip(list(metric["buckets"]) + [math.inf], value[:-1]):
+                cumulative += count
+                lines.append(f"{name}_bucket{_format_labels(pairs + [('le', _format_value(bound))])} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(pairs)} {_format_value(float(value[-1]))}")
+            lines.append(f"{name}_count{_format_labels(pairs)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+def clear_metrics_dir(metrics_dir=None):
+    """
+    Remove all stored values; call once when the server starts.
+    """
+    metrics_dir = metrics_dir or METRICS_DIR
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+# Example usage
+if __name__ == "__main__":
+    METRICS_DIR = tempfile.mkdtemp()
+    with NODE_SECONDS.time(node="example"):
+        time.sleep(0.02)
+    REVIEWS_INGESTED.inc(120, source="example")
+    print(render())
+    shutil.rmtree(METRICS_DIR)
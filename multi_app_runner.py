@@ -0,0 +1,202 @@
+"""
+Configuration-driven weekly job over a portfolio of apps.
+
+Each app in the config (see app_profiles.py) is scraped and analysed in its
+own worker process, with its own theme legend, sources and recipients. Worker
+processes keep one HTTP session for all the apps they handle, and scrape
+results are cached on disk per app/source/day so reruns and retries within a
+day don't scrape again.
+
+Usage:
+    python multi_app_runner.py --apps apps.json [--workers 4] [--week 2025-11-17] [--profile[=cprofile]]
+    python multi_app_runner.py --apps apps.json --granularity month   # last month's report for every app
+    python run_weekly_job.py --apps apps.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import nullcontext
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_OUTPUT_ROOT = os.path.join(BASE_DIR, "reports")
+DEFAULT_CACHE_DIR = os.path.join(BASE_DIR, "scrape_cache")
+
+# Per-process HTTP session, created on first use and shared by every app the
+# worker process analyses.
+_SESSION = None
+
+def get_session():
+    global _SESSION
+    if _SESSION is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        _SESSION = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=8)
+        _SESSION.mount("https://", adapter)
+        _SESSION.mount("http://", adapter)
+    return _SESSION
+
+def cached_fetch_reviews(profile, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Fetch an app's reviews, reusing today's cached scrape if present.
+
+    Args:
+        profile (dict): App profile
+        cache_dir (str): Directory shared by all worker processes
+
+    Returns:
+        pandas.DataFrame: Combined reviews for the app
+    """
+    import pandas as pd
+    from run_weekly_job import enabled_sources, fetch_reviews
+
+    os.makedirs(cache_dir, exist_ok=True)
+    sources = enabled_sources(profile)
+    cache_path = os.path.join(
+        cache_dir, f"{profile['app_id']}_{'-'.join(sorted(sources))}_{datetime.now().strftime('%Y-%m-%d')}.csv"
+    )
+    if os.path.exists(cache_path):
+        print(f"  Using cached reviews for {profile['app_id']}: {cache_path}")
+        return pd.read_csv(cache_path)
+
+    session = get_session() if "trustpilot" in sources else None
+    combined_df = fetch_reviews(profile, session=session)
+    # Only complete scrapes are cached, so a later run retries a failed source
+    if combined_df.empty or combined_df.attrs.get("failed_sources"):
+        return combined_df
+
+    # Write to a temp file first so a concurrent reader never sees a partial cache
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    combined_df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, cache_path)
+    return combined_df
+
+def run_app(profile, target_week_start, output_root=DEFAULT_OUTPUT_ROOT, send_email=True, profile_mode=None):
+    """
+    Scrape and analyse one app, writing its report under output_root/<app_id>/.
+
+    Runs inside a worker process. target_week_start None analyzes the last
+    completed period of the profile's granularity. With profile_mode
+    ("sample" or "cprofile") the pipeline run is profiled (see profiling.py).
+
+    Returns:
+        dict: Summary of the app's run
+    """
+    from main_pipeline import run_app_review_analysis
+    from profiling import profiled
+    from run_weekly_job import build_email_config, last_completed_bucket
+
+    started = time.perf_counter()
+    # Without --week, each app reports on its own granularity's last completed bucket
+    target_week_start = target_week_start or last_completed_bucket(profile["granularity"])
+    app_dir = os.path.join(output_root, profile["app_id"])
+    os.makedirs(app_dir, exist_ok=True)
+
+    combined_df = cached_fetch_reviews(profile)
+    if combined_df.empty:
+        raise RuntimeError(f"No reviews could be fetched for {profile['app_id']}")
+    failed_sources = combined_df.attrs.get("failed_sources", [])
+    csv_path = os.path.join(app_dir, "combined_reviews.csv")
+    combined_df[['date', 'rating', 'review_text', 'review_title']].to_csv(csv_path, index=False)
+
+    email_config = None
+    if send_email:
+        email_config = build_email_config(profile.get("recipients"), profile.get("recipients_env"))
+        if email_config is None:
+            print(f"  ! No recipients for {profile['app_id']}; set 'recipients' or 'recipients_env' "
+                  f"in its profile. Not sending its report.")
+    run_profile = (profiled(f"{profile['app_id']}-{target_week_start}", mode=profile_mode)
+                   if profile_mode else nullcontext())
+    with run_profile:
+        results = run_app_review_analysis(csv_path, target_week_start, email_config, profile)
+
+    parsed_email = results["parsed_email"]
+    note_path = os.path.join(app_dir, f"weekly_note_{target_week_start}.md")
+    with open(note_path, "w", encoding="utf-8") as f:
+        f.write(parsed_email.iloc[0]["weekly_note_md"])
+    results["themes_week_stats"].to_csv(
+        os.path.join(app_dir, f"theme_stats_{target_week_start}.csv"), index=False
+    )
+
+    return {
+        "app_id": profile["app_id"],
+        "status": "success",
+        "reviews_total": len(results["reviews_raw"]),
+        "reviews_week": len(results["reviews_week"]),
+        "note_path": note_path,
+        "emailed": email_config is not None,
+        "failed_sources": failed_sources,
+        "duration_s": round(time.perf_counter() - started, 2),
+    }
+
+def run_apps(profiles, target_week_start, max_workers=None, output_root=DEFAULT_OUTPUT_ROOT,
+             send_email=True, profile_mode=None):
+    """
+    Analyse many apps in parallel, one process per app.
+
+    A failure in one app is reported in its summary and does not stop the others.
+
+    Returns:
+        list: Per-app summaries in config order
+    """
+    max_workers = max_workers or min(len(profiles), os.cpu_count() or 1)
+    summaries = {}
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(run_app, profile, target_week_start, output_root, send_email, profile_mode): profile["app_id"]
+            for profile in profiles
+        }
+        for future in as_completed(futures):
+            app_id = futures[future]
+            try:
+                summaries[app_id] = future.result()
+            except Exception as e:
+                summaries[app_id] = {"app_id": app_id, "status": "failed", "error": str(e)}
+            print(f"[{app_id}] {summaries[app_id]['status']}")
+
+    return [summaries[profile["app_id"]] for profile in profiles]
+
+def main():
+    from app_profiles import load_app_profiles
+    from nodes.time_buckets import GRANULARITIES
+
+    parser = argparse.ArgumentParser(description="Run the weekly review job for many apps")
+    parser.add_argument("--apps", default="apps.json", help="Path to the app config JSON")
+    parser.add_argument("--workers", type=int, help="Number of worker processes")
+    parser.add_argument("--week", help="Target week start (YYYY-MM-DD), or any date in the target hour, day "
+                                       "or month; defaults to the last completed one")
+    parser.add_argument("--granularity", choices=GRANULARITIES,
+                        help="Report period for every app, overriding the profiles' granularity")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT_ROOT, help="Report output directory")
+    parser.add_argument("--no-email", action="store_true", help="Do not send report emails")
+    parser.add_argument("--profile", nargs="?", const="sample", choices=["sample", "cprofile"],
+                        help="Profile each app's pipeline run and save the results to profiles/")
+    args = parser.parse_args()
+
+    profiles = load_app_profiles(args.apps)
+    if args.granularity:
+        profiles = [dict(profile, granularity=args.granularity) for profile in profiles]
+    target_week_start = args.week
+
+    print(f"Starting weekly job for {len(profiles)} apps ({target_week_start or 'last completed period'})")
+    print("=" * 40)
+
+    summaries = run_apps(profiles, target_week_start, args.workers, args.output, not args.no_email,
+                         args.profile)
+
+    print("\nSummary:")
+    print(json.dumps(summaries, indent=2))
+
+    if any(s["status"] != "success" for s in summaries):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
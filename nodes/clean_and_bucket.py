@@ -8,12 +8,18 @@ Output: reviews_clean
 
 import pandas as pd
 
-def clean_and_bucket(input_df):
+from nodes.review_schema import compact_columns
+from nodes.time_buckets import bucket_labels, bucket_starts, check_granularity
+
+def clean_and_bucket(input_df, granularities=()):
     """
     Clean raw app store reviews and add week bucket information.
     
     Args:
         input_df (pandas.DataFrame): DataFrame containing raw reviews
+        granularities (tuple): Extra buckets to add as typed datetime64
+            columns, e.g. ("day", "month") adds day_start and month_start
+            (see time_buckets.py)
         
     Returns:
         pandas.DataFrame: Cleaned DataFrame with week bucket information
@@ -29,19 +35,21 @@ def clean_and_bucket(input_df):
     df["date"] = pd.to_datetime(df["date"], errors="coerce")
     df = df.dropna(subset=["date"])
 
-    df["week_start"] = df["date"] - pd.to_timedelta(df["date"].dt.weekday, unit="D")
-    df["week_start"] = df["week_start"].dt.strftime("%Y-%m-%d")
+    # week_start stays the "YYYY-MM-DD" label the weekly pipeline keys on
+    df["week_start"] = bucket_labels(bucket_starts(df["date"], "week"), "week")
+    for granularity in granularities:
+        check_granularity(granularity)
+        df[f"{granularity}_start"] = bucket_starts(df["date"], granularity)
 
     title_col = "review_title" if "review_title" in df.columns else None
 
-    def combine(row):
-        t = row[title_col] if title_col and pd.notna(row[title_col]) else ""
-        r = row["review_text"] if pd.notna(row["review_text"]) else ""
-        return f"{t} - {r}".strip(" -")
-
-    df["full_text"] = df.apply(combine, axis=1)
+    # "<title> - <text>", dropping the separator when either part is missing
+    titles = df[title_col].fillna("").astype(str) if title_col else ""
+    texts = df["review_text"].fillna("").astype(str)
+    df["full_text"] = (titles + " - " + texts).str.strip(" -")
 
-    return df
+    # Labels as categoricals and ratings as int8 (see review_schema.py)
+    return compact_columns(df)
 
 # Example usage
 if __name__ == "__main__":
@@ -64,6 +72,7 @@ if __name__ == "__main__":
     }
     
     input_df = pd.DataFrame(sample_data)
-    output_df = clean_and_bucket(input_df)
+    output_df = clean_and_bucket(input_df, granularities=("day", "month"))
     print("Cleaned and bucketed reviews:")
-    print(output_df)
\ No newline at end of file
+    print(output_df)
+    print(output_df.dtypes)
\ No newline at end of file
@@ -0,0 +1,250 @@
+"""
+Node: Python – Near-Duplicate & Template Spam Detection
+Node name: Dedup_Reviews
+Type: Python Transform
+Input: reviews_week (or reviews_clean)
+Output columns: dup_cluster, is_representative, dup_count, is_template_spam
+
+Reviews are normalized and exact duplicates collapsed first. The remaining
+unique texts are shingled into character n-grams, summarized with MinHash
+signatures and clustered with LSH banding, so near-duplicates are found in
+roughly linear time instead of comparing every pair. Only one representative
+per cluster needs tagging; broadcast_labels copies its labels to the rest.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Texts are processed in chunks to bound the memory used by shingle hashes
+CHUNK_SIZE = 50000
+
+# Multiplier for the polynomial rolling hash over shingle bytes
+_ROLLING_BASE = np.uint64(1099511628211)
+
+# ASCII punctuation/symbols plus the general and CJK punctuation blocks and
+# Devanagari danda. Listed explicitly (rather than [^\w ]) so letters and
+# combining vowel signs of non-Latin scripts survive normalization.
+_PUNCTUATION = "[!-/:-@\\[-`{-~\u2000-\u206f\u3000-\u303f\u0964\u0965]+"
+
+# Extra columns some tagging backends add, broadcast along with the labels
+TAGGER_METADATA_COLUMNS = ("theme_confidence", "tagged_by")
+
+def normalize_text(texts):
+    """
+    Lowercase, strip punctuation and collapse whitespace.
+    """
+    return (
+        texts.fillna("").astype(str).str.lower()
+        .str.replace(_PUNCTUATION, " ", regex=True)
+        .str.replace(r"\s+", " ", regex=True)
+        .str.strip()
+    )
+
+def minhash_signatures(texts, num_perm=64, shingle_size=5, seed=42):
+    """
+    Compute MinHash signatures over character shingles.
+
+    Args:
+        texts (list): Normalized review texts
+        num_perm (int): Number of hash functions (signature length)
+        shingle_size (int): Characters per shingle
+        seed (int): Seed for the hash function parameters
+
+    Returns:
+        numpy.ndarray: uint32 array of shape (len(texts), num_perm)
+    """
+    rng = np.random.default_rng(seed)
+    # Multiply-shift hashing: (a * x + b) >> 32 with odd a
+    a = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+
+    signatures = np.empty((len(texts), num_perm), dtype=np.uint32)
+    k = shingle_size
+
+    for start in range(0, len(texts), CHUNK_SIZE):
+        # Pad so every text has at least one shingle
+        encoded = [t.ljust(k).encode("utf-8") for t in texts[start:start + CHUNK_SIZE]]
+        lengths = np.fromiter((len(e) for e in encoded), dtype=np.int64, count=len(encoded))
+        buf = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.uint64)
+
+        # Rolling hash of every k-byte window in the concatenated buffer
+        m = len(buf) - k + 1
+        with np.errstate(over="ignore"):
+            h = np.zeros(m, dtype=np.uint64)
+            for j in range(k):
+                h = h * _ROLLING_BASE + buf[j:j + m]
+
+            # Keep only windows that lie entirely inside one text
+            offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+            pos_in_text = np.arange(m) - np.repeat(offsets, lengths)[:m]
+            valid = pos_in_text <= np.repeat(lengths, lengths)[:m] - k
+            shingles = h[valid]
+
+            segment_starts = np.concatenate(([0], np.cumsum(lengths - k + 1)[:-1]))
+            for p in range(num_perm):
+                hashed = ((a[p] * shingles + b[p]) >> np.uint64(32)).astype(np.uint32)
+                signatures[start:start + len(encoded), p] = np.minimum.reduceat(hashed, segment_starts)
+
+    return signatures
+
+def _candidate_pairs(signatures, bands, seed=7):
+    """
+    LSH banding: texts whose signatures agree on every row of any band
+    become candidate pairs (each linked to the first text in its bucket).
+    """
+    n, num_perm = signatures.shape
+    rows = num_perm // bands
+    rng = np.random.default_rng(seed)
+    multipliers = rng.integers(1, 2**63, size=rows, dtype=np.uint64) | np.uint64(1)
+
+    pairs_u, pairs_v = [], []
+    for band in range(bands):
+        block = signatures[:, band * rows:(band + 1) * rows].astype(np.uint64)
+        with np.errstate(over="ignore"):
+            keys = (block * multipliers).sum(axis=1)
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        new_bucket = np.ones(n, dtype=bool)
+        new_bucket[1:] = sorted_keys[1:] != sorted_keys[:-1]
+        bucket_first = order[np.maximum.accumulate(np.where(new_bucket, np.arange(n), 0))]
+        pairs_u.append(order[~new_bucket])
+        pairs_v.append(bucket_first[~new_bucket])
+
+    if not pairs_u:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    u = np.concatenate(pairs_u)
+    v = np.concatenate(pairs_v)
+    # The same pair usually shows up in several bands
+    pair_keys = np.unique(np.minimum(u, v) * n + np.maximum(u, v))
+    return pair_keys // n, pair_keys % n
+
+def _connected_components(n, u, v):
+    """
+    Label each node with the smallest node id in its component.
+    """
+    labels = np.arange(n)
+    if len(u) == 0:
+        return labels
+    while True:
+        smallest = np.minimum(labels[u], labels[v])
+        updated = labels.copy()
+        np.minimum.at(updated, u, smallest)
+        np.minimum.at(updated, v, smallest)
+        # Pointer jumping to shortcut chains
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
+def dedup_reviews(input_df, threshold=0.8, num_perm=64, bands=16, shingle_size=5,
+                  spam_min_count=10, text_column="full_text", group_by=None):
+    """
+    Cluster near-duplicate reviews and flag template spam.
+
+    Args:
+        input_df (pandas.DataFrame): Reviews with a full_text column
+        threshold (float): Minimum estimated Jaccard similarity for two reviews
+            to be treated as duplicates
+        num_perm (int): MinHash signature length
+        bands (int): LSH bands; num_perm must be divisible by bands
+        shingle_size (int): Characters per shingle
+        spam_min_count (int): Clusters at least this large are flagged as
+            template spam
+        text_column (str): Column holding the review text
+        group_by (list): Optional columns that must also match for rows to
+            share a cluster, e.g. ["rating"] so a copied text posted with
+            different star ratings is tagged once per rating
+
+    Returns:
+        pandas.DataFrame: Copy of input_df with dup_cluster, is_representative,
+        dup_count and is_template_spam columns
+    """
+    if num_perm % bands:
+        raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+
+    df = input_df.copy()
+    if df.empty:
+        for col, dtype in [("dup_cluster", "int64"), ("is_representative", "bool"),
+                           ("dup_count", "int64"), ("is_template_spam", "bool")]:
+            df[col] = pd.Series(dtype=dtype)
+        return df
+
+    # Exact duplicates (after normalization) collapse before any hashing
+    normalized = normalize_text(df[text_column])
+    codes, uniques = pd.factorize(normalized, sort=False)
+
+    signatures = minhash_signatures(list(uniques), num_perm, shingle_size)
+    u, v = _candidate_pairs(signatures, bands)
+
+    # Drop LSH false positives whose estimated similarity is below threshold
+    if len(u):
+        keep = np.empty(len(u), dtype=bool)
+        for start in range(0, len(u), CHUNK_SIZE):
+            end = start + CHUNK_SIZE
+            agreement = (signatures[u[start:end]] == signatures[v[start:end]]).mean(axis=1)
+            keep[start:end] = agreement >= threshold
+        u, v = u[keep], v[keep]
+
+    unique_labels = _connected_components(len(uniques), u, v)
+
+    # factorize numbers uniques by first appearance, so the smallest unique id
+    # in a cluster is also the cluster's earliest row
+    row_labels = unique_labels[codes]
+    if group_by:
+        keys = pd.MultiIndex.from_arrays([row_labels] + [df[col].to_numpy() for col in group_by])
+        cluster_ids, _ = pd.factorize(keys, sort=False)
+    else:
+        cluster_ids, _ = pd.factorize(row_labels, sort=False)
+    first_row = pd.Series(np.arange(len(df))).groupby(cluster_ids).transform("min").to_numpy()
+    counts = np.bincount(cluster_ids)
+
+    df["dup_cluster"] = cluster_ids
+    df["is_representative"] = first_row == np.arange(len(df))
+    df["dup_count"] = counts[cluster_ids]
+    df["is_template_spam"] = df["dup_count"] >= spam_min_count
+
+    return df
+
+def broadcast_labels(tagged_representatives_df, deduped_df,
+                     label_columns=("theme", "sentiment", "summary_1line")):
+    """
+    Copy labels from tagged cluster representatives to every cluster member.
+
+    Args:
+        tagged_representatives_df (pandas.DataFrame): Tagged rows where is_representative is True
+        deduped_df (pandas.DataFrame): Output of dedup_reviews
+        label_columns (tuple): Columns to broadcast
+
+    Returns:
+        pandas.DataFrame: deduped_df with the label columns filled for every row
+        (tagger metadata such as theme_confidence and tagged_by is copied too
+        when present)
+    """
+    label_columns = list(label_columns) + [
+        c for c in TAGGER_METADATA_COLUMNS
+        if c in tagged_representatives_df.columns and c not in label_columns
+    ]
+    lookup = tagged_representatives_df.set_index("dup_cluster")[label_columns]
+    return deduped_df.drop(columns=[c for c in label_columns if c in deduped_df.columns]).join(
+        lookup, on="dup_cluster"
+    )
+
+# Example usage
+if __name__ == "__main__":
+    sample_data = {
+        "full_text": [
+            "App keeps crashing, very frustrating.",
+            "App keeps crashing!! Very frustrating",
+            "App keeps crashing, very frustrating. Groww",
+            "SIP payment failed twice this week",
+            "Great app! Easy to use and navigate.",
+            "Great app, easy to use and navigate"
+        ],
+        "rating": [1, 1, 2, 2, 5, 5]
+    }
+
+    input_df = pd.DataFrame(sample_data)
+    output_df = dedup_reviews(input_df, spam_min_count=3)
+    print("Near-duplicate clusters:")
+    print(output_df[["full_text", "dup_cluster", "is_representative", "dup_count", "is_template_spam"]])
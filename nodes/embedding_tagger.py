@@ -0,0 +1,186 @@
+"""
+Node helper: Local Embedding Theme Tagger
+Used by: LLM_Tag_Theme_Sentiment (backend="embedding")
+Type: Python – CPU-only classifier
+
+Reviews are embedded with a signed hashing vectorizer (word unigrams, 5-char
+word prefixes as a cheap stemmer, and word bigrams) and assigned to the
+nearest theme centroid by cosine similarity. Centroids are built from the
+theme legend descriptions. Work is done in NumPy batches; the margin between
+the best and second-best theme is returned as a confidence score so
+uncertain rows can be sent to the LLM.
+"""
+
+import re
+import unicodedata
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from nodes.theme_legend import DEFAULT_THEME_DESCRIPTIONS, DEFAULT_THEME_KEYWORDS
+
+def _combining_marks():
+    """
+    Regex class body of the combining marks (vowel signs, viramas, accents)
+    in the blocks where scripts place them.
+    """
+    ranges = []
+    for block_start, block_end in ((0x0300, 0x1DFF), (0x20D0, 0x20FF), (0xFE20, 0xFE2F)):
+        for code in range(block_start, block_end + 1):
+            if unicodedata.category(chr(code)).startswith("M"):
+                if ranges and ranges[-1][1] == code - 1:
+                    ranges[-1][1] = code
+                else:
+                    ranges.append([code, code])
+    return "".join(f"\\u{start:04x}-\\u{end:04x}" for start, end in ranges)
+
+# Words in any script: a letter or digit, then word characters. \w (Unicode
+# for str patterns) does not match combining marks, so they are added to keep
+# Devanagari words ("निकालने") whole
+WORD_PATTERN = re.compile(rf"[^\W_][\w{_combining_marks()}]*")
+
+class HashingThemeClassifier:
+    """
+    Nearest-centroid theme classifier over hashed bag-of-words vectors.
+
+    Token hashes use crc32 rather than hash(), so vectors are identical
+    across processes and runs.
+    """
+
+    def __init__(self, theme_keywords=None, theme_descriptions=None, n_features=2048, batch_size=50000):
+        self.theme_keywords = theme_keywords or DEFAULT_THEME_KEYWORDS
+        # Themes without a description are described by their name and keywords
+        theme_descriptions = theme_descriptions or DEFAULT_THEME_DESCRIPTIONS
+        self.themes = list(self.theme_keywords)
+        self.n_features = n_features
+        self.batch_size = batch_size
+
+        prototypes = [
+            " ".join([theme, " ".join(self.theme_keywords[theme]), theme_descriptions.get(theme, "")])
+            for theme in self.themes
+        ]
+        self.centroids = self.transform(pd.Series(prototypes))
+
+    def _hash_tokens(self, tokens):
+        """
+        Map tokens to (column, sign) arrays, hashing each distinct token once.
+        """
+        codes, uniques = pd.factorize(tokens, sort=False)
+        hashes = np.fromiter((zlib.crc32(token.encode("utf-8")) for token in uniques),
+                             dtype=np.int64, count=len(uniques))
+        hashes = hashes[codes]
+        columns = hashes % self.n_features
+        signs = np.where((hashes >> 31) & 1, -1.0, 1.0).astype(np.float32)
+        return columns, signs
+
+    def _features(self, texts):
+        """
+        Hashed features of each text as sparse (row, column, value) arrays,
+        with duplicate (row, column) entries summed and rows L2-normalized.
+        """
+        texts = texts.reset_index(drop=True)
+        words = texts.fillna("").astype(str).str.lower().str.findall(WORD_PATTERN).explode().dropna()
+        if words.empty:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, np.empty(0, dtype=np.float32)
+
+        rows = words.index.to_numpy()
+        tokens = words.to_numpy(dtype=object)
+
+        # Unigrams and prefixes ("crashing" -> "crash")
+        long_words = np.fromiter((len(t) > 5 for t in tokens), dtype=bool, count=len(tokens))
+        prefixes = np.array(["p:" + t[:5] for t in tokens[long_words]], dtype=object)
+        feature_rows = [rows, rows[long_words]]
+        feature_tokens = [tokens, prefixes]
+
+        # Bigrams of adjacent words within the same review
+        same_review = rows[1:] == rows[:-1]
+        if same_review.any():
+            bigrams = pd.Series(tokens[:-1][same_review]) + " " + pd.Series(tokens[1:][same_review])
+            feature_rows.append(rows[1:][same_review])
+            feature_tokens.append(bigrams.to_numpy(dtype=object))
+
+        all_rows = np.concatenate(feature_rows)
+        columns, signs = self._hash_tokens(np.concatenate(feature_tokens))
+
+        keys, inverse = np.unique(all_rows * self.n_features + columns, return_inverse=True)
+        values = np.bincount(inverse, weights=signs).astype(np.float32)
+        rows, columns = keys // self.n_features, keys % self.n_features
+
+        norms = np.sqrt(np.bincount(rows, weights=values * values, minlength=len(texts)))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values = values / norms[rows].astype(np.float32)
+        keep = np.isfinite(values) & (values != 0)
+        return rows[keep], columns[keep], values[keep]
+
+    def transform(self, texts):
+        """
+        Embed texts as L2-normalized hashed feature vectors.
+
+        Args:
+            texts (pandas.Series): Review texts
+
+        Returns:
+            numpy.ndarray: float32 array of shape (len(texts), n_features)
+        """
+        matrix = np.zeros((len(texts), self.n_features), dtype=np.float32)
+        rows, columns, values = self._features(texts)
+        matrix[rows, columns] = values
+        return matrix
+
+    def predict(self, texts):
+        """
+        Assign each text its nearest theme centroid.
+
+        Args:
+            texts (pandas.Series): Review texts
+
+        Returns:
+            tuple: (themes as numpy object array, confidence as float32 array)
+            Confidence is the cosine margin between the best and second-best
+            theme (the best score when the legend has one theme); texts with
+            no known words get the catch-all theme and 0.
+        """
+        texts = texts.reset_index(drop=True)
+        themes = np.empty(len(texts), dtype=object)
+        confidence = np.zeros(len(texts), dtype=np.float32)
+        theme_names = np.array(self.themes, dtype=object)
+
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts.iloc[start:start + self.batch_size]
+            rows, columns, values = self._features(batch)
+
+            # Sparse rows times dense centroids, one bincount per theme
+            weighted = values[:, None] * self.centroids[:, columns].T
+            scores = np.column_stack([
+                np.bincount(rows, weights=weighted[:, t], minlength=len(batch))
+                for t in range(len(self.themes))
+            ])
+
+            top2 = np.sort(scores, axis=1)[:, -2:]
+            best = scores.argmax(axis=1)
+            no_signal = top2[:, -1] <= 0
+            best[no_signal] = len(self.themes) - 1
+            margin = top2[:, -1] - top2[:, 0] if len(self.themes) > 1 else top2[:, -1]
+
+            end = start + len(batch)
+            themes[start:end] = theme_names[best]
+            confidence[start:end] = np.where(no_signal, 0.0, margin)
+
+        return themes, confidence
+
+# Example usage
+if __name__ == "__main__":
+    texts = pd.Series([
+        "App keeps crashing, very frustrating.",
+        "KYC verification pending for a week",
+        "SIP amount deducted twice",
+        "Cannot withdraw money to my bank account",
+        "Capital gains statement download fails",
+        "Nice"
+    ])
+    classifier = HashingThemeClassifier()
+    themes, confidence = classifier.predict(texts)
+    for text, theme, conf in zip(texts, themes, confidence):
+        print(f"{conf:.2f}  {theme:<24} {text}")
@@ -9,6 +9,8 @@ Output: reviews_week
 
 import pandas as pd
 
+from nodes.time_buckets import bucket_column, parse_bucket
+
 def filter_target_week(input_df, target_week_start):
     """
     Filter reviews for a specific target week.
@@ -26,6 +28,27 @@ def filter_target_week(input_df, target_week_start):
     
     return out
 
+def filter_bucket(input_df, bucket, granularity="week"):
+    """
+    Filter reviews for the hour, day, week or month containing a date.
+
+    Args:
+        input_df (pandas.DataFrame): Cleaned reviews; uses the
+            <granularity>_start column from clean_and_bucket when present,
+            otherwise buckets the date column
+        bucket (str): Any date in the bucket, e.g. "2025-11" or "2025-11-19"
+            for November 2025
+        granularity (str): "hour", "day", "week" or "month"
+
+    Returns:
+        pandas.DataFrame: Filtered DataFrame for the bucket
+    """
+    mask = bucket_column(input_df, granularity) == parse_bucket(bucket, granularity)
+    out = input_df[mask.to_numpy()].copy()
+    out = out.reset_index(drop=True)
+
+    return out
+
 # Example usage
 if __name__ == "__main__":
     # Sample input data with week information
@@ -46,4 +69,5 @@ if __name__ == "__main__":
     
     output_df = filter_target_week(input_df, target_week_start)
     print(f"Reviews for week starting {target_week_start}:")
-    print(output_df)
\ No newline at end of file
+    print(output_df)
+    print(filter_bucket(input_df, "2025-11", "month"))
\ No newline at end of file
@@ -7,25 +7,56 @@ Output columns: theme, sentiment, summary_1line
 """
 
 import pandas as pd
+import numpy as np
 import json
+import time
+
+from nodes.review_schema import compact_labels
+from nodes.theme_legend import DEFAULT_THEME_KEYWORDS
+
+def build_system_prompt(app_name="Groww", theme_keywords=None):
+    """
+    Build the tagging system prompt for an app's theme legend.
+    """
+    themes = list(theme_keywords or DEFAULT_THEME_KEYWORDS)
+    legend = "\n".join(f"  {i}) {theme}" for i, theme in enumerate(themes, start=1))
+    return f"""You are an insights analyst for the {app_name} app.
+
+You read app reviews and assign:
+- ONE theme label from this legend:
+{legend}
+
+If nothing fits perfectly, choose the closest theme.
+
+Sentiment must be exactly one of:
+- POSITIVE
+- NEGATIVE
+- MIXED
+- NEUTRAL
+
+Never include or invent PII like names, emails, phone numbers, or IDs."""
 
 # Mock LLM function - in a real implementation, this would call an actual LLM API
-def mock_llm_call(prompt):
+def mock_llm_call(prompt, theme_keywords=None):
     """
     Mock LLM function that simulates tagging themes and sentiment.
     In a real implementation, this would call an actual LLM API.
     """
     # This is a simplified mock implementation
     # In reality, you would send the prompt to an LLM and parse the response
+    theme_keywords = theme_keywords or DEFAULT_THEME_KEYWORDS
     
     # Extract review text from prompt (simplified approach)
     lines = prompt.split('\n')
     review_text = ""
     rating = 0
     
-    for line in lines:
+    for i, line in enumerate(lines):
         if line.startswith("Review text:"):
             review_text = line.replace("Review text:", "").strip()
+            # The prompt puts the quoted review on the line after the label
+            if not review_text and i + 1 < len(lines):
+                review_text = lines[i + 1].strip().strip('"')
         elif line.startswith("Rating:"):
             try:
                 rating = int(line.replace("Rating:", "").strip())
@@ -33,16 +64,13 @@ def mock_llm_call(prompt):
                 rating = 0
     
     # Simple rule-based tagging for demo purposes
-    if "kyc" in review_text.lower() or "onboard" in review_text.lower() or "register" in review_text.lower():
-        theme = "Onboarding & KYC"
-    elif "payment" in review_text.lower() or "sip" in review_text.lower() or "transaction" in review_text.lower():
-        theme = "Payments & SIP"
-    elif "withdraw" in review_text.lower() or "payout" in review_text.lower():
-        theme = "Withdrawals & Payouts"
-    elif "statement" in review_text.lower() or "report" in review_text.lower():
-        theme = "Statements & Reports"
-    else:
-        theme = "App Performance & Bugs"
+    text_lower = review_text.lower()
+    themes = list(theme_keywords)
+    theme = themes[-1]
+    for candidate in themes[:-1]:
+        if any(keyword in text_lower for keyword in theme_keywords[candidate]):
+            theme = candidate
+            break
     
     # Simple sentiment analysis based on rating and keywords
     if rating >= 4:
@@ -73,58 +101,19 @@ def mock_llm_call(prompt):
         "summary_1line": summary
     }
 
-def llm_tag_theme_sentiment(input_df):
+def build_user_prompt(full_text, rating, theme_keywords):
     """
-    Tag theme and sentiment for each review using LLM.
-    
-    Args:
-        input_df (pandas.DataFrame): DataFrame containing reviews for the target week
-        
-    Returns:
-        pandas.DataFrame: DataFrame with added theme, sentiment, and summary columns
+    Build the per-review tagging prompt.
     """
-    df = input_df.copy()
-    
-    # System prompt
-    system_prompt = """You are an insights analyst for the Groww app.
-
-You read app reviews and assign:
-- ONE theme label from this legend:
-  1) Onboarding & KYC
-  2) Payments & SIP
-  3) Withdrawals & Payouts
-  4) Statements & Reports
-  5) App Performance & Bugs
-
-If nothing fits perfectly, choose the closest theme.
-
-Sentiment must be exactly one of:
-- POSITIVE
-- NEGATIVE
-- MIXED
-- NEUTRAL
-
-Never include or invent PII like names, emails, phone numbers, or IDs."""
-    
-    # Process each row
-    themes = []
-    sentiments = []
-    summaries = []
-    
-    for _, row in df.iterrows():
-        # Create user prompt
-        user_prompt = f"""Review text:
-"{row['full_text']}"
+    theme_options = "\n".join(f"   - {theme}" for theme in theme_keywords)
+    return f"""Review text:
+"{full_text}"
 
-Rating: {row['rating']}
+Rating: {rating}
 
 Task:
 1. Choose ONE theme from:
-   - Onboarding & KYC
-   - Payments & SIP
-   - Withdrawals & Payouts
-   - Statements & Reports
-   - App Performance & Bugs
+{theme_options}
 
 2. Choose ONE sentiment: POSITIVE, NEGATIVE, MIXED, NEUTRAL.
 3. Write ONE 1-line summary in plain English. Do not include PII.
@@ -132,25 +121,224 @@ Task:
 Return ONLY valid JSON:
 
 {{
-  "theme": "<one of the 5 themes>",
+  "theme": "<one of the {len(theme_keywords)} themes>",
   "sentiment": "<POSITIVE/NEGATIVE/MIXED/NEUTRAL>",
   "summary_1line": "<1-line summary>"
 }}"""
-        
+
+def tag_rows_with_llm(df, theme_keywords):
+    """
+    Tag each row with one LLM call.
+
+    Returns:
+        tuple: Lists of themes, sentiments and summaries in row order
+    """
+    themes = []
+    sentiments = []
+    summaries = []
+
+    for _, row in df.iterrows():
+        user_prompt = build_user_prompt(row['full_text'], row['rating'], theme_keywords)
+
         # Call LLM (mock implementation)
-        result = mock_llm_call(user_prompt)
-        
+        result = mock_llm_call(user_prompt, theme_keywords)
+
         themes.append(result["theme"])
         sentiments.append(result["sentiment"])
         summaries.append(result["summary_1line"])
+
+    return themes, sentiments, summaries
+
+# Classifiers are cached per legend; building centroids is cheap but not free
+_classifiers = {}
+
+def get_embedding_classifier(theme_keywords=None):
+    """
+    Return a cached HashingThemeClassifier for a theme legend.
+    """
+    from nodes.embedding_tagger import HashingThemeClassifier
+
+    theme_keywords = theme_keywords or DEFAULT_THEME_KEYWORDS
+    key = tuple((theme, tuple(keywords)) for theme, keywords in theme_keywords.items())
+    if key not in _classifiers:
+        _classifiers[key] = HashingThemeClassifier(theme_keywords)
+    return _classifiers[key]
+
+TAGGING_BACKENDS = ("llm", "embedding", "cascade")
+
+# Escalation thresholds on each local backend's own confidence scale
+DEFAULT_MIN_CONFIDENCE = {
+    "embedding": 0.05,  # cosine margin between the two closest themes
+    "cascade": 0.75,    # keyword confidence: single theme hit, rating not 3
+}
+
+def tag_rows_locally(texts, ratings, backend, theme_keywords):
+    """
+    Tag reviews with a local CPU backend (no LLM calls).
+
+    Returns:
+        tuple: Arrays of themes, confidence, sentiments and summaries in row order
+    """
+    from nodes.rule_tagger import keyword_theme_scores, rule_sentiment, rule_summary
+
+    if backend == "embedding":
+        themes, confidence = get_embedding_classifier(theme_keywords).predict(texts)
+    else:
+        themes, confidence = keyword_theme_scores(texts, ratings, theme_keywords)
+    return themes, confidence, rule_sentiment(texts, ratings), rule_summary(texts)
+
+# Smallest shard worth sending to a worker process; below this the pickling
+# and scheduling overhead outweighs the parallel speedup
+MIN_ROWS_PER_WORKER = 5000
+
+# Shards per worker, so a slow shard does not leave other workers idle
+SHARDS_PER_WORKER = 4
+
+def _init_tagging_worker(backend, theme_keywords):
+    """
+    Process pool initializer: build the backend once per worker.
+    """
+    if backend == "embedding":
+        get_embedding_classifier(theme_keywords)
+
+def _tag_shard(args):
+    texts, ratings, backend, theme_keywords = args
+    return tag_rows_locally(texts, ratings, backend, theme_keywords)
+
+def tag_rows_in_processes(df, backend, theme_keywords, workers):
+    """
+    Tag reviews with a local backend across a pool of worker processes.
+
+    The frame is split into contiguous shards; only the text and rating
+    columns are sent to the workers, and results are concatenated in order.
+
+    Returns:
+        tuple: Same as tag_rows_locally
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = max(1, min(workers, len(df) // MIN_ROWS_PER_WORKER))
+    if workers == 1:
+        return tag_rows_locally(df["full_text"], df["rating"], backend, theme_keywords)
+
+    shards = np.array_split(np.arange(len(df)), workers * SHARDS_PER_WORKER)
+    texts = df["full_text"].reset_index(drop=True)
+    ratings = df["rating"].reset_index(drop=True)
+    tasks = [
+        (texts.iloc[shard[0]:shard[-1] + 1], ratings.iloc[shard[0]:shard[-1] + 1], backend, theme_keywords)
+        for shard in shards if len(shard)
+    ]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_tagging_worker,
+                             initargs=(backend, theme_keywords)) as pool:
+        results = list(pool.map(_tag_shard, tasks))
+
+    return tuple(np.concatenate(parts) for parts in zip(*results))
+
+def llm_tag_theme_sentiment(input_df, app_name="Groww", theme_keywords=None,
+                            backend="llm", min_confidence=None, workers=1):
+    """
+    Tag theme and sentiment for each review using LLM.
+    
+    Args:
+        input_df (pandas.DataFrame): DataFrame containing reviews for the target week
+        app_name (str): App name used in the prompt
+        theme_keywords (dict): Optional ordered theme legend {theme: [keywords]};
+            defaults to the Groww legend
+        backend (str): "llm" to call the LLM for every review; "embedding" to
+            tag locally with nearest-centroid theme matching; "cascade" to tag
+            with the keyword rules. Local backends only call the LLM for rows
+            below min_confidence
+        min_confidence (float): Escalation threshold for local backends;
+            defaults to DEFAULT_MIN_CONFIDENCE[backend], 0 disables escalation
+        workers (int): Worker processes for the local tagging step of the
+            embedding and cascade backends; 1 tags in this process
+        
+    Returns:
+        pandas.DataFrame: DataFrame with added theme, sentiment, and summary columns
+        (plus theme_confidence and tagged_by for local backends). Run stats are
+        stored in df.attrs["tagging_stats"]
+    """
+    if backend not in TAGGING_BACKENDS:
+        raise ValueError(f"Unknown tagging backend: {backend}")
+
+    df = input_df.copy()
+    theme_keywords = theme_keywords or DEFAULT_THEME_KEYWORDS
+    
+    # System prompt
+    system_prompt = build_system_prompt(app_name, theme_keywords)
     
-    # Add results to dataframe
+    if backend == "llm":
+        start = time.perf_counter()
+        themes, sentiments, summaries = tag_rows_with_llm(df, theme_keywords)
+        df["theme"] = themes
+        df["sentiment"] = sentiments
+        df["summary_1line"] = summaries
+        compact_labels(df, theme_keywords)
+        df.attrs["tagging_stats"] = tagging_stats(backend, len(df), len(df), 0.0, time.perf_counter() - start)
+        return df
+
+    if min_confidence is None:
+        min_confidence = DEFAULT_MIN_CONFIDENCE[backend]
+
+    start = time.perf_counter()
+    if workers > 1:
+        themes, confidence, sentiments, summaries = tag_rows_in_processes(df, backend, theme_keywords, workers)
+    else:
+        themes, confidence, sentiments, summaries = tag_rows_locally(
+            df["full_text"], df["rating"], backend, theme_keywords
+        )
     df["theme"] = themes
     df["sentiment"] = sentiments
     df["summary_1line"] = summaries
+    df["theme_confidence"] = np.round(confidence, 3)
+    df["tagged_by"] = backend
+    local_seconds = time.perf_counter() - start
+
+    # Escalate uncertain rows to the LLM
+    uncertain = np.asarray(confidence < min_confidence)
+    start = time.perf_counter()
+    if uncertain.any():
+        llm_themes, llm_sentiments, llm_summaries = tag_rows_with_llm(df[uncertain], theme_keywords)
+        df.loc[uncertain, "theme"] = llm_themes
+        df.loc[uncertain, "sentiment"] = llm_sentiments
+        df.loc[uncertain, "summary_1line"] = llm_summaries
+        df.loc[uncertain, "tagged_by"] = "llm"
+    llm_seconds = time.perf_counter() - start
+    compact_labels(df, theme_keywords, tagged_by=[backend, "llm"])
+
+    stats = tagging_stats(backend, len(df), int(uncertain.sum()), local_seconds, llm_seconds)
+    df.attrs["tagging_stats"] = stats
+    print(f"{backend.capitalize()} tagger: {stats['rows'] - stats['escalated']} rows tagged locally, "
+          f"{stats['escalated']} sent to LLM ({stats['escalated_fraction']:.0%}), "
+          f"~{stats['est_seconds_saved']:.2f}s of LLM time saved")
     
     return df
 
+def tagging_stats(backend, rows, escalated, local_seconds, llm_seconds):
+    """
+    Summarize a tagging run.
+
+    The time saved is estimated from the mean latency of the LLM calls that
+    were made, applied to the rows that did not need one.
+
+    Returns:
+        dict: backend, rows, escalated, escalated_fraction, local_seconds,
+        llm_seconds, llm_seconds_per_call and est_seconds_saved
+    """
+    per_call = llm_seconds / escalated if escalated else 0.0
+    saved = per_call * (rows - escalated) - local_seconds if escalated else 0.0
+    return {
+        "backend": backend,
+        "rows": rows,
+        "escalated": escalated,
+        "escalated_fraction": round(escalated / rows, 4) if rows else 0.0,
+        "local_seconds": round(local_seconds, 4),
+        "llm_seconds": round(llm_seconds, 4),
+        "llm_seconds_per_call": round(per_call, 6),
+        "est_seconds_saved": round(max(saved, 0.0), 4),
+    }
+
 # Example usage
 if __name__ == "__main__":
     # Sample input data
@@ -174,4 +362,10 @@ if __name__ == "__main__":
     output_df = llm_tag_theme_sentiment(input_df)
     
     print("Reviews tagged with themes and sentiment:")
-    print(output_df[["full_text", "theme", "sentiment", "summary_1line"]])
\ No newline at end of file
+    print(output_df[["full_text", "theme", "sentiment", "summary_1line"]])
+
+    for backend in ("embedding", "cascade"):
+        output_df = llm_tag_theme_sentiment(input_df, backend=backend)
+        print(f"Reviews tagged by the {backend} backend:")
+        print(output_df[["full_text", "theme", "theme_confidence", "tagged_by"]])
+        print(output_df.attrs["tagging_stats"])
\ No newline at end of file
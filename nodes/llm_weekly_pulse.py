@@ -5,13 +5,57 @@ Type: LLM – Table → Text
 Inputs:
 themes_week_stats (as table)
 reviews_week_tagged (as table)
+themes_week_diff (optional, from Theme_Diff)
 Output: plain text weekly_note_and_email (we'll include JSON at the end)
 """
 
+import json
+import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
 
+from nodes.theme_diff import changed_themes, describe_changes
+from nodes.time_buckets import check_granularity, pulse_subject, pulse_title
+
+NO_COMPARISON_LINE = "No previous week on record, so no week-over-week comparison yet"
+
+# "single" sends up to REVIEW_PROMPT_LIMIT reviews in one prompt; "map_reduce"
+# summarizes every review per theme first; "auto" picks map_reduce when the
+# week has more reviews than fit in one prompt; "template" builds the note
+# from the stats without a model call (nodes/template_pulse.py)
+PULSE_MODES = ("auto", "single", "map_reduce", "template")
+REVIEW_PROMPT_LIMIT = 150
+
+# First line of the user prompt, naming the bucket the pulse covers
+PERIOD_PROMPTS = {"hour": "Hour starting", "day": "Day", "week": "Week starting", "month": "Month"}
+
+# Reviews per map call, and concurrent summarization calls
+MAP_CHUNK_SIZE = 100
+SUMMARY_WORKERS = 8
+
+# Largest reduce prompt, in characters (about 6k tokens); themes with more
+# chunk summaries than fit are reduced in rounds
+REDUCE_PROMPT_CHARS = 24000
+
+# Words ignored when the mock summarizer picks key points
+STOPWORDS = set("""
+a about after again all also am an and any app are as at be been but by can cant could did
+do does dont even every for from get got has have how i if in into is it its just me more
+most my no not now of on one only or our out so some than that the their them then there
+these they this to too up use used very was we were what when which while who why will
+with would you your
+""".split())
+
+TOP_THEMES_CANNED = [
+    '1. App Performance & Bugs: Several users reported crashes and slow loading times. "App keeps freezing when I try to access my portfolio."',
+    '2. Onboarding & KYC: New users found the registration process smooth. "Easy to sign up and verify my identity."',
+    '3. Payments & SIP: Users appreciated the streamlined payment process. "SIP setup was straightforward and quick."',
+]
+
 # Mock LLM function - in a real implementation, this would call an actual LLM API
-def mock_llm_call(system_prompt, user_prompt):
+def mock_llm_call(system_prompt, user_prompt, app_name="Groww"):
     """
     Mock LLM function that simulates generating a weekly pulse note.
     In a real implementation, this would call an actual LLM API.
@@ -19,40 +63,204 @@ def mock_llm_call(system_prompt, user_prompt):
     # This is a simplified mock implementation
     # In reality, you would send the prompts to an LLM and parse the response
     
-    # Extract week start from user prompt
+    # Extract the bucket (week start by default) from user prompt
     lines = user_prompt.split('\n')
     week_start = "2025-11-17"  # Default value
+    granularity = "week"
+    comparison = NO_COMPARISON_LINE
+    theme_summaries = []
     for line in lines:
-        if line.startswith("Week starting:"):
-            week_start = line.replace("Week starting:", "").strip()
-            break
+        period = next((g for g, label in PERIOD_PROMPTS.items() if line.startswith(f"{label}:")), None)
+        if period:
+            granularity = period
+            week_start = line.split(":", 1)[1].strip()
+        elif line.startswith("Week-over-week summary:"):
+            comparison = line.replace("Week-over-week summary:", "").strip()
+        elif line.startswith("- ") and " | Key points: " in line:
+            theme_summaries.append(line[2:])
+    comparison_json = json.dumps(comparison)[1:-1]
+    
+    # Top themes from map-reduce theme summaries, when the prompt has them
+    top_themes = TOP_THEMES_CANNED
+    if theme_summaries:
+        top_themes = [f"{i}. {describe_theme_summary(summary)}" for i, summary in enumerate(theme_summaries[:3], 1)]
+    top_themes_note = "\n  ".join(top_themes)
+    top_themes_json = "\\n  ".join(json.dumps(line)[1:-1] for line in top_themes)
+    title = pulse_title(app_name, week_start, granularity)
+    subject = pulse_subject(week_start, granularity)
     
     # Create a mock response based on the input data
-    mock_response = f"""Groww App – Weekly Review Pulse (Week of {week_start})
+    mock_response = f"""{title}
 
 • Executive summary
   - This week saw mixed feedback with performance issues being a key concern
   - Onboarding experience received positive feedback from new users
-  - Payment-related features showed improvement compared to last week
+  - {comparison}
 
 • Top Themes
-  1. App Performance & Bugs: Several users reported crashes and slow loading times. "App keeps freezing when I try to access my portfolio."
-  2. Onboarding & KYC: New users found the registration process smooth. "Easy to sign up and verify my identity."
-  3. Payments & SIP: Users appreciated the streamlined payment process. "SIP setup was straightforward and quick."
+  {top_themes_note}
 
 [Action] Investigate and resolve app performance issues reported by multiple users
 [Action] Enhance the payment confirmation flow based on user feedback
 [Action] Optimize the onboarding flow for better conversion rates
 
 {{
-  "email_subject": "Weekly App Review Pulse - {week_start}",
-  "email_body": "Groww App – Weekly Review Pulse (Week of {week_start})\\n\\n• Executive summary\\n  - This week saw mixed feedback with performance issues being a key concern\\n  - Onboarding experience received positive feedback from new users\\n  - Payment-related features showed improvement compared to last week\\n\\n• Top Themes\\n  1. App Performance & Bugs: Several users reported crashes and slow loading times. \\"App keeps freezing when I try to access my portfolio.\\"\\n  2. Onboarding & KYC: New users found the registration process smooth. \\"Easy to sign up and verify my identity.\\"\\n  3. Payments & SIP: Users appreciated the streamlined payment process. \\"SIP setup was straightforward and quick.\\"\\n\\n[Action] Investigate and resolve app performance issues reported by multiple users\\n[Action] Enhance the payment confirmation flow based on user feedback\\n[Action] Optimize the onboarding flow for better conversion rates"
+  "email_subject": "{subject}",
+  "email_body": "{title}\\n\\n• Executive summary\\n  - This week saw mixed feedback with performance issues being a key concern\\n  - Onboarding experience received positive feedback from new users\\n  - {comparison_json}\\n\\n• Top Themes\\n  {top_themes_json}\\n\\n[Action] Investigate and resolve app performance issues reported by multiple users\\n[Action] Enhance the payment confirmation flow based on user feedback\\n[Action] Optimize the onboarding flow for better conversion rates"
 }}
 """
     
     return mock_response
 
-def llm_weekly_pulse(themes_week_stats_df, reviews_week_tagged_df, target_week_start):
+SUMMARY_FORMAT = "Reviews: <n> | Negative: <n> | Key points: <term (mentions)>, ... | Quote: <short quote>"
+
+SUMMARY_LINE = re.compile(
+    r"Reviews: (?P<reviews>\d+) \| Negative: (?P<negative>\d+) \| Key points: (?P<points>.*?) \| Quote: (?P<quote>.*)"
+)
+
+def mock_summary_call(prompt):
+    """
+    Mock LLM for the map and reduce summarization steps. Answers in
+    SUMMARY_FORMAT, as the prompts ask a real model to.
+    """
+    lines = prompt.split('\n')
+    summaries = [m for m in (SUMMARY_LINE.search(line) for line in lines) if m]
+    if summaries:
+        # Reduce: merge chunk summaries
+        points = Counter()
+        for summary in summaries:
+            for term, count in re.findall(r"([\w'-]+) \((\d+)\)", summary["points"]):
+                points[term] += int(count)
+        reviews = sum(int(m["reviews"]) for m in summaries)
+        negative = sum(int(m["negative"]) for m in summaries)
+        quote = max(summaries, key=lambda m: int(m["negative"]))["quote"]
+    else:
+        # Map: summarize review lines "- SENTIMENT | rating | text"
+        rows = [line[2:].split(" | ", 2) for line in lines if line.startswith("- ") and line.count(" | ") >= 2]
+        reviews = len(rows)
+        negative = sum(sentiment == "NEGATIVE" for sentiment, _, _ in rows)
+        points = Counter(
+            word for _, _, text in rows for word in set(re.findall(r"[a-z']{4,}", text.lower()))
+            if word not in STOPWORDS
+        )
+        majority = "NEGATIVE" if negative * 2 >= reviews else None
+        candidates = [text for sentiment, _, text in rows if majority is None or sentiment == majority]
+        quote = min(candidates, key=len) if candidates else ""
+        quote = " ".join(quote.split()[:20])
+    key_points = ", ".join(f"{term} ({count})" for term, count in points.most_common(5))
+    return f"Reviews: {reviews} | Negative: {negative} | Key points: {key_points} | Quote: {quote}"
+
+def describe_theme_summary(line):
+    """
+    "<theme>: <summary>" as one Top Themes sentence (used by the mock note).
+    """
+    theme, _, summary = line.partition(": ")
+    m = SUMMARY_LINE.search(summary)
+    if not m:
+        return line
+    reviews, negative = int(m["reviews"]), int(m["negative"])
+    terms = [term for term, _ in re.findall(r"([\w'-]+) \((\d+)\)", m["points"])][:3]
+    neg_share = round(100 * negative / reviews) if reviews else 0
+    return (f"{theme}: {reviews} reviews, {neg_share}% negative; users mention {', '.join(terms) or 'various issues'}. "
+            f"\"{m['quote']}\"")
+
+def build_map_prompt(theme, chunk_df):
+    review_lines = "\n".join(
+        f"- {sentiment} | {rating} | {' '.join(str(text).split())}"
+        for sentiment, rating, text in zip(chunk_df["sentiment"].astype(str), chunk_df["rating"], chunk_df["full_text"])
+    )
+    return f"""Summarize these {len(chunk_df)} app reviews about the theme "{theme}".
+Answer in one line: {SUMMARY_FORMAT}
+Key points are the most mentioned issues or praises. The quote is short, paraphrased and has no usernames, emails, phone numbers or IDs.
+
+Reviews (sentiment | rating | text):
+{review_lines}"""
+
+def build_reduce_prompt(theme, chunk_summaries):
+    summary_lines = "\n".join(f"- {summary}" for summary in chunk_summaries)
+    return f"""Merge these summaries of reviews about the theme "{theme}" into one.
+Add up the counts, keep the most mentioned key points and the most representative quote.
+Answer in one line: {SUMMARY_FORMAT}
+
+Chunk summaries:
+{summary_lines}"""
+
+def batch_summaries(theme, summaries, budget=REDUCE_PROMPT_CHARS):
+    """
+    Split a theme's summaries into batches whose reduce prompt fits in
+    budget characters. A batch holds at least two summaries, so every
+    round of reduces shrinks the list.
+    """
+    overhead = len(build_reduce_prompt(theme, []))
+    batches, batch, size = [], [], overhead
+    for summary in summaries:
+        line = len(summary) + 3
+        if len(batch) >= 2 and size + line > budget:
+            batches.append(batch)
+            batch, size = [], overhead
+        batch.append(summary)
+        size += line
+    batches.append(batch)
+    return batches
+
+def summarize_themes(reviews_df, themes, chunk_size=MAP_CHUNK_SIZE, workers=SUMMARY_WORKERS,
+                     reduce_budget=REDUCE_PROMPT_CHARS):
+    """
+    Map-reduce summaries of every review, per theme.
+
+    Each theme's reviews are split into chunks of chunk_size. All chunks are
+    summarized concurrently (map), then each theme's chunk summaries are
+    merged (reduce; skipped for single-chunk themes). Summaries are reduced
+    in batches that fit in reduce_budget, and the batch results again, until
+    one summary per theme is left.
+
+    Args:
+        reviews_df (pandas.DataFrame): Tagged reviews
+        themes (list): Themes to summarize, in output order
+        chunk_size (int): Reviews per map call
+        workers (int): Concurrent model calls
+        reduce_budget (int): Largest reduce prompt, in characters
+
+    Returns:
+        dict: theme -> one-line summary in SUMMARY_FORMAT
+    """
+    chunks = []
+    for theme, group in reviews_df.groupby("theme", observed=True, sort=False):
+        if theme in themes:
+            for start in range(0, len(group), chunk_size):
+                chunks.append((theme, group.iloc[start:start + chunk_size]))
+    
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        mapped = list(pool.map(lambda chunk: mock_summary_call(build_map_prompt(*chunk)), chunks))
+        chunk_summaries = {}
+        for (theme, _), summary in zip(chunks, mapped):
+            chunk_summaries.setdefault(theme, []).append(summary)
+        
+        multi_chunk = [theme for theme, summaries in chunk_summaries.items() if len(summaries) > 1]
+        rounds = 0
+        while any(len(summaries) > 1 for summaries in chunk_summaries.values()):
+            batches = [
+                (theme, batch)
+                for theme, summaries in chunk_summaries.items()
+                for batch in batch_summaries(theme, summaries, reduce_budget)
+            ]
+            reduced = pool.map(
+                lambda item: item[1][0] if len(item[1]) == 1 else mock_summary_call(build_reduce_prompt(*item)),
+                batches,
+            )
+            chunk_summaries = {}
+            for (theme, _), summary in zip(batches, reduced):
+                chunk_summaries.setdefault(theme, []).append(summary)
+            rounds += 1
+        theme_summaries = {theme: summaries[0] for theme, summaries in chunk_summaries.items()}
+    
+    print(f"Summarized {len(reviews_df)} reviews in {len(chunks)} chunks "
+          f"({len(multi_chunk)} themes reduced in {rounds} rounds)")
+    return {theme: theme_summaries[theme] for theme in themes if theme in theme_summaries}
+
+def llm_weekly_pulse(themes_week_stats_df, reviews_week_tagged_df, target_week_start, app_name="Groww",
+                     themes_week_diff_df=None, mode="auto", summary_workers=SUMMARY_WORKERS,
+                     granularity="week"):
     """
     Generate weekly pulse note using LLM.
     
@@ -60,19 +268,61 @@ def llm_weekly_pulse(themes_week_stats_df, reviews_week_tagged_df, target_week_s
         themes_week_stats_df (pandas.DataFrame): Theme statistics
         reviews_week_tagged_df (pandas.DataFrame): Tagged reviews
         target_week_start (str): Target week start date
+        app_name (str): App name used in the prompt and note title
+        themes_week_diff_df (pandas.DataFrame): Optional output of theme_diff.
+            When it has a previous week, only the changed themes and their
+            reviews are sent to the model instead of the full week.
+        mode (str): "single" sends the first REVIEW_PROMPT_LIMIT reviews in
+            the prompt; "map_reduce" sends per-theme summaries of all reviews
+            (summarize_themes); "auto" uses map_reduce only when the reviews
+            do not fit in one prompt; "template" skips the model and
+            returns template_pulse's note for the whole week
+        summary_workers (int): Concurrent model calls in map_reduce mode
+        granularity (str): Bucket the reviews cover ("hour", "day", "week" or
+            "month", see time_buckets.py); target_week_start is then that
+            bucket's label, e.g. "2025-11" for a monthly pulse
         
     Returns:
         str: Weekly note and email content
     """
+    check_granularity(granularity)
+    if mode == "template":
+        from nodes.template_pulse import template_pulse
+
+        return template_pulse(themes_week_stats_df, reviews_week_tagged_df, target_week_start,
+                              app_name=app_name, themes_week_diff_df=themes_week_diff_df,
+                              granularity=granularity)
+
+    comparison = ""
+    stats_for_prompt = themes_week_stats_df
+    reviews_for_prompt = reviews_week_tagged_df
+    if themes_week_diff_df is not None and not themes_week_diff_df.empty:
+        comparison = describe_changes(themes_week_diff_df)
+        stats_for_prompt = changed_themes(themes_week_diff_df).drop(columns=["prev_week_start"])
+        reviews_for_prompt = reviews_week_tagged_df[
+            reviews_week_tagged_df["theme"].isin(stats_for_prompt["theme"])
+        ]
+    
+    if mode not in PULSE_MODES:
+        raise ValueError(f"mode must be one of {PULSE_MODES}, got {mode!r}")
+    if mode == "auto":
+        mode = "map_reduce" if len(reviews_for_prompt) > REVIEW_PROMPT_LIMIT else "single"
+    
     # Convert dataframes to markdown tables for LLM prompt
-    themes_table = themes_week_stats_df.to_markdown(index=False) if hasattr(themes_week_stats_df, 'to_markdown') else themes_week_stats_df.to_string()
+    themes_table = stats_for_prompt.to_markdown(index=False) if hasattr(stats_for_prompt, 'to_markdown') else stats_for_prompt.to_string()
     
-    # Limit reviews to ~150 rows as specified
-    limited_reviews_df = reviews_week_tagged_df.head(150)
-    reviews_table = limited_reviews_df.to_markdown(index=False) if hasattr(limited_reviews_df, 'to_markdown') else limited_reviews_df.to_string()
+    if mode == "map_reduce":
+        theme_summaries = summarize_themes(reviews_for_prompt, list(stats_for_prompt["theme"]), workers=summary_workers)
+        reviews_heading = f"Theme summaries (all {len(reviews_for_prompt)} reviews, {SUMMARY_FORMAT})"
+        reviews_table = "\n".join(f"- {theme}: {summary}" for theme, summary in theme_summaries.items())
+    else:
+        # Limit reviews to ~150 rows as specified
+        limited_reviews_df = reviews_for_prompt.head(REVIEW_PROMPT_LIMIT)
+        reviews_heading = "Tagged reviews (theme, sentiment, rating, full_text, summary_1line)"
+        reviews_table = limited_reviews_df.to_markdown(index=False) if hasattr(limited_reviews_df, 'to_markdown') else limited_reviews_df.to_string()
     
     # System prompt
-    system_prompt = """You are writing a weekly product pulse for the Groww app, for product, growth, support, and leadership.
+    system_prompt = f"""You are writing a weekly product pulse for the {app_name} app, for product, growth, support, and leadership.
 
 Constraints:
 - Max 5 themes overall.
@@ -93,7 +343,7 @@ Task:
 1. Pick the **Top 3 themes** (by review volume and/or negative share).
 2. For the weekly note (≤250 words total), write:
 
-"Groww App – Weekly Review Pulse (Week of target_week_start)"
+"{app_name} App – Weekly Review Pulse (Week of target_week_start)"
 
 - 2–3 bullet **Executive summary**
 - A short section **Top Themes**:
@@ -104,29 +354,31 @@ Task:
 
 3. After the note, output a JSON block:
 
-{
+{{
   "email_subject": "<short subject line>",
   "email_body": "<plain-text email body including the note>"
-}
+}}
 
 Rules:
 - Do NOT exceed 250 words for the note.
 - Do NOT include any usernames, emails, phone numbers, or IDs."""
 
     # User prompt
-    user_prompt = f"""Week starting: {target_week_start}
+    stats_heading = "Theme changes vs previous week" if comparison else "Theme stats"
+    comparison_line = f"Week-over-week summary: {comparison}\n\n" if comparison else ""
+    user_prompt = f"""{PERIOD_PROMPTS[granularity]}: {target_week_start}
 
-Theme stats:
+{comparison_line}{stats_heading}:
 {themes_table}
 
-Tagged reviews (theme, sentiment, rating, full_text, summary_1line):
+{reviews_heading}:
 {reviews_table}
 
 Task:
 1. Pick the **Top 3 themes** (by review volume and/or negative share).
 2. For the weekly note (≤250 words total), write:
 
-"Groww App – Weekly Review Pulse (Week of {target_week_start})"
+"{pulse_title(app_name, target_week_start, granularity)}"
 
 - 2–3 bullet **Executive summary**
 - A short section **Top Themes**:
@@ -147,7 +399,7 @@ Rules:
 - Do NOT include any usernames, emails, phone numbers, or IDs."""
 
     # Call LLM (mock implementation)
-    response = mock_llm_call(system_prompt, user_prompt)
+    response = mock_llm_call(system_prompt, user_prompt, app_name)
     
     return response
 
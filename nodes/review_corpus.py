@@ -0,0 +1,158 @@
+"""
+Node: Load Review Corpus (memory-mapped)
+Node name: Review_Corpus
+Type: File / Arrow IPC input
+Output: reviews_week (replaces Upload_Reviews + Clean_And_Bucket +
+Filter_Target_Week for the standard corpus)
+
+The combine step writes the cleaned, week-bucketed corpus once as an
+uncompressed Arrow IPC (Feather v2) file, sorted by week_start, with the row
+range of every week stored in the schema metadata. Readers memory-map the
+file read-only, so every web worker shares the same page cache instead of
+holding its own DataFrame, and a week is a zero-copy slice of the mapped
+table. Only the rows of the requested week are converted to pandas.
+
+pyarrow is optional: without it the combine step only writes CSV and the
+web app falls back to uploaded files.
+"""
+
+import json
+import os
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+
+WEEKS_METADATA_KEY = b"review_weeks"
+
+# One mapped table per process, reopened when the file is replaced
+_open_corpora = {}
+
+def corpus_available():
+    """
+    Whether pyarrow is installed, i.e. corpus files can be written and read.
+    """
+    return pa is not None
+
+def corpus_path_for(csv_path):
+    """
+    Corpus file that sits next to a combined CSV (all_reviews.csv -> all_reviews.arrow).
+    """
+    return os.path.splitext(csv_path)[0] + ".arrow"
+
+def write_corpus(reviews_clean_df, path):
+    """
+    Write cleaned reviews (output of clean_and_bucket) as a memory-mappable corpus.
+
+    The file is written to a temporary name and renamed into place, so
+    workers that still map the previous corpus keep a consistent view.
+
+    Args:
+        reviews_clean_df (pandas.DataFrame): Cleaned reviews with week_start
+        path (str): Output .arrow path
+
+    Returns:
+        str: path
+    """
+    if pa is None:
+        raise ImportError("pyarrow is required to write the review corpus")
+
+    df = reviews_clean_df.sort_values("week_start", kind="stable").reset_index(drop=True)
+    weeks = df["week_start"].astype(str)
+    starts = weeks.ne(weeks.shift()).to_numpy().nonzero()[0]
+    ends = list(starts[1:]) + [len(df)]
+    week_index = {weeks.iloc[s]: [int(s), int(e - s)] for s, e in zip(starts, ends)}
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[WEEKS_METADATA_KEY] = json.dumps(week_index).encode("utf-8")
+    table = table.replace_schema_metadata(metadata)
+
+    tmp_path = f"{path}.tmp"
+    with pa.OSFile(tmp_path, "wb") as sink:
+        # Uncompressed so readers can map buffers without decoding
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+    return path
+
+class ReviewCorpus:
+    """
+    Read-only view over a memory-mapped corpus file.
+    """
+
+    def __init__(self, path):
+        if pa is None:
+            raise ImportError("pyarrow is required to read the review corpus")
+        self.path = path
+        source = pa.memory_map(path, "r")
+        # read_all on a memory map references the mapped buffers; nothing is copied
+        self.table = pa.ipc.open_file(source).read_all()
+        raw_index = (self.table.schema.metadata or {}).get(WEEKS_METADATA_KEY, b"{}")
+        self.week_index = json.loads(raw_index)
+
+    @property
+    def num_rows(self):
+        return self.table.num_rows
+
+    @property
+    def weeks(self):
+        return sorted(self.week_index)
+
+    def week_table(self, target_week_start):
+        """
+        Zero-copy Arrow slice of one week's rows.
+        """
+        offset, length = self.week_index.get(target_week_start, (0, 0))
+        return self.table.slice(offset, length)
+
+    def week(self, target_week_start):
+        """
+        One week's reviews as a DataFrame, like filter_target_week's output.
+
+        Args:
+            target_week_start (str): Week start date "YYYY-MM-DD"
+
+        Returns:
+            pandas.DataFrame: Reviews for the week (empty if the week is not in the corpus)
+        """
+        return self.week_table(target_week_start).to_pandas()
+
+def open_corpus(path):
+    """
+    Open a corpus, reusing this process's mapping while the file is unchanged.
+
+    Args:
+        path (str): Path to the .arrow corpus
+
+    Returns:
+        ReviewCorpus
+    """
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    corpus = _open_corpora.get(key[0])
+    if corpus is None or corpus[0] != key:
+        corpus = (key, ReviewCorpus(path))
+        _open_corpora[key[0]] = corpus
+    return corpus[1]
+
+# Example usage
+if __name__ == "__main__":
+    import pandas as pd
+    from nodes.clean_and_bucket import clean_and_bucket
+
+    sample_data = {
+        "date": ["2025-11-17", "2025-11-18", "2025-11-24", "2025-11-25"],
+        "rating": [5, 3, 1, 4],
+        "review_text": [
+            "Great app! Easy to use and navigate.",
+            "Could be better, some features are missing.",
+            "App keeps crashing, very frustrating.",
+            "Good overall but needs performance improvements."
+        ]
+    }
+    path = write_corpus(clean_and_bucket(pd.DataFrame(sample_data)), "sample_corpus.arrow")
+    corpus = open_corpus(path)
+    print(f"Weeks in corpus: {corpus.weeks}")
+    print(corpus.week("2025-11-24"))
@@ -0,0 +1,97 @@
+"""
+Node helper: Compact Review Schema
+Used by: Clean_And_Bucket, LLM_Tag_Theme_Sentiment, Theme_Stats
+
+Review frames repeat a handful of labels (week, source, theme, sentiment) on
+every row. Storing them as categoricals keeps one small integer code per row
+instead of a Python string, and ratings fit in int8.
+"""
+
+import pandas as pd
+
+from nodes.theme_legend import DEFAULT_THEME_KEYWORDS
+
+SENTIMENTS = ["POSITIVE", "NEGATIVE", "MIXED", "NEUTRAL"]
+
+# Low-cardinality columns stored as categoricals when present
+CATEGORICAL_COLUMNS = ["week_start", "source", "source_file", "tagged_by"]
+
+def as_category(values, categories=None, ordered=False):
+    """
+    Convert values to a categorical, keeping the given categories first and
+    appending any unexpected values rather than turning them into NaN.
+
+    Args:
+        values: Array-like of labels
+        categories (list): Expected categories, in display order
+        ordered (bool): Whether the categories have a meaningful order
+
+    Returns:
+        pandas.Categorical
+    """
+    if categories is None:
+        return pd.Categorical(values, ordered=ordered)
+    categories = list(categories)
+    known = set(categories)
+    extra = sorted({v for v in pd.unique(pd.Series(values).dropna()) if v not in known}, key=str)
+    return pd.Categorical(values, categories=categories + extra, ordered=ordered)
+
+def compact_rating(ratings):
+    """
+    Store star ratings as int8 (nullable Int8 if any rating is missing).
+    """
+    ratings = pd.to_numeric(ratings, errors="coerce").round()
+    return ratings.astype("Int8" if ratings.isna().any() else "int8")
+
+def compact_columns(df):
+    """
+    Convert the low-cardinality label columns of a review frame in place.
+
+    week_start is an ordered categorical (ISO dates sort chronologically), so
+    min/max and sorting still work.
+    """
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            categories = sorted(df[col].dropna().unique()) if col == "week_start" else None
+            df[col] = as_category(df[col], categories, ordered=col == "week_start")
+    if "rating" in df.columns:
+        df["rating"] = compact_rating(df["rating"])
+    return df
+
+def compact_labels(df, theme_keywords=None, tagged_by=None):
+    """
+    Store the tagger's theme, sentiment and tagged_by columns as categoricals,
+    with themes in legend order.
+    """
+    df["theme"] = as_category(df["theme"], list(theme_keywords or DEFAULT_THEME_KEYWORDS))
+    df["sentiment"] = as_category(df["sentiment"], SENTIMENTS)
+    if tagged_by:
+        df["tagged_by"] = as_category(df["tagged_by"], tagged_by)
+    return df
+
+def memory_report(df):
+    """
+    Deep memory usage of a frame.
+
+    Returns:
+        dict: total_bytes, bytes_per_row and per-column bytes
+    """
+    usage = df.memory_usage(deep=True, index=False)
+    total = int(usage.sum())
+    return {
+        "total_bytes": total,
+        "bytes_per_row": round(total / len(df), 1) if len(df) else 0.0,
+        "columns": {col: int(size) for col, size in usage.items()},
+    }
+
+# Example usage
+if __name__ == "__main__":
+    df = pd.DataFrame({
+        "week_start": ["2025-11-17", "2025-11-17", "2025-11-24"],
+        "rating": [5, 3, 1],
+        "source": ["playstore", "trustpilot", "playstore"],
+    })
+    print(memory_report(df))
+    compact_columns(df)
+    print(df.dtypes)
+    print(memory_report(df))
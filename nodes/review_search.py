@@ -0,0 +1,324 @@
+"""
+Node: Index Reviews for Full-Text Search
+Node name: Review_Search
+Type: Python – Persist
+Inputs: reviews_clean, reviews_week_tagged
+Output: review_search.db (SQLite FTS5)
+
+Keeps a full-text index over the clean_and_bucket output so questions like
+"every review mentioning UPI failures this month" are answered from an index
+instead of loading and grepping the combined CSV.
+
+    reviews       one row per review: app, date, week, rating, source and,
+                  once a week has been tagged, its theme, sentiment and summary
+    reviews_fts   FTS5 index over full_text (porter stemming, so "failure"
+                  also finds "failures") and over facet tokens for the app,
+                  week, rating, theme and sentiment; kept in sync by triggers
+
+Filters are matched as facet tokens inside the FTS query, so they narrow the
+posting lists instead of joining every match back to the reviews table. Row
+ids start with the review date, so "newest first" results stream straight
+out of the index without sorting the matches.
+
+Reviews are keyed by a hash of their app, date, rating, source and text, so
+several apps can share one index and indexing is incremental: re-indexing a file only inserts reviews that are not
+in the index yet, and tagging a week fills in labels for reviews already there.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import zlib
+from datetime import date
+
+import pandas as pd
+
+DEFAULT_SEARCH_DB = "review_search.db"
+
+# Rows per INSERT / UPDATE batch
+INDEX_BATCH_SIZE = 50000
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+SEARCH_ORDERS = ("recent", "relevance")
+
+# Seconds to wait for another process's write to finish
+BUSY_TIMEOUT = 30
+
+# Row id = days since ID_EPOCH in the high bits, review key hash in the low bits
+ID_EPOCH = date(2000, 1, 1)
+ID_HASH_BITS = 47
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reviews (
+    id INTEGER PRIMARY KEY,
+    review_key TEXT NOT NULL UNIQUE,
+    app_id TEXT,
+    date TEXT NOT NULL,
+    week_start TEXT NOT NULL,
+    rating INTEGER,
+    source TEXT,
+    theme TEXT,
+    sentiment TEXT,
+    summary_1line TEXT,
+    full_text TEXT NOT NULL,
+    facets TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS reviews_fts USING fts5 (
+    full_text, facets, content='reviews', content_rowid='id',
+    tokenize='porter unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS reviews_ai AFTER INSERT ON reviews BEGIN
+    INSERT INTO reviews_fts (rowid, full_text, facets) VALUES (new.id, new.full_text, new.facets);
+END;
+CREATE TRIGGER IF NOT EXISTS reviews_ad AFTER DELETE ON reviews BEGIN
+    INSERT INTO reviews_fts (reviews_fts, rowid, full_text, facets)
+    VALUES ('delete', old.id, old.full_text, old.facets);
+END;
+CREATE TRIGGER IF NOT EXISTS reviews_au AFTER UPDATE OF full_text, facets ON reviews BEGIN
+    INSERT INTO reviews_fts (reviews_fts, rowid, full_text, facets)
+    VALUES ('delete', old.id, old.full_text, old.facets);
+    INSERT INTO reviews_fts (rowid, full_text, facets) VALUES (new.id, new.full_text, new.facets);
+END;
+"""
+
+# Words (optionally ending in * for a prefix match) taken from a user query
+_QUERY_TERM = re.compile(r"\w+\*?")
+
+def connect(db_path=DEFAULT_SEARCH_DB):
+    """
+    Open the search index, creating its tables on first use.
+    """
+    db_dir = os.path.dirname(db_path)
+    if db_dir:
+        os.makedirs(db_dir, exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    # Indexes created before reviews carried an app id
+    if "app_id" not in {row["name"] for row in conn.execute("PRAGMA table_info(reviews)")}:
+        conn.execute("ALTER TABLE reviews ADD COLUMN app_id TEXT")
+    return conn
+
+def review_keys(df, app_id=None):
+    """
+    Stable key per review: SHA-1 of its app id (when given), date, rating,
+    source and full text.
+    """
+    dates = pd.to_datetime(df["date"], errors="coerce").dt.strftime("%Y-%m-%d").fillna("")
+    ratings = df["rating"].astype(str)
+    sources = df["source"].astype(str) if "source" in df.columns else pd.Series("", index=df.index)
+    parts = dates + "|" + ratings + "|" + sources + "|" + df["full_text"].astype(str)
+    if app_id:
+        parts = f"{app_id}|" + parts
+    return [hashlib.sha1(part.encode("utf-8")).hexdigest() for part in parts]
+
+def review_row_id(review_date, review_key):
+    """
+    Date-ordered row id. Two reviews on the same day collide only if their
+    keys share the first 47 bits.
+    """
+    days = (review_date - ID_EPOCH).days
+    return (days << ID_HASH_BITS) | (int(review_key[:12], 16) & ((1 << ID_HASH_BITS) - 1))
+
+def facet_terms(week=None, rating=None, theme=None, sentiment=None, app_id=None):
+    """
+    Single-token facet terms for the given filter values, e.g.
+    ["w20251117", "r1", "t1c2d3e4f", "snegative", "a5b6c7d8e"].
+    """
+    terms = []
+    if week:
+        terms.append("w" + str(week).replace("-", ""))
+    if rating is not None and not pd.isna(rating):
+        terms.append(f"r{int(rating)}")
+    if theme is not None and not pd.isna(theme) and theme != "":
+        terms.append(f"t{zlib.crc32(str(theme).encode('utf-8')):08x}")
+    if sentiment is not None and not pd.isna(sentiment) and sentiment != "":
+        terms.append("s" + re.sub(r"\W", "", str(sentiment).lower()))
+    if app_id:
+        terms.append(f"a{zlib.crc32(str(app_id).encode('utf-8')):08x}")
+    return terms
+
+def _optional(value):
+    return None if pd.isna(value) else value
+
+def _rating(value):
+    return None if pd.isna(value) else int(value)
+
+def index_reviews(reviews_clean_df, db_path=DEFAULT_SEARCH_DB, app_id=None):
+    """
+    Add reviews that are not in the index yet.
+
+    Args:
+        reviews_clean_df (pandas.DataFrame): Output of clean_and_bucket
+        db_path (str): SQLite database file
+        app_id (str): App the reviews belong to (the app profile's app_id)
+
+    Returns:
+        int: Number of newly indexed reviews
+    """
+    df = reviews_clean_df
+    keys = review_keys(df, app_id)
+    dates = pd.to_datetime(df["date"], errors="coerce").dt.date
+    weeks = df["week_start"].astype(str)
+    ratings = pd.to_numeric(df["rating"], errors="coerce")
+    sources = df["source"].astype(object) if "source" in df.columns else pd.Series(None, index=df.index)
+    texts = df["full_text"].astype(str)
+
+    conn = connect(db_path)
+    try:
+        added = 0
+        with conn:
+            for start in range(0, len(df), INDEX_BATCH_SIZE):
+                stop = start + INDEX_BATCH_SIZE
+                rows = zip(keys[start:stop], dates.iloc[start:stop], weeks.iloc[start:stop],
+                           ratings.iloc[start:stop], sources.iloc[start:stop], texts.iloc[start:stop])
+                added += conn.executemany(
+                    "INSERT OR IGNORE INTO reviews "
+                    "(id, review_key, app_id, date, week_start, rating, source, full_text, facets) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    ((review_row_id(day, key), key, app_id, day.isoformat(), week, _rating(rating),
+                      _optional(source), text, " ".join(facet_terms(week, rating, app_id=app_id)))
+                     for key, day, week, rating, source, text in rows),
+                ).rowcount
+        return added
+    finally:
+        conn.close()
+
+def update_labels(reviews_tagged_df, db_path=DEFAULT_SEARCH_DB, app_id=None):
+    """
+    Store theme, sentiment and summary for tagged reviews already in the index.
+
+    Args:
+        reviews_tagged_df (pandas.DataFrame): Tagged reviews (e.g. reviews_week_tagged)
+        db_path (str): SQLite database file
+        app_id (str): App the reviews were indexed under
+
+    Returns:
+        int: Number of reviews updated
+    """
+    df = reviews_tagged_df
+    summaries = df["summary_1line"] if "summary_1line" in df.columns else pd.Series(None, index=df.index)
+    rows = list(zip(
+        df["week_start"].astype(str), pd.to_numeric(df["rating"], errors="coerce"),
+        df["theme"].astype(object), df["sentiment"].astype(object), summaries.astype(object), review_keys(df, app_id),
+    ))
+
+    conn = connect(db_path)
+    try:
+        updated = 0
+        with conn:
+            for start in range(0, len(rows), INDEX_BATCH_SIZE):
+                updated += conn.executemany(
+                    "UPDATE reviews SET theme = ?, sentiment = ?, summary_1line = ?, facets = ? WHERE review_key = ?",
+                    ((_optional(theme), _optional(sentiment), _optional(summary),
+                      " ".join(facet_terms(week, rating, theme, sentiment, app_id)), key)
+                     for week, rating, theme, sentiment, summary, key in rows[start:start + INDEX_BATCH_SIZE]),
+                ).rowcount
+        return updated
+    finally:
+        conn.close()
+
+def fts_query(text, week=None, theme=None, sentiment=None, rating=None, app_id=None):
+    """
+    Build an FTS5 query matching reviews whose text contains every word and
+    whose facets match every given filter. Each word is quoted so user input
+    cannot break the query syntax; a trailing * keeps prefix search ("withdraw*").
+
+    Returns:
+        str or None: FTS5 query, or None if text has no words
+    """
+    terms = []
+    for term in _QUERY_TERM.findall(text or ""):
+        word = term.rstrip("*")
+        terms.append(f'full_text : "{word}"' + ("*" if term.endswith("*") else ""))
+    if not terms:
+        return None
+    terms.extend(f'facets : "{facet}"' for facet in facet_terms(week, rating, theme, sentiment, app_id))
+    return " AND ".join(terms)
+
+def search_reviews(query, week=None, theme=None, sentiment=None, rating=None, app_id=None,
+                   limit=DEFAULT_LIMIT, offset=0, order="recent", db_path=DEFAULT_SEARCH_DB):
+    """
+    Search indexed reviews.
+
+    Args:
+        query (str): Words to search for (all must match)
+        week (str): Week start date "YYYY-MM-DD"
+        theme (str): Theme name
+        sentiment (str): POSITIVE, NEGATIVE or MIXED
+        rating (int): Star rating
+        app_id (str): App id, to search one app of a shared index
+        limit (int): Results per page (at most MAX_LIMIT)
+        offset (int): Results to skip
+        order (str): "recent" (newest reviews first) or "relevance" (BM25;
+            slower when a query matches many reviews)
+        db_path (str): SQLite database file
+
+    Returns:
+        dict: "total" matching reviews and "results", each with the review
+        fields and a highlighted "snippet"
+
+    Raises:
+        ValueError: If query has no searchable words or order is unknown
+    """
+    if order not in SEARCH_ORDERS:
+        raise ValueError(f"order must be one of {SEARCH_ORDERS}")
+    match = fts_query(query, week, theme, sentiment.upper() if sentiment else None, rating, app_id)
+    if match is None:
+        raise ValueError("Search query must contain at least one word")
+    limit = max(1, min(int(limit), MAX_LIMIT))
+    order_sql = "reviews_fts.rank" if order == "relevance" else "reviews_fts.rowid DESC"
+
+    if not os.path.exists(db_path):
+        return {"total": 0, "results": []}
+
+    conn = connect(db_path)
+    try:
+        total = conn.execute("SELECT COUNT(*) FROM reviews_fts WHERE reviews_fts MATCH ?", (match,)).fetchone()[0]
+        # Only the page of matches is joined back to the reviews table
+        rows = conn.execute(
+            f"""
+            SELECT r.app_id, r.date, r.week_start, r.rating, r.source, r.theme, r.sentiment, r.summary_1line,
+                   r.full_text, snippet(reviews_fts, 0, '<mark>', '</mark>', '…', 16) AS snippet
+            FROM reviews_fts CROSS JOIN reviews r ON r.id = reviews_fts.rowid
+            WHERE reviews_fts MATCH ?
+            ORDER BY {order_sql}
+            LIMIT ? OFFSET ?
+            """,
+            (match, limit, max(0, int(offset))),
+        ).fetchall()
+    finally:
+        conn.close()
+    return {"total": total, "results": [dict(row) for row in rows]}
+
+# Example usage
+if __name__ == "__main__":
+    import tempfile
+
+    from nodes.clean_and_bucket import clean_and_bucket
+
+    reviews = clean_and_bucket(pd.DataFrame({
+        "date": ["2025-11-17", "2025-11-18", "2025-11-19", "2025-11-25"],
+        "rating": [1, 2, 5, 1],
+        "review_text": [
+            "UPI payment failure, money debited",
+            "UPI failures every morning during SIP",
+            "Great app, UPI works fine",
+            "Withdrawal failed and support is slow",
+        ],
+    }))
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, "review_search.db")
+        print(f"Indexed {index_reviews(reviews, db, app_id='groww')} reviews")
+        print(f"Indexed {index_reviews(reviews, db, app_id='groww')} reviews on the second run")
+        print(f"Indexed {index_reviews(reviews.iloc[:1], db, app_id='kite')} reviews for another app")
+        tagged = reviews.assign(theme="Payments & SIP", sentiment="NEGATIVE", summary_1line="UPI issue")
+        print(f"Labelled {update_labels(tagged.iloc[:2], db, app_id='groww')} reviews")
+        print(search_reviews("UPI payment", app_id="kite", db_path=db))
+        print(search_reviews("UPI failures", db_path=db))
+        print(search_reviews("upi", theme="Payments & SIP", sentiment="negative", rating=2, db_path=db))
+        print(search_reviews("fail*", week="2025-11-24", db_path=db))
@@ -0,0 +1,101 @@
+"""
+Node helper: Rule-Based Theme Tagger
+Used by: LLM_Tag_Theme_Sentiment (backend="cascade", and sentiment/summary
+for backend="embedding")
+Type: Python – Vectorized rules
+
+Vectorized versions of the keyword rules in the mock tagger, plus a
+confidence score so a cascade can accept clear-cut reviews directly and send
+only ambiguous ones to the LLM.
+"""
+
+import numpy as np
+import pandas as pd
+
+from nodes.theme_legend import DEFAULT_THEME_KEYWORDS
+
+NEGATIVE_WORDS = ["frustrating", "crash", "slow", "issue", "problem", "bad"]
+POSITIVE_WORDS = ["great", "good", "excellent", "love", "amazing", "perfect"]
+
+# A 3-star rating leaves sentiment to the review text, which the keyword
+# lexicon reads poorly, so confidence is scaled down for those reviews
+MIXED_RATING_FACTOR = 0.5
+
+def _word_counts(lower, words):
+    return sum(lower.str.contains(word, regex=False).to_numpy(dtype=int) for word in words)
+
+def rule_sentiment(texts, ratings):
+    """
+    Vectorized version of the rating + keyword sentiment rule used by the mock tagger.
+
+    Args:
+        texts (pandas.Series): Review texts
+        ratings (pandas.Series): Star ratings
+
+    Returns:
+        numpy.ndarray: POSITIVE / NEGATIVE / NEUTRAL labels
+    """
+    lower = texts.fillna("").astype(str).str.lower()
+    ratings = pd.to_numeric(ratings, errors="coerce").fillna(0).to_numpy()
+
+    neg_count = _word_counts(lower, NEGATIVE_WORDS)
+    pos_count = _word_counts(lower, POSITIVE_WORDS)
+
+    return np.select(
+        [ratings >= 4, ratings <= 2, neg_count > pos_count, pos_count > neg_count],
+        ["POSITIVE", "NEGATIVE", "NEGATIVE", "POSITIVE"],
+        default="NEUTRAL"
+    ).astype(object)
+
+def rule_summary(texts):
+    """
+    Vectorized version of the mock tagger's summary (first 50 characters).
+    """
+    texts = texts.fillna("").astype(str)
+    return np.where(texts.str.len() > 50, texts.str[:50] + "...", texts).astype(object)
+
+def keyword_theme_scores(texts, ratings, theme_keywords=None):
+    """
+    Tag themes with the keyword legend and score how clear-cut each match is.
+
+    Confidence is 1 / number of themes whose keywords appear (0 when none do,
+    in which case the catch-all theme is used), halved for 3-star reviews.
+
+    Args:
+        texts (pandas.Series): Review texts
+        ratings (pandas.Series): Star ratings
+        theme_keywords (dict): Ordered theme legend; defaults to the Groww legend
+
+    Returns:
+        tuple: (themes as numpy object array, confidence as float array)
+    """
+    theme_keywords = theme_keywords or DEFAULT_THEME_KEYWORDS
+    themes = list(theme_keywords)
+    lower = texts.fillna("").astype(str).str.lower()
+    ratings = pd.to_numeric(ratings, errors="coerce").fillna(0).to_numpy()
+
+    hits = np.zeros((len(lower), max(len(themes) - 1, 1)), dtype=bool)
+    for i, theme in enumerate(themes[:-1]):
+        for keyword in theme_keywords[theme]:
+            hits[:, i] |= lower.str.contains(keyword, regex=False).to_numpy(dtype=bool)
+
+    n_hits = hits.sum(axis=1)
+    # Same precedence as the mock tagger: first matching theme in legend order
+    first_hit = np.where(n_hits > 0, hits.argmax(axis=1), len(themes) - 1)
+    confidence = np.where(n_hits > 0, 1.0 / np.maximum(n_hits, 1), 0.0)
+    confidence = np.where(ratings == 3, confidence * MIXED_RATING_FACTOR, confidence)
+
+    return np.array(themes, dtype=object)[first_hit], confidence
+
+# Example usage
+if __name__ == "__main__":
+    texts = pd.Series([
+        "KYC verification pending for a week",
+        "SIP payment failed and withdrawal stuck",
+        "App is okay, statement download works",
+        "Nice"
+    ])
+    ratings = pd.Series([1, 1, 3, 5])
+    themes, confidence = keyword_theme_scores(texts, ratings)
+    for text, theme, conf, sentiment in zip(texts, themes, confidence, rule_sentiment(texts, ratings)):
+        print(f"{conf:.2f}  {theme:<24} {sentiment:<9} {text}")
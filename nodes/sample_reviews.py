@@ -0,0 +1,105 @@
+"""
+Node: Python – Stratified Review Sample
+Node name: Sample_Reviews
+Type: Python Transform
+Input: reviews_week (representatives after Dedup_Reviews)
+Parameter: sample_size (int, e.g. 2000)
+Output: reviews_week_sample (columns added: sample_stratum, sample_weight)
+
+Viral weeks can have tens of thousands of reviews, but theme shares only
+need a few thousand tagged ones. Reviews are split into strata by rating and
+source, each stratum gets a share of the sample proportional to its size (at
+least two reviews, so its variance can be estimated), and rows are drawn
+without replacement. sample_weight is the stratum's population over its
+sample size; theme_stats uses it to report estimated counts and negative
+shares with confidence intervals.
+"""
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_STRATA = ("rating", "source")
+MIN_PER_STRATUM = 2
+
+def allocate_sample(stratum_sizes, sample_size):
+    """
+    Proportional allocation with largest remainders, at least MIN_PER_STRATUM
+    rows per stratum and never more than the stratum has.
+
+    Args:
+        stratum_sizes (numpy.ndarray): Rows per stratum
+        sample_size (int): Target sample size
+
+    Returns:
+        numpy.ndarray: Rows to draw per stratum
+    """
+    sizes = np.asarray(stratum_sizes, dtype=np.int64)
+    quota = sample_size * sizes / sizes.sum()
+    alloc = np.floor(quota).astype(np.int64)
+    short = sample_size - alloc.sum()
+    if short > 0:
+        alloc[np.argsort(alloc - quota, kind="stable")[:short]] += 1
+    return np.minimum(np.maximum(alloc, MIN_PER_STRATUM), sizes)
+
+def sample_reviews(input_df, sample_size, strata=DEFAULT_STRATA, seed=0):
+    """
+    Draw a stratified random sample of reviews to tag.
+
+    Args:
+        input_df (pandas.DataFrame): Reviews for the target week
+        sample_size (int): Rows to tag; slightly more are drawn when small
+            strata need their minimum of MIN_PER_STRATUM rows
+        strata (tuple): Columns to stratify by; missing columns are skipped
+        seed (int): Random seed, so a rerun tags the same reviews
+
+    Returns:
+        pandas.DataFrame: Sampled rows in their original order with
+        sample_stratum and sample_weight columns, or a copy of input_df with
+        sample_weight 1 when it has no more than sample_size rows. Sample
+        sizes are stored in df.attrs["sampling"]
+    """
+    df = input_df
+    strata = [c for c in strata if c in df.columns]
+    if strata:
+        ids = df.groupby(strata, dropna=False, observed=True, sort=True).ngroup().to_numpy()
+    else:
+        ids = np.zeros(len(df), dtype=np.int64)
+    sizes = np.bincount(ids, minlength=1)
+
+    if len(df) <= sample_size:
+        alloc = sizes
+        chosen = np.arange(len(df))
+    else:
+        alloc = allocate_sample(sizes, sample_size)
+        # Shuffle, group by stratum keeping the shuffled order, and take the
+        # first alloc[h] rows of each stratum
+        rng = np.random.default_rng(seed)
+        shuffled = rng.permutation(len(df))
+        shuffled = shuffled[np.argsort(ids[shuffled], kind="stable")]
+        rank = np.arange(len(df)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+        chosen = np.sort(shuffled[rank < alloc[ids[shuffled]]])
+
+    out = df.iloc[chosen].copy()
+    out["sample_stratum"] = ids[chosen]
+    out["sample_weight"] = (sizes / np.maximum(alloc, 1))[ids[chosen]]
+    out = out.reset_index(drop=True)
+    out.attrs["sampling"] = {
+        "population": int(len(df)),
+        "sampled": int(len(out)),
+        "strata": int((sizes > 0).sum()),
+        "strata_columns": strata,
+    }
+    return out
+
+# Example usage
+if __name__ == "__main__":
+    rng = np.random.default_rng(1)
+    n = 20000
+    input_df = pd.DataFrame({
+        "full_text": [f"review {i}" for i in range(n)],
+        "rating": rng.choice([1, 2, 3, 4, 5], n, p=[0.4, 0.1, 0.1, 0.1, 0.3]),
+        "source": rng.choice(["playstore", "trustpilot"], n, p=[0.9, 0.1]),
+    })
+    output_df = sample_reviews(input_df, 1000)
+    print(output_df.attrs["sampling"])
+    print(output_df.groupby(["rating", "source"]).agg(rows=("full_text", "size"), weight=("sample_weight", "first")))
@@ -21,7 +21,8 @@ def send_weekly_email(email_subject, email_body, to_email, smtp_server=None, smt
     Args:
         email_subject (str): Subject of the email
         email_body (str): Body content of the email
-        to_email (str): Recipient email address
+        to_email (str or list): Recipient email address, a comma-separated
+            string of addresses, or a list of addresses
         smtp_server (str): SMTP server address (optional)
         smtp_port (int): SMTP server port (optional)
         sender_email (str): Sender email address (optional)
@@ -41,10 +42,15 @@ def send_weekly_email(email_subject, email_body, to_email, smtp_server=None, smt
     if not sender_password:
         sender_password = os.getenv("SENDER_PASSWORD", "your-app-password")
     
+    if isinstance(to_email, str):
+        recipients = [addr.strip() for addr in to_email.split(",") if addr.strip()]
+    else:
+        recipients = list(to_email)
+    
     # Create message
     msg = MIMEMultipart()
     msg['From'] = sender_email
-    msg['To'] = to_email
+    msg['To'] = ", ".join(recipients)
     msg['Subject'] = email_subject
     
     # Add body to email
@@ -58,7 +64,7 @@ def send_weekly_email(email_subject, email_body, to_email, smtp_server=None, smt
         
         # Send email
         text = msg.as_string()
-        server.sendmail(sender_email, to_email, text)
+        server.sendmail(sender_email, recipients, text)
         server.quit()
         
         print("Email sent successfully!")
@@ -0,0 +1,276 @@
+"""
+Node: Materialize Weekly Summary Tables
+Node name: Summary_Tables
+Type: Python – Persist
+Inputs: themes_week_stats, reviews_week_tagged, parsed_email
+Output: summaries.db (SQLite)
+
+Precomputed per-week rows that the results and showcase pages (and trend
+charts) read instead of recomputing from raw reviews:
+
+    week_summary        one row per dataset and week: totals, average rating,
+                        weekly note and email draft
+    week_theme_stats    theme_stats output per dataset, week and theme
+    week_sentiment      review counts per dataset, week, theme and sentiment
+    week_ratings        rating histogram per dataset and week
+
+A dataset is an app id for pipeline runs, or an upload / "corpus" for the web
+app. Each save replaces the rows of its (dataset, week) in one transaction.
+"""
+
+import os
+import sqlite3
+import time
+
+import pandas as pd
+
+DEFAULT_SUMMARY_DB = "summaries.db"
+
+# Seconds to wait for another worker's write to finish
+BUSY_TIMEOUT = 30
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS week_summary (
+    dataset TEXT NOT NULL,
+    week_start TEXT NOT NULL,
+    source_version TEXT,
+    total_reviews INTEGER NOT NULL,
+    week_reviews INTEGER NOT NULL,
+    avg_rating REAL,
+    negative_count INTEGER NOT NULL,
+    weekly_note_md TEXT,
+    email_subject TEXT,
+    email_body TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (dataset, week_start)
+);
+CREATE TABLE IF NOT EXISTS week_theme_stats (
+    dataset TEXT NOT NULL,
+    week_start TEXT NOT NULL,
+    theme TEXT NOT NULL,
+    review_count INTEGER NOT NULL,
+    avg_rating REAL,
+    negative_count INTEGER NOT NULL,
+    neg_share REAL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (dataset, week_start, theme)
+);
+CREATE TABLE IF NOT EXISTS week_sentiment (
+    dataset TEXT NOT NULL,
+    week_start TEXT NOT NULL,
+    theme TEXT NOT NULL,
+    sentiment TEXT NOT NULL,
+    review_count INTEGER NOT NULL,
+    PRIMARY KEY (dataset, week_start, theme, sentiment)
+);
+CREATE TABLE IF NOT EXISTS week_ratings (
+    dataset TEXT NOT NULL,
+    week_start TEXT NOT NULL,
+    rating INTEGER NOT NULL,
+    review_count INTEGER NOT NULL,
+    PRIMARY KEY (dataset, week_start, rating)
+);
+"""
+
+TABLES = ["week_summary", "week_theme_stats", "week_sentiment", "week_ratings"]
+
+def connect(db_path=DEFAULT_SUMMARY_DB):
+    """
+    Open the summary database, creating the tables on first use.
+    """
+    db_dir = os.path.dirname(db_path)
+    if db_dir:
+        os.makedirs(db_dir, exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT)
+    conn.row_factory = sqlite3.Row
+    # Readers (web workers) never block the weekly writer, and vice versa
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+def _optional_float(value):
+    return None if pd.isna(value) else float(value)
+
+def save_week_summary(dataset, target_week_start, themes_week_stats_df, reviews_week_tagged_df,
+                      parsed_email_df=None, total_reviews=None, source_version=None,
+                      db_path=DEFAULT_SUMMARY_DB):
+    """
+    Store the summary rows for one dataset and week, replacing older ones.
+
+    Args:
+        dataset (str): App id, upload id or "corpus"
+        target_week_start (str): Week start date "YYYY-MM-DD"
+        themes_week_stats_df (pandas.DataFrame): Output of theme_stats
+        reviews_week_tagged_df (pandas.DataFrame): Tagged reviews for the week
+        parsed_email_df (pandas.DataFrame): Output of parse_email_json, optional
+        total_reviews (int): Reviews in the whole input; defaults to the week's count
+        source_version (str): Version of the input file the rows were computed from
+        db_path (str): SQLite database file
+
+    Returns:
+        str: Path of the database
+    """
+    reviews = reviews_week_tagged_df
+    # A stratified sample (sample_reviews) counts each row as the reviews it stands for
+    weights = pd.Series(1.0, index=reviews.index)
+    if "sample_weight" in reviews.columns:
+        weights = reviews["sample_weight"] * (reviews["dup_count"] if "dup_count" in reviews.columns else 1)
+    week_reviews = int(round(weights.sum()))
+    ratings = pd.to_numeric(reviews["rating"], errors="coerce")
+    rating_counts = weights[ratings.notna()].groupby(ratings.dropna().astype(int)).sum().round().astype(int)
+    sentiments = weights.groupby([reviews["theme"], reviews["sentiment"]], observed=True).sum().round().astype(int)
+
+    email = {}
+    if parsed_email_df is not None and not parsed_email_df.empty:
+        email = parsed_email_df.iloc[0].to_dict()
+
+    summary_row = (
+        dataset, target_week_start, source_version,
+        int(total_reviews if total_reviews is not None else week_reviews), week_reviews,
+        _optional_float((ratings * weights).sum() / weights[ratings.notna()].sum()) if ratings.notna().any() else None,
+        int(themes_week_stats_df["negative_count"].sum()),
+        email.get("weekly_note_md"), email.get("email_subject"), email.get("email_body"),
+        time.time(),
+    )
+    theme_rows = [
+        (dataset, target_week_start, str(row.theme), int(row.review_count),
+         _optional_float(row.avg_rating), int(row.negative_count), _optional_float(row.neg_share), position)
+        for position, row in enumerate(themes_week_stats_df.itertuples(index=False))
+    ]
+    sentiment_rows = [
+        (dataset, target_week_start, str(theme), str(sentiment), int(count))
+        for (theme, sentiment), count in sentiments.items()
+    ]
+    rating_rows = [
+        (dataset, target_week_start, int(rating), int(count))
+        for rating, count in rating_counts.sort_index().items()
+    ]
+
+    conn = connect(db_path)
+    try:
+        with conn:
+            for table in TABLES:
+                conn.execute(f"DELETE FROM {table} WHERE dataset = ? AND week_start = ?",
+                             (dataset, target_week_start))
+            conn.execute(f"INSERT INTO week_summary VALUES ({', '.join('?' * 11)})", summary_row)
+            conn.executemany("INSERT INTO week_theme_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?)", theme_rows)
+            conn.executemany("INSERT INTO week_sentiment VALUES (?, ?, ?, ?, ?)", sentiment_rows)
+            conn.executemany("INSERT INTO week_ratings VALUES (?, ?, ?, ?)", rating_rows)
+    finally:
+        conn.close()
+    return db_path
+
+def load_week_summary(dataset, target_week_start, source_version=None, db_path=DEFAULT_SUMMARY_DB):
+    """
+    Read the stored summary for one dataset and week.
+
+    Args:
+        dataset (str): App id, upload id or "corpus"
+        target_week_start (str): Week start date "YYYY-MM-DD"
+        source_version (str): If given, rows computed from another version of
+            the input are treated as missing
+        db_path (str): SQLite database file
+
+    Returns:
+        dict or None: week_summary columns plus "themes_stats" (theme_stats
+        records in their original order), "sentiment_counts" and "rating_histogram"
+    """
+    if not os.path.exists(db_path):
+        return None
+
+    conn = connect(db_path)
+    try:
+        key = (dataset, target_week_start)
+        summary = conn.execute(
+            "SELECT * FROM week_summary WHERE dataset = ? AND week_start = ?", key
+        ).fetchone()
+        if summary is None or (source_version is not None and summary["source_version"] != source_version):
+            return None
+
+        result = dict(summary)
+        result["themes_stats"] = [
+            dict(row) for row in conn.execute(
+                "SELECT theme, review_count, avg_rating, negative_count, neg_share FROM week_theme_stats "
+                "WHERE dataset = ? AND week_start = ? ORDER BY position", key
+            )
+        ]
+        result["sentiment_counts"] = {
+            row["sentiment"]: row["review_count"] for row in conn.execute(
+                "SELECT sentiment, SUM(review_count) AS review_count FROM week_sentiment "
+                "WHERE dataset = ? AND week_start = ? GROUP BY sentiment ORDER BY sentiment", key
+            )
+        }
+        result["rating_histogram"] = {
+            row["rating"]: row["review_count"] for row in conn.execute(
+                "SELECT rating, review_count FROM week_ratings "
+                "WHERE dataset = ? AND week_start = ? ORDER BY rating", key
+            )
+        }
+        return result
+    finally:
+        conn.close()
+
+def load_weekly_trend(dataset, weeks=12, db_path=DEFAULT_SUMMARY_DB):
+    """
+    Per-week totals for the most recent weeks of a dataset, oldest first.
+
+    Args:
+        dataset (str): App id, upload id or "corpus"
+        weeks (int): Number of weeks to return
+        db_path (str): SQLite database file
+
+    Returns:
+        list of dict: week_start, week_reviews, avg_rating, negative_count,
+        neg_share and top_theme per week
+    """
+    if not os.path.exists(db_path):
+        return []
+
+    conn = connect(db_path)
+    try:
+        rows = conn.execute(
+            """
+            SELECT s.week_start, s.week_reviews, s.avg_rating, s.negative_count,
+                   (SELECT t.theme FROM week_theme_stats t
+                    WHERE t.dataset = s.dataset AND t.week_start = s.week_start
+                    ORDER BY t.position LIMIT 1) AS top_theme
+            FROM week_summary s
+            WHERE s.dataset = ?
+            ORDER BY s.week_start DESC
+            LIMIT ?
+            """,
+            (dataset, weeks),
+        ).fetchall()
+    finally:
+        conn.close()
+
+    trend = []
+    for row in reversed(rows):
+        week = dict(row)
+        week["neg_share"] = round(week["negative_count"] / week["week_reviews"], 2) if week["week_reviews"] else 0.0
+        if week["avg_rating"] is not None:
+            week["avg_rating"] = round(week["avg_rating"], 2)
+        trend.append(week)
+    return trend
+
+# Example usage
+if __name__ == "__main__":
+    import tempfile
+
+    stats = pd.DataFrame({
+        "theme": ["App Performance & Bugs", "Payments & SIP"],
+        "review_count": [3, 1],
+        "avg_rating": [2.33, 4.0],
+        "negative_count": [2, 0],
+        "neg_share": [0.67, 0.0]
+    })
+    tagged = pd.DataFrame({
+        "theme": ["App Performance & Bugs"] * 3 + ["Payments & SIP"],
+        "sentiment": ["NEGATIVE", "NEGATIVE", "POSITIVE", "MIXED"],
+        "rating": [1, 1, 5, 4],
+    })
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, "summaries.db")
+        save_week_summary("groww", "2025-11-17", stats, tagged, db_path=db)
+        print(load_week_summary("groww", "2025-11-17", db_path=db))
+        print(load_weekly_trend("groww", db_path=db))
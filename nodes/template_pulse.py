@@ -0,0 +1,269 @@
+"""
+Node: Python – Template Weekly Pulse (no LLM)
+Node name: Template_Weekly_Pulse
+Type: Python – Table → Text
+Inputs:
+themes_week_stats (as table)
+reviews_week_tagged (as table)
+themes_week_diff (optional, from Theme_Diff)
+Output: weekly_note_and_email in the same note + JSON format as LLM_Weekly_Pulse
+
+Builds the weekly note from the numbers instead of a model call:
+
+- executive summary: week volume, rating and negative share, the theme with
+  the most negative reviews, and the week-over-week comparison;
+- top 3 themes in theme_stats order, each with its numbers and one quote;
+- one action line per top theme, worded by its negative share and its most
+  mentioned terms.
+
+Quotes are the reviews closest to their theme's centroid. Each review's
+summary_1line is embedded with the hashing vectorizer of the embedding
+tagger, and cosine similarity is scored against the mean vector of its
+theme and sentiment in one vectorized pass over the week.
+"""
+
+import json
+import re
+
+import numpy as np
+import pandas as pd
+
+from nodes.llm_weekly_pulse import NO_COMPARISON_LINE, STOPWORDS
+from nodes.time_buckets import pulse_subject, pulse_title
+from nodes.theme_diff import describe_changes
+
+# Words per quote, terms per action line, and the note's word budget
+QUOTE_WORDS = 20
+ACTION_TERMS = 3
+MAX_NOTE_WORDS = 250
+
+# Negative share from which a theme's action asks for fixes / a review
+FIX_NEG_SHARE = 0.5
+REVIEW_NEG_SHARE = 0.2
+
+# Usernames, emails, phone numbers and long IDs are not quoted
+PII_PATTERNS = [
+    re.compile(r"\S+@\S+"),
+    re.compile(r"@\w+"),
+    re.compile(r"\+?\d[\d\s-]{7,}\d"),
+    re.compile(r"\b[A-Z0-9]{10,}\b"),
+]
+
+_vectorizer = None
+
+def get_vectorizer():
+    """
+    Shared hashing vectorizer (the embedding tagger's), built on first use.
+    """
+    global _vectorizer
+    if _vectorizer is None:
+        from nodes.embedding_tagger import HashingThemeClassifier
+
+        _vectorizer = HashingThemeClassifier()
+    return _vectorizer
+
+def centrality_scores(texts, groups):
+    """
+    Cosine similarity of each text to the mean vector of its group.
+
+    Args:
+        texts (pandas.Series): Texts to embed
+        groups (numpy.ndarray): Integer group code per text
+
+    Returns:
+        numpy.ndarray: float64 score per text (0 for texts with no words)
+    """
+    vectorizer = get_vectorizer()
+    n_features = vectorizer.n_features
+    rows, columns, values = vectorizer._features(texts.reset_index(drop=True))
+    scores = np.zeros(len(texts))
+    if len(rows) == 0:
+        return scores
+
+    # Group centroids as one flat (group, feature) array
+    group_sizes = np.bincount(groups, minlength=groups.max() + 1)
+    cells = groups[rows] * n_features + columns
+    centroids = np.bincount(cells, weights=values, minlength=len(group_sizes) * n_features)
+    centroids = centroids.reshape(len(group_sizes), n_features) / np.maximum(group_sizes, 1)[:, None]
+    norms = np.linalg.norm(centroids, axis=1)
+
+    dots = np.bincount(rows, weights=values * centroids.ravel()[cells], minlength=len(texts))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = np.nan_to_num(dots / norms[groups])
+    return scores
+
+def clean_quote(text, max_words=QUOTE_WORDS):
+    """
+    Review text as a short quote without PII (or braces, which would confuse
+    parse_email_json), cut to max_words (None keeps every word).
+    """
+    text = str(text)
+    for pattern in PII_PATTERNS:
+        text = pattern.sub("", text)
+    words = text.replace("{", "").replace("}", "").replace('"', "'").split()
+    if max_words is None or len(words) <= max_words:
+        return " ".join(words)
+    return " ".join(words[:max_words]) + "..."
+
+def representative_quotes(reviews_df, themes):
+    """
+    Most central review of each theme, within its majority sentiment.
+
+    Args:
+        reviews_df (pandas.DataFrame): Tagged reviews (theme, sentiment,
+            full_text and, if present, summary_1line)
+        themes (list): Themes to quote
+
+    Returns:
+        dict: theme -> review text (PII removed, not shortened)
+    """
+    df = reviews_df[reviews_df["theme"].isin(themes)]
+    if df.empty:
+        return {}
+    texts = df["summary_1line"] if "summary_1line" in df.columns else df["full_text"]
+    texts = texts.fillna(df["full_text"]).astype(str)
+
+    theme_sentiment = df["theme"].astype(str) + "\x00" + df["sentiment"].astype(str)
+    groups, _ = pd.factorize(theme_sentiment)
+    scores = pd.Series(centrality_scores(texts, groups), index=df.index)
+
+    # Quote the theme's most common sentiment; ties go to NEGATIVE, then alphabetical
+    counts = df.groupby(["theme", "sentiment"], observed=True).size().reset_index(name="n")
+    counts["negative"] = counts["sentiment"].astype(str) == "NEGATIVE"
+    majority = (counts.sort_values(["n", "negative", "sentiment"], ascending=[False, False, True])
+                .drop_duplicates("theme").set_index("theme")["sentiment"].astype(str))
+
+    in_majority = df["sentiment"].astype(str).to_numpy() == df["theme"].astype(str).map(majority).to_numpy()
+    best = scores[in_majority].groupby(df["theme"].astype(str)[in_majority]).idxmax()
+    return {theme: clean_quote(df.at[best[theme], "full_text"], max_words=None) for theme in themes if theme in best.index}
+
+def top_terms(reviews_df, themes, n=ACTION_TERMS):
+    """
+    Most mentioned words in each theme's negative reviews (all reviews for
+    themes without negative ones).
+
+    Returns:
+        dict: theme -> list of terms
+    """
+    df = reviews_df[reviews_df["theme"].isin(themes)]
+    negative = df["sentiment"].astype(str) == "NEGATIVE"
+    has_negative = negative.groupby(df["theme"].astype(str)).transform("any")
+    df = df[negative | ~has_negative]
+
+    words = df["full_text"].fillna("").astype(str).str.lower().str.findall(r"[a-z']{4,}")
+    words = pd.DataFrame({"theme": df["theme"].astype(str), "word": words}).explode("word").dropna()
+    words = words[~words["word"].isin(STOPWORDS)]
+    counts = words.groupby(["theme", "word"]).size().reset_index(name="n")
+    counts = counts.sort_values(["theme", "n", "word"], ascending=[True, False, True])
+    return {theme: list(group["word"].head(n)) for theme, group in counts.groupby("theme")}
+
+def action_line(row, terms, period="week"):
+    mention = f"; most mention {', '.join(terms)}" if terms else ""
+    if row.neg_share >= FIX_NEG_SHARE:
+        return f"[Action] Prioritise fixes for {row.theme}: {row.negative_count} negative reviews this {period}{mention}"
+    if row.neg_share >= REVIEW_NEG_SHARE:
+        return f"[Action] Review recent {row.theme} complaints ({row.negative_count} negative{mention})"
+    return f"[Action] Share what users like about {row.theme} ({1 - row.neg_share:.0%} non-negative) with the team"
+
+def template_pulse(themes_week_stats_df, reviews_week_tagged_df, target_week_start, app_name="Groww",
+                   themes_week_diff_df=None, granularity="week"):
+    """
+    Generate the weekly pulse note and email JSON from the stats, without an LLM.
+
+    Args:
+        themes_week_stats_df (pandas.DataFrame): Output of theme_stats
+        reviews_week_tagged_df (pandas.DataFrame): Tagged reviews for the week
+        target_week_start (str): Target week start date
+        app_name (str): App name used in the note title
+        themes_week_diff_df (pandas.DataFrame): Optional output of theme_diff
+        granularity (str): Bucket the reviews cover (see time_buckets.py),
+            used in the title, subject and wording
+
+    Returns:
+        str: Weekly note followed by the {"email_subject", "email_body"} JSON block
+    """
+    stats = themes_week_stats_df.reset_index(drop=True)
+    reviews = reviews_week_tagged_df
+    title = pulse_title(app_name, target_week_start, granularity)
+
+    total = int(stats["review_count"].sum())
+    negative = int(stats["negative_count"].sum())
+    ratings = pd.to_numeric(reviews["rating"], errors="coerce")
+    average_rating = ratings.mean()
+    if "sample_weight" in reviews.columns:
+        weights = reviews["sample_weight"] * (reviews["dup_count"] if "dup_count" in reviews.columns else 1)
+        weights = weights[ratings.notna()]
+        average_rating = (ratings.dropna() * weights).sum() / weights.sum()
+    comparison = NO_COMPARISON_LINE
+    if themes_week_diff_df is not None and not themes_week_diff_df.empty:
+        comparison = describe_changes(themes_week_diff_df)
+
+    if total == 0:
+        summary = [f"No reviews were received for the {granularity} of {target_week_start}", comparison]
+        top, quotes, terms = stats.head(0), {}, {}
+    else:
+        summary = [f"{total} reviews this {granularity}, average rating {average_rating:.1f}/5, "
+                   f"{negative / total:.0%} negative"]
+        worst = stats.sort_values(["negative_count", "neg_share"], ascending=False).iloc[0]
+        if worst.negative_count:
+            summary.append(f"Biggest concern: {worst.theme} with {worst.negative_count} negative reviews "
+                           f"({worst.neg_share:.0%} of the theme)")
+        if "sampled_count" in stats.columns:
+            # theme_stats of a stratified sample (sample_reviews)
+            top_margin = ((stats["neg_share_high"] - stats["neg_share_low"]) / 2).head(3).max()
+            summary.append(f"Estimated from a tagged sample of {int(stats['sampled_count'].sum())} reviews; "
+                           f"top theme negative shares within ±{top_margin:.0%}")
+        summary.append(comparison)
+        top = stats.head(3)
+        quotes = representative_quotes(reviews, list(top["theme"]))
+        terms = top_terms(reviews, list(top["theme"]))
+
+    def theme_line(i, row, quote_words):
+        line = (f"{i}. {row.theme}: {row.review_count} reviews ({row.review_count / total:.0%} of the {granularity}), "
+                f"average rating {row.avg_rating:.1f}, {row.neg_share:.0%} negative.")
+        if quote_words and quotes.get(row.theme):
+            line += f" \"{clean_quote(quotes[row.theme], quote_words)}\""
+        return line
+
+    actions = [action_line(row, terms.get(row.theme, []), granularity) for row in top.itertuples(index=False)]
+
+    # Keep to the note's word budget, shortening the quotes first
+    for quote_words in (QUOTE_WORDS, 12, 6, 0):
+        theme_lines = [theme_line(i, row, quote_words) for i, row in enumerate(top.itertuples(index=False), 1)]
+        note = "\n".join(
+            [title, "", "• Executive summary"] + [f"  - {line}" for line in summary]
+            + ["", "• Top Themes"] + [f"  {line}" for line in theme_lines]
+            + [""] + actions
+        )
+        if len(note.split()) <= MAX_NOTE_WORDS:
+            break
+
+    email = {
+        "email_subject": pulse_subject(target_week_start, granularity),
+        "email_body": note,
+    }
+    return f"{note}\n\n{json.dumps(email, ensure_ascii=False, indent=2)}\n"
+
+# Example usage
+if __name__ == "__main__":
+    from nodes.parse_email_json import parse_email_json
+    from nodes.theme_stats import theme_stats
+
+    reviews = pd.DataFrame({
+        "theme": ["App Performance & Bugs"] * 4 + ["Payments & SIP"] * 2 + ["Onboarding & KYC"],
+        "sentiment": ["NEGATIVE", "NEGATIVE", "NEGATIVE", "POSITIVE", "NEGATIVE", "POSITIVE", "POSITIVE"],
+        "rating": [1, 2, 1, 5, 2, 4, 5],
+        "full_text": [
+            "App keeps crashing when I open my portfolio",
+            "App crashing after the latest update, very slow",
+            "Crashing every morning at market open, call me on 98765 43210",
+            "Smooth and fast app",
+            "UPI payment failed but money was debited",
+            "SIP setup was quick",
+            "KYC done in ten minutes",
+        ],
+    })
+    reviews["summary_1line"] = reviews["full_text"].str.slice(0, 50)
+    output_text = template_pulse(theme_stats(reviews), reviews, "2025-11-17")
+    print(output_text)
+    print(parse_email_json(pd.DataFrame([{"content": output_text}])).iloc[0]["email_subject"])
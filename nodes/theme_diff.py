@@ -0,0 +1,128 @@
+"""
+Node: Python – Week-over-Week Theme Diff
+Node name: Theme_Diff
+Type: Python Transform
+Inputs: themes_week_stats, previous week snapshot (from Weekly_Snapshot)
+Output: themes_week_diff
+"""
+
+import pandas as pd
+
+# Changes smaller than these are reported as UNCHANGED
+MIN_COUNT_DELTA = 2
+MIN_NEG_SHARE_DELTA = 0.10
+
+def theme_diff(themes_week_stats_df, previous_snapshot):
+    """
+    Compare this week's theme stats with the previous snapshot.
+
+    Args:
+        themes_week_stats_df (pandas.DataFrame): Output of theme_stats for this week
+        previous_snapshot (dict): Output of load_previous_snapshot, or None
+
+    Returns:
+        pandas.DataFrame: One row per theme seen in either week, with a status of
+        NEW, RESOLVED, WORSENED, IMPROVED or UNCHANGED and the deltas. Empty if
+        there is no previous snapshot.
+    """
+    columns = [
+        "theme", "status", "review_count", "prev_review_count", "count_delta",
+        "neg_share", "prev_neg_share", "neg_share_delta", "avg_rating", "prev_avg_rating",
+        "prev_week_start"
+    ]
+    if previous_snapshot is None:
+        return pd.DataFrame(columns=columns)
+
+    current = themes_week_stats_df[["theme", "review_count", "neg_share", "avg_rating"]]
+    previous = previous_snapshot["theme_stats"][["theme", "review_count", "neg_share", "avg_rating"]]
+
+    df = current.merge(previous, on="theme", how="outer", suffixes=("", "_prev"), indicator=True)
+    df = df.rename(columns={
+        "review_count_prev": "prev_review_count",
+        "neg_share_prev": "prev_neg_share",
+        "avg_rating_prev": "prev_avg_rating",
+    })
+
+    df["review_count"] = df["review_count"].fillna(0).astype(int)
+    df["prev_review_count"] = df["prev_review_count"].fillna(0).astype(int)
+    df["count_delta"] = df["review_count"] - df["prev_review_count"]
+    df["neg_share_delta"] = (df["neg_share"].fillna(0) - df["prev_neg_share"].fillna(0)).round(2)
+
+    significant = (df["count_delta"].abs() >= MIN_COUNT_DELTA) | (df["neg_share_delta"].abs() >= MIN_NEG_SHARE_DELTA)
+    worse = (df["neg_share_delta"] > 0) | ((df["neg_share_delta"] == 0) & (df["count_delta"] > 0))
+
+    df["status"] = "UNCHANGED"
+    df.loc[significant & worse, "status"] = "WORSENED"
+    df.loc[significant & ~worse, "status"] = "IMPROVED"
+    df.loc[df["_merge"] == "left_only", "status"] = "NEW"
+    df.loc[df["_merge"] == "right_only", "status"] = "RESOLVED"
+
+    df["prev_week_start"] = previous_snapshot["week_start"]
+
+    # Biggest movers first
+    df = df.assign(_abs_delta=df["count_delta"].abs()).sort_values(
+        ["_abs_delta", "neg_share_delta"], ascending=[False, False]
+    )
+    return df[columns].reset_index(drop=True)
+
+def changed_themes(themes_week_diff_df):
+    """
+    Rows of a theme diff that are worth reporting (anything but UNCHANGED).
+    """
+    if themes_week_diff_df.empty:
+        return themes_week_diff_df
+    return themes_week_diff_df[themes_week_diff_df["status"] != "UNCHANGED"].reset_index(drop=True)
+
+def describe_changes(themes_week_diff_df, max_items=3):
+    """
+    One-sentence plain-English summary of the biggest week-over-week changes.
+
+    Returns:
+        str: Summary, or "" if there is no previous week to compare with
+    """
+    if themes_week_diff_df.empty:
+        return ""
+
+    prev_week = themes_week_diff_df["prev_week_start"].iloc[0]
+    changes = changed_themes(themes_week_diff_df).head(max_items)
+    if changes.empty:
+        return f"No theme changed significantly compared with the week of {prev_week}"
+
+    parts = []
+    for row in changes.itertuples(index=False):
+        if row.status == "NEW":
+            parts.append(f"{row.theme} emerged ({row.review_count} reviews)")
+        elif row.status == "RESOLVED":
+            parts.append(f"{row.theme} dropped out (was {row.prev_review_count} reviews)")
+        else:
+            verb = "worsened" if row.status == "WORSENED" else "improved"
+            parts.append(
+                f"{row.theme} {verb} ({row.count_delta:+d} reviews, "
+                f"negative share {round(row.neg_share_delta * 100):+d} pts)"
+            )
+    return f"Compared with the week of {prev_week}: " + "; ".join(parts)
+
+# Example usage
+if __name__ == "__main__":
+    current = pd.DataFrame({
+        "theme": ["App Performance & Bugs", "Payments & SIP", "Withdrawals & Payouts"],
+        "review_count": [15, 12, 4],
+        "avg_rating": [2.3, 3.8, 1.5],
+        "negative_count": [10, 3, 4],
+        "neg_share": [0.67, 0.25, 1.0]
+    })
+    previous = {
+        "week_start": "2025-11-10",
+        "theme_stats": pd.DataFrame({
+            "theme": ["App Performance & Bugs", "Payments & SIP", "Onboarding & KYC"],
+            "review_count": [9, 12, 6],
+            "avg_rating": [2.8, 3.1, 4.0],
+            "negative_count": [4, 6, 1],
+            "neg_share": [0.44, 0.5, 0.17]
+        })
+    }
+
+    diff = theme_diff(current, previous)
+    print("Week-over-week theme diff:")
+    print(diff)
+    print(describe_changes(diff))
@@ -0,0 +1,44 @@
+"""
+Default theme legend shared by the tagging node and app profiles.
+Kept free of heavy imports so configuration code can load it cheaply.
+"""
+
+# Default theme legend (Groww). Order matters: the first theme whose keywords
+# match wins, and the last theme is the catch-all when nothing matches.
+DEFAULT_THEME_KEYWORDS = {
+    "Onboarding & KYC": ["kyc", "onboard", "register"],
+    "Payments & SIP": ["payment", "sip", "transaction"],
+    "Withdrawals & Payouts": ["withdraw", "payout"],
+    "Statements & Reports": ["statement", "report"],
+    "App Performance & Bugs": [],
+}
+
+# Longer descriptions of the default themes, used as prototypes by the local
+# embedding tagger. Custom legends without descriptions fall back to the
+# theme name plus its keywords.
+DEFAULT_THEME_DESCRIPTIONS = {
+    "Onboarding & KYC": (
+        "kyc onboarding onboard register registration sign up signup account opening "
+        "open account verify verification pan aadhaar document documents identity "
+        "selfie e-sign esign activation activate new user"
+    ),
+    "Payments & SIP": (
+        "payment payments pay sip mandate autopay upi transaction transactions "
+        "deducted debit add money deposit invest investment mutual fund purchase "
+        "buy order failed pending"
+    ),
+    "Withdrawals & Payouts": (
+        "withdraw withdrawal withdrawals payout payouts redeem redemption refund "
+        "money not credited bank account transfer settlement sell proceeds delay "
+        "stuck funds"
+    ),
+    "Statements & Reports": (
+        "statement statements report reports tax capital gains p&l profit loss "
+        "contract note ledger holdings download pdf portfolio summary history"
+    ),
+    "App Performance & Bugs": (
+        "app crash crashes crashing slow lag laggy bug bugs glitch freeze freezes "
+        "hang loading load error performance update not working unresponsive "
+        "unstable server down logout interface ui"
+    ),
+}
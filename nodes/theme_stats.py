@@ -4,36 +4,199 @@ Node name: Theme_Stats
 Type: Python Transform
 Input: reviews_week_tagged
 Output: themes_week_stats
+
+For a stratified sample (Sample_Reviews), counts and negative shares are
+estimated for all reviews the sample was drawn from, with confidence
+intervals from the stratified variance (with finite population correction).
+Intervals are Wilson score intervals at the estimate's effective sample
+size, so they stay inside [0, 1] for themes with few or no negative reviews.
 """
 
+from statistics import NormalDist
+
+import numpy as np
 import pandas as pd
 
-def theme_stats(input_df):
+from nodes.review_schema import SENTIMENTS, as_category
+from nodes.time_buckets import bucket_column
+
+CONFIDENCE = 0.95
+
+def theme_stats(input_df, granularity=None, confidence=CONFIDENCE):
     """
     Aggregate statistics by theme.
     
     Args:
         input_df (pandas.DataFrame): DataFrame containing tagged reviews
+        granularity (str): Optional "hour", "day", "week" or "month"; adds a
+            leading <granularity>_start column with one row per bucket and
+            theme (see time_buckets.py)
+        confidence (float): Confidence level of the intervals for sampled input
         
     Returns:
-        pandas.DataFrame: Aggregated theme statistics
+        pandas.DataFrame: Aggregated theme statistics. When input_df has a
+        sample_weight column (from sample_reviews), review_count,
+        negative_count, avg_rating and neg_share are estimates for the whole
+        population, with review_count_low/high, neg_share_low/high and
+        sampled_count columns added
     """
-    df = input_df.copy()
+    # Compare sentiment codes rather than strings; works for tagger output
+    # (already categorical) and plain string columns alike
+    sentiment = as_category(input_df["sentiment"], SENTIMENTS)
+    negative_code = sentiment.categories.get_loc("NEGATIVE")
+
+    df = pd.DataFrame({
+        "theme": input_df["theme"],
+        "has_text": input_df["full_text"].notna(),
+        "rating": input_df["rating"],
+        "is_negative": sentiment.codes == negative_code,
+    })
+    keys = ["theme"]
+    if granularity is not None:
+        column = f"{granularity}_start"
+        df.insert(0, column, bucket_column(input_df, granularity).to_numpy())
+        keys = [column, "theme"]
 
-    agg = df.groupby("theme").agg(
-        review_count=("full_text", "count"),
-        avg_rating=("rating", "mean"),
-        negative_count=("sentiment", lambda s: (s == "NEGATIVE").sum())
-    ).reset_index()
+    if "sample_weight" in input_df.columns:
+        agg = estimate_theme_stats(df, input_df, keys, confidence)
+    else:
+        agg = df.groupby(keys, observed=True).agg(
+            review_count=("has_text", "sum"),
+            avg_rating=("rating", "mean"),
+            negative_count=("is_negative", "sum")
+        ).reset_index()
+    agg["theme"] = agg["theme"].astype(str)
+    agg["review_count"] = agg["review_count"].astype("int64")
+    agg["negative_count"] = agg["negative_count"].astype("int64")
+    agg["avg_rating"] = agg["avg_rating"].astype(float)
 
     agg["avg_rating"] = agg["avg_rating"].round(2)
-    agg["neg_share"] = (agg["negative_count"] / agg["review_count"]).round(2)
+    if "neg_share" not in agg.columns:
+        agg["neg_share"] = (agg["negative_count"] / agg["review_count"]).round(2)
 
-    # Sort: more reviews and more negative first
-    agg = agg.sort_values(["review_count", "neg_share"], ascending=[False, False])
+    # Sort: more reviews and more negative first (within each bucket)
+    buckets = keys[:-1]
+    agg = agg.sort_values(buckets + ["review_count", "neg_share"],
+                          ascending=[True] * len(buckets) + [False, False])
 
     return agg
 
+def wilson_interval(p, n_eff, confidence=CONFIDENCE):
+    """
+    Wilson score interval for proportions p at effective sample sizes n_eff
+    (numpy arrays; an infinite n_eff gives the point itself).
+    """
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    denominator = 1 + z ** 2 / n_eff
+    center = (p + z ** 2 / (2 * n_eff)) / denominator
+    half = z / denominator * np.sqrt(p * (1 - p) / n_eff + z ** 2 / (4 * n_eff ** 2))
+    return np.clip(center - half, 0, 1), np.clip(center + half, 0, 1)
+
+def stratified_variance(frame, value, keys):
+    """
+    Variance of the estimated total of a column per group of keys, summed
+    over the strata the sample was drawn from.
+
+    Args:
+        frame (pandas.DataFrame): Sampled rows with keys, value, stratum and
+            weight columns; value is 0 outside a row's own group
+        value (str): Column whose total is estimated
+        keys (list): Grouping columns
+
+    Returns:
+        pandas.Series: Variance per group
+    """
+    sampled = frame.groupby("stratum").size()
+    weight = frame.groupby("stratum")["weight"].first()
+    # N_h^2 (1 - n_h/N_h) / n_h / (n_h - 1), with N_h = weight * n_h
+    factor = (weight ** 2 * sampled * (1 - 1 / weight) / (sampled - 1)).where(sampled > 1, 0.0)
+
+    sums = frame.assign(squared=frame[value] ** 2).groupby(keys + ["stratum"], observed=True)[[value, "squared"]].sum()
+    strata = sums.index.get_level_values("stratum")
+    within = sums["squared"] - sums[value] ** 2 / sampled.reindex(strata).to_numpy()
+    return (within * factor.reindex(strata).to_numpy()).groupby(level=keys, observed=True).sum()
+
+def effective_size(p, variance, fallback):
+    """
+    Sample size at which a simple random sample would give this variance for
+    proportions p; fallback where the variance is 0.
+    """
+    out = np.broadcast_to(np.asarray(fallback, dtype=float), p.shape).copy()
+    return np.divide(p * (1 - p), variance, out=out, where=variance > 0)
+
+def estimate_theme_stats(df, input_df, keys, confidence=CONFIDENCE):
+    """
+    Population estimates per theme from a stratified sample.
+
+    Each sampled review stands for sample_weight reviews of its stratum (times
+    dup_count when the sample was drawn from dedup representatives). Count
+    intervals come from the theme's share of all reviews; negative share
+    intervals from the linearized variance of negative_count / review_count.
+
+    Args:
+        df (pandas.DataFrame): theme_stats working frame (keys, has_text,
+            rating, is_negative)
+        input_df (pandas.DataFrame): The sampled reviews
+        keys (list): Grouping columns
+        confidence (float): Confidence level of the intervals
+
+    Returns:
+        pandas.DataFrame: keys, review_count, avg_rating, negative_count,
+        neg_share and the interval and sampled_count columns
+    """
+    units = input_df["dup_count"].to_numpy() if "dup_count" in input_df.columns else 1
+    rating = pd.to_numeric(df["rating"], errors="coerce")
+
+    frame = df[keys].copy()
+    frame["stratum"] = input_df["sample_stratum"].to_numpy() if "sample_stratum" in input_df.columns else 0
+    frame["weight"] = input_df["sample_weight"].to_numpy(dtype=float)
+    frame["count"] = df["has_text"].to_numpy() * units
+    frame["negative"] = frame["count"] * df["is_negative"].to_numpy()
+    frame["rated"] = frame["count"] * rating.notna().to_numpy()
+    frame["rating_sum"] = frame["rated"] * rating.fillna(0).to_numpy()
+    frame["sampled"] = frame["count"] > 0
+    for column in ["count", "negative", "rated", "rating_sum"]:
+        frame[f"w_{column}"] = frame[column] * frame["weight"]
+
+    groups = frame.groupby(keys, observed=True)
+    frame["residual"] = np.divide(
+        frame["negative"] - frame["count"] * groups["w_negative"].transform("sum") / groups["w_count"].transform("sum"),
+        groups["w_count"].transform("sum"),
+    ).fillna(0.0)
+    agg = groups[["w_count", "w_negative", "w_rated", "w_rating_sum", "sampled"]].sum()
+    count_variance = stratified_variance(frame, "count", keys).reindex(agg.index).to_numpy()
+    share_variance = stratified_variance(frame, "residual", keys).reindex(agg.index).to_numpy()
+
+    # A variance of 0 means a share of 0 or 1 in the sample, or strata that
+    # were tagged in full; intervals then use the sampled rows, and collapse
+    # to the point when every review was tagged
+    total = frame["w_count"].sum()
+    sampled_fraction = min(len(frame) / max(frame["weight"].sum(), 1.0), 1.0)
+    finite = 1 - sampled_fraction
+    sampled = agg["sampled"].to_numpy()
+
+    theme_share = agg["w_count"].to_numpy() / total if total else np.zeros(len(agg))
+    fallback = len(frame) / finite if finite else np.inf
+    low, high = wilson_interval(theme_share, effective_size(theme_share, count_variance / max(total, 1.0) ** 2, fallback),
+                                confidence)
+    share = np.divide(agg["w_negative"].to_numpy(), agg["w_count"].to_numpy(),
+                      out=np.zeros(len(agg)), where=agg["w_count"].to_numpy() > 0)
+    fallback = sampled / finite if finite else np.inf
+    share_low, share_high = wilson_interval(share, effective_size(share, share_variance, fallback), confidence)
+
+    out = agg.reset_index()[keys]
+    out["review_count"] = np.rint(agg["w_count"].to_numpy()).astype("int64")
+    out["avg_rating"] = np.divide(agg["w_rating_sum"].to_numpy(), agg["w_rated"].to_numpy(),
+                                  out=np.full(len(agg), np.nan), where=agg["w_rated"].to_numpy() > 0)
+    out["negative_count"] = np.rint(agg["w_negative"].to_numpy()).astype("int64")
+    out["neg_share"] = np.round(share, 2)
+    out["review_count_low"] = np.floor(low * total).astype("int64")
+    out["review_count_high"] = np.ceil(high * total).astype("int64")
+    out["neg_share_low"] = np.round(share_low, 2)
+    out["neg_share_high"] = np.round(share_high, 2)
+    out["sampled_count"] = sampled.astype("int64")
+    return out
+
 # Example usage
 if __name__ == "__main__":
     # Sample input data
@@ -66,4 +229,7 @@ if __name__ == "__main__":
     output_df = theme_stats(input_df)
     
     print("Theme statistics:")
-    print(output_df)
\ No newline at end of file
+    print(output_df)
+
+    input_df["date"] = ["2025-11-17", "2025-11-17", "2025-11-18", "2025-11-18", "2025-11-19"]
+    print(theme_stats(input_df, granularity="day"))
\ No newline at end of file
@@ -0,0 +1,126 @@
+"""
+Node helper: Time Buckets
+Used by: Clean_And_Bucket, Filter_Target_Week, Theme_Stats, LLM_Weekly_Pulse,
+Template_Weekly_Pulse
+
+Buckets reviews by hour, day, week (Monday-aligned) or month, so daily
+dashboards, the weekly pulse and monthly reports all start from the same
+cleaned reviews.
+
+Bucket starts are computed by integer flooring of the datetime64[ns] values
+(months by numpy's datetime64[M] cast) and stay typed datetime64 columns such
+as day_start or month_start. Display labels ("2025-11-17", "2025-11",
+"2025-11-17 14:00") are only formatted once per distinct bucket.
+"""
+
+import numpy as np
+import pandas as pd
+
+GRANULARITIES = ("hour", "day", "week", "month")
+
+_HOUR_NS = 3600 * 10**9
+_DAY_NS = 24 * _HOUR_NS
+_STEP_NS = {"hour": _HOUR_NS, "day": _DAY_NS, "week": 7 * _DAY_NS}
+
+# 1970-01-01 was a Thursday; shifting by 3 days makes weeks start on Monday
+_WEEK_OFFSET_NS = 3 * _DAY_NS
+
+LABEL_FORMATS = {"hour": "%Y-%m-%d %H:00", "day": "%Y-%m-%d", "week": "%Y-%m-%d", "month": "%Y-%m"}
+
+# Pulse note title and email subject wording per granularity
+PULSE_NAMES = {"hour": "Hourly", "day": "Daily", "week": "Weekly", "month": "Monthly"}
+
+def check_granularity(granularity):
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of {GRANULARITIES}, got {granularity!r}")
+
+def bucket_starts(dates, granularity="week"):
+    """
+    Start of each date's bucket.
+
+    Args:
+        dates (pandas.Series): datetime64 values (NaT allowed); timezone-aware
+            values are bucketed by their local wall time
+        granularity (str): "hour", "day", "week" or "month"
+
+    Returns:
+        pandas.Series: datetime64[ns] bucket starts named "<granularity>_start"
+    """
+    check_granularity(granularity)
+    if getattr(dates.dt, "tz", None) is not None:
+        dates = dates.dt.tz_localize(None)
+    values = dates.to_numpy(dtype="datetime64[ns]")
+    missing = np.isnat(values)
+
+    if granularity == "month":
+        starts = values.astype("datetime64[M]").astype("datetime64[ns]")
+    else:
+        step = _STEP_NS[granularity]
+        offset = _WEEK_OFFSET_NS if granularity == "week" else 0
+        ints = np.where(missing, 0, values.view("int64")) + offset
+        starts = (ints // step * step - offset).view("datetime64[ns]")
+    starts[missing] = np.datetime64("NaT")
+    return pd.Series(starts, index=dates.index, name=f"{granularity}_start")
+
+def bucket_labels(starts, granularity="week"):
+    """
+    Display labels for bucket starts, as an ordered categorical.
+
+    Args:
+        starts (pandas.Series): Output of bucket_starts
+        granularity (str): Granularity the starts were computed with
+
+    Returns:
+        pandas.Series: Categorical labels in chronological order (NaN for NaT)
+    """
+    check_granularity(granularity)
+    codes, uniques = pd.factorize(starts, sort=True)
+    labels = pd.DatetimeIndex(uniques).strftime(LABEL_FORMATS[granularity])
+    return pd.Series(pd.Categorical.from_codes(codes, categories=labels, ordered=True),
+                     index=starts.index, name=starts.name)
+
+def parse_bucket(bucket, granularity="week"):
+    """
+    Start of the bucket containing a date, e.g. "2025-11" or "2025-11-19" for
+    the month of November 2025.
+
+    Returns:
+        pandas.Timestamp
+    """
+    return bucket_starts(pd.Series([pd.Timestamp(bucket)]), granularity).iloc[0]
+
+def bucket_label(bucket, granularity="week"):
+    """
+    Display label of the bucket containing a date.
+    """
+    return parse_bucket(bucket, granularity).strftime(LABEL_FORMATS[granularity])
+
+def bucket_column(input_df, granularity):
+    """
+    The frame's <granularity>_start column, or the starts computed from its dates.
+    """
+    column = f"{granularity}_start"
+    if column in input_df.columns and pd.api.types.is_datetime64_any_dtype(input_df[column]):
+        return input_df[column]
+    return bucket_starts(pd.to_datetime(input_df["date"], errors="coerce"), granularity)
+
+def pulse_title(app_name, bucket, granularity="week"):
+    """
+    Note title, e.g. "Groww App – Weekly Review Pulse (Week of 2025-11-17)".
+    """
+    check_granularity(granularity)
+    period = f"Week of {bucket}" if granularity == "week" else bucket
+    return f"{app_name} App – {PULSE_NAMES[granularity]} Review Pulse ({period})"
+
+def pulse_subject(bucket, granularity="week"):
+    check_granularity(granularity)
+    return f"{PULSE_NAMES[granularity]} App Review Pulse - {bucket}"
+
+# Example usage
+if __name__ == "__main__":
+    dates = pd.to_datetime(pd.Series(["2025-11-17 09:30", "2025-11-19 23:59", "2025-11-24 00:00", None]))
+    for granularity in GRANULARITIES:
+        starts = bucket_starts(dates, granularity)
+        print(granularity, list(bucket_labels(starts, granularity)))
+    print(parse_bucket("2025-11-19", "week"), bucket_label("2025-11-19", "month"))
+    print(pulse_title("Groww", "2025-11", "month"))
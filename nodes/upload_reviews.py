@@ -14,7 +14,8 @@ def upload_reviews(csv_file_path):
     Upload and parse CSV file containing app reviews.
     
     Args:
-        csv_file_path (str): Path to the CSV file
+        csv_file_path (str): Path to the CSV file (or a .jsonl file with
+            one review object per line)
         
     Returns:
         pandas.DataFrame: DataFrame containing the raw reviews
@@ -22,8 +23,14 @@ def upload_reviews(csv_file_path):
     if not os.path.exists(csv_file_path):
         raise FileNotFoundError(f"CSV file not found: {csv_file_path}")
     
-    # Read CSV file
-    df = pd.read_csv(csv_file_path)
+    # Read CSV file (JSON lines submitted through the API are read as records)
+    if csv_file_path.endswith(".jsonl"):
+        df = pd.read_json(csv_file_path, lines=True, dtype=False)
+    else:
+        df = pd.read_csv(csv_file_path)
+    
+    # Match headers like upload_store's validator and clean_and_bucket do
+    df.columns = df.columns.astype(str).str.strip().str.lower()
     
     # Ensure required columns exist
     required_columns = ["date", "rating", "review_text"]
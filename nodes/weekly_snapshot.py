@@ -0,0 +1,126 @@
+"""
+Node: Store / Load Weekly Snapshot
+Node name: Weekly_Snapshot
+Type: Python – Persist
+Inputs: themes_week_stats, reviews_week_tagged
+Output: snapshots/<app_id>/<week_start>.json
+"""
+
+import json
+import os
+
+import pandas as pd
+
+DEFAULT_SNAPSHOT_DIR = "snapshots"
+
+# How many one-line summaries to keep per theme in a snapshot
+SUMMARIES_PER_THEME = 5
+
+def _file_stem(target_week_start):
+    # Hourly labels ("2025-11-17 14:00") become "2025-11-17T1400"; names
+    # still sort chronologically
+    return target_week_start.replace(" ", "T").replace(":", "")
+
+def snapshot_path(target_week_start, snapshot_dir=DEFAULT_SNAPSHOT_DIR, app_id="groww"):
+    return os.path.join(snapshot_dir, app_id, f"{_file_stem(target_week_start)}.json")
+
+def save_weekly_snapshot(themes_week_stats_df, reviews_week_tagged_df, target_week_start,
+                         snapshot_dir=DEFAULT_SNAPSHOT_DIR, app_id="groww"):
+    """
+    Save this week's theme stats and a few tagged summaries per theme.
+
+    Args:
+        themes_week_stats_df (pandas.DataFrame): Output of theme_stats
+        reviews_week_tagged_df (pandas.DataFrame): Tagged reviews for the week,
+            or a stratified sample of them (sample_weight column), whose
+            total is then estimated like theme_stats does
+        target_week_start (str): Week start date "YYYY-MM-DD"
+        snapshot_dir (str): Root directory for snapshots
+        app_id (str): App the snapshot belongs to
+
+    Returns:
+        str: Path of the written snapshot
+    """
+    summaries = {}
+    if not reviews_week_tagged_df.empty:
+        # Negative reviews first so the stored examples explain the problems
+        ordered = reviews_week_tagged_df.assign(
+            _neg=(reviews_week_tagged_df["sentiment"] == "NEGATIVE")
+        ).sort_values("_neg", ascending=False, kind="stable")
+        for theme, group in ordered.groupby("theme", sort=False, observed=True):
+            summaries[str(theme)] = group["summary_1line"].head(SUMMARIES_PER_THEME).tolist()
+
+    reviews = reviews_week_tagged_df
+    total_reviews = len(reviews)
+    sampled_reviews = None
+    if "sample_weight" in reviews.columns:
+        units = reviews["dup_count"] if "dup_count" in reviews.columns else 1
+        total_reviews = round((reviews["sample_weight"] * units).sum())
+        sampled_reviews = len(reviews)
+
+    snapshot = {
+        "week_start": target_week_start,
+        "total_reviews": int(total_reviews),
+        # Tagged reviews the stats were estimated from; None when all were tagged
+        "sampled_reviews": sampled_reviews,
+        "theme_stats": json.loads(themes_week_stats_df.to_json(orient="records")),
+        "summaries": summaries,
+    }
+
+    path = snapshot_path(target_week_start, snapshot_dir, app_id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+def load_previous_snapshot(target_week_start, snapshot_dir=DEFAULT_SNAPSHOT_DIR, app_id="groww"):
+    """
+    Load the most recent snapshot for a week before target_week_start.
+
+    Args:
+        target_week_start (str): Week start date "YYYY-MM-DD"
+        snapshot_dir (str): Root directory for snapshots
+        app_id (str): App the snapshot belongs to
+
+    Returns:
+        dict or None: Snapshot with a "theme_stats" DataFrame, or None if there is none
+    """
+    app_dir = os.path.join(snapshot_dir, app_id)
+    if not os.path.isdir(app_dir):
+        return None
+
+    # Week starts are ISO dates, so string order is chronological
+    weeks = sorted(
+        name[:-len(".json")] for name in os.listdir(app_dir)
+        if name.endswith(".json") and name[:-len(".json")] < _file_stem(target_week_start)
+    )
+    if not weeks:
+        return None
+
+    with open(os.path.join(app_dir, f"{weeks[-1]}.json"), encoding="utf-8") as f:
+        snapshot = json.load(f)
+    snapshot["theme_stats"] = pd.DataFrame(
+        snapshot["theme_stats"],
+        columns=["theme", "review_count", "avg_rating", "negative_count", "neg_share"]
+    )
+    return snapshot
+
+# Example usage
+if __name__ == "__main__":
+    stats = pd.DataFrame({
+        "theme": ["App Performance & Bugs", "Payments & SIP"],
+        "review_count": [15, 12],
+        "avg_rating": [2.3, 3.8],
+        "negative_count": [10, 3],
+        "neg_share": [0.67, 0.25]
+    })
+    tagged = pd.DataFrame({
+        "theme": ["App Performance & Bugs", "Payments & SIP"],
+        "sentiment": ["NEGATIVE", "MIXED"],
+        "summary_1line": ["App crashes frequently", "Payment process needs improvement"]
+    })
+    path = save_weekly_snapshot(stats, tagged, "2025-11-17")
+    print(f"Saved snapshot to {path}")
+    print(load_previous_snapshot("2025-11-24"))
@@ -0,0 +1,431 @@
+"""
+Record / replay harness for run_app_review_analysis.
+
+"record" runs the pipeline once and stores every transform node's inputs,
+output and run time in a fixture directory. "replay" runs the pipeline (or
+single nodes) again and diffs each node's output against the recording, so
+a faster rewrite of a node can be checked for both speed and equivalence.
+
+    fixtures/<name>/
+        manifest.json         run settings and per-node timings
+        input.csv             the reviews the run was recorded on
+        nodes/NN_<node>.json  args, kwargs and output of each node call
+        nodes/NN_<node>/      DataFrames among them, as parquet files
+
+DataFrames are stored as parquet (pyarrow), so the column types are kept
+explicitly and a recording loads on any pandas version; string and datetime
+columns are read back with the installed pandas' default dtypes. Other
+values are stored as JSON. Use --sample/--seed to record on generated
+reviews that can be regenerated exactly later.
+
+Usage:
+    python pipeline_replay.py record --csv sample_reviews.csv --week 2025-11-17 --out fixtures/golden
+    python pipeline_replay.py record --sample 300 --seed 7 --week 2025-11-17 --out fixtures/golden
+    python pipeline_replay.py replay fixtures/golden                   # whole pipeline (CI check)
+    python pipeline_replay.py replay fixtures/*                        # every recorded fixture
+    python pipeline_replay.py replay fixtures/golden --isolated        # each node on recorded inputs
+    python pipeline_replay.py replay fixtures/golden --node theme_stats --repeat 20
+"""
+
+import argparse
+import importlib
+import json
+import os
+import shutil
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(BASE_DIR)
+
+MANIFEST_FILE = "manifest.json"
+INPUT_FILE = "input.csv"
+
+# Stands in for the fixture's input.csv in recorded node arguments, so a
+# fixture can be moved or shared
+INPUT_PLACEHOLDER = "<fixture input>"
+
+def _is_path(arg, path):
+    return isinstance(arg, str) and arg == path
+
+def _encode(value, fixture_dir, frame_dir, frames):
+    """
+    JSON-able form of a node argument or output. DataFrames are written to
+    parquet files in frame_dir and replaced by {"frame": <relative path>}.
+
+    Raises:
+        TypeError: For values that cannot be recorded
+    """
+    import pandas as pd
+
+    if isinstance(value, pd.DataFrame):
+        filename = os.path.join(frame_dir, f"{len(frames)}.parquet")
+        os.makedirs(os.path.join(fixture_dir, frame_dir), exist_ok=True)
+        value.to_parquet(os.path.join(fixture_dir, filename), engine="pyarrow")
+        frames.append(filename)
+        return {"frame": filename}
+    if isinstance(value, tuple):
+        return {"tuple": [_encode(item, fixture_dir, frame_dir, frames) for item in value]}
+    if isinstance(value, list):
+        return [_encode(item, fixture_dir, frame_dir, frames) for item in value]
+    if isinstance(value, dict) and all(isinstance(key, str) for key in value):
+        return {"dict": {key: _encode(item, fixture_dir, frame_dir, frames) for key, item in value.items()}}
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    raise TypeError(f"Cannot record a {type(value).__name__}")
+
+def _local_frame(df):
+    """
+    A loaded DataFrame with the dtypes that differ between pandas versions
+    (string storage, datetime resolution) converted to this pandas' defaults.
+    """
+    import pandas as pd
+
+    string_dtype = pd.Series(["text"]).dtype
+    datetime_dtype = pd.to_datetime(pd.Series(["2025-11-17"])).dtype
+    for column in df.columns:
+        series = df[column]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            categories = series.cat.categories
+            if categories.dtype != string_dtype and pd.api.types.infer_dtype(categories) == "string":
+                df[column] = series.cat.set_categories(categories.astype(string_dtype))
+        elif pd.api.types.is_datetime64_dtype(series.dtype):
+            if series.dtype != datetime_dtype:
+                df[column] = series.astype(datetime_dtype)
+        elif series.dtype != string_dtype and pd.api.types.infer_dtype(series) == "string":
+            df[column] = series.astype(string_dtype)
+    return df
+
+def _decode(value, fixture_dir):
+    """
+    Inverse of _encode, reading DataFrames back from fixture_dir.
+    """
+    import pandas as pd
+
+    if isinstance(value, list):
+        return [_decode(item, fixture_dir) for item in value]
+    if isinstance(value, dict):
+        if "frame" in value:
+            return _local_frame(pd.read_parquet(os.path.join(fixture_dir, value["frame"]), engine="pyarrow"))
+        if "tuple" in value:
+            return tuple(_decode(item, fixture_dir) for item in value["tuple"])
+        return {key: _decode(item, fixture_dir) for key, item in value["dict"].items()}
+    return value
+
+class NodeRecorder:
+    """
+    node_hook for run_app_review_analysis that times every node and records
+    its inputs and output.
+    """
+
+    def __init__(self, fixture_dir, input_path):
+        self.fixture_dir = fixture_dir
+        self.input_path = input_path
+        self.nodes = []
+        os.makedirs(os.path.join(fixture_dir, "nodes"), exist_ok=True)
+
+    def __call__(self, name, fn, *args, **kwargs):
+        # Inputs are written before the call in case the node mutates them
+        stem = os.path.join("nodes", f"{len(self.nodes):02d}_{name}")
+        frames = []
+        stored_args = [INPUT_PLACEHOLDER if _is_path(arg, self.input_path) else arg for arg in args]
+        recording = {
+            "args": _encode(stored_args, self.fixture_dir, stem, frames),
+            "kwargs": _encode(kwargs, self.fixture_dir, stem, frames),
+        }
+
+        start = time.perf_counter()
+        output = fn(*args, **kwargs)
+        seconds = time.perf_counter() - start
+
+        recording["output"] = _encode(output, self.fixture_dir, stem, frames)
+        filename = stem + ".json"
+        with open(os.path.join(self.fixture_dir, filename), "w", encoding="utf-8") as f:
+            json.dump(recording, f, indent=1)
+        self.nodes.append({
+            "name": name,
+            "module": fn.__module__,
+            "function": fn.__name__,
+            "file": filename,
+            "seconds": round(seconds, 6),
+        })
+        return output
+
+class NodeComparer:
+    """
+    node_hook that times every node and diffs its output against a recording.
+    """
+
+    def __init__(self, fixture_dir, manifest, check_dtypes=True):
+        self.fixture_dir = fixture_dir
+        self.recorded = {node["name"]: node for node in manifest["nodes"]}
+        self.check_dtypes = check_dtypes
+        self.results = []
+
+    def __call__(self, name, fn, *args, **kwargs):
+        start = time.perf_counter()
+        output = fn(*args, **kwargs)
+        seconds = time.perf_counter() - start
+
+        node = self.recorded.get(name)
+        if node is None:
+            differences = ["node was not recorded"]
+        else:
+            expected = load_node(self.fixture_dir, node)["output"]
+            differences = diff_outputs(expected, output, self.check_dtypes)
+        self.results.append(node_result(name, node, seconds, differences))
+        return output
+
+def node_result(name, node, seconds, differences):
+    return {
+        "name": name,
+        "recorded_seconds": node["seconds"] if node else None,
+        "seconds": seconds,
+        "differences": differences,
+    }
+
+def diff_outputs(expected, actual, check_dtypes=True, path="output"):
+    """
+    Describe how a node output differs from the recorded one.
+
+    Args:
+        expected: Recorded output
+        actual: New output
+        check_dtypes (bool): Treat DataFrame dtype changes as differences
+        path (str): Location of the values, used in messages
+
+    Returns:
+        list of str: Differences; empty if the outputs are equivalent
+    """
+    import pandas as pd
+
+    if isinstance(expected, pd.DataFrame) or isinstance(actual, pd.DataFrame):
+        if not (isinstance(expected, pd.DataFrame) and isinstance(actual, pd.DataFrame)):
+            return [f"{path}: {type(expected).__name__} became {type(actual).__name__}"]
+        try:
+            pd.testing.assert_frame_equal(
+                expected, actual, check_dtype=check_dtypes, check_categorical=check_dtypes,
+                check_exact=False, rtol=1e-9,
+            )
+        except AssertionError as e:
+            return [f"{path}: {' '.join(str(e).split())}"]
+        return []
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        differences = []
+        for key in sorted(set(expected) | set(actual), key=str):
+            if key not in actual or key not in expected:
+                differences.append(f"{path}[{key!r}]: only in {'recording' if key in expected else 'replay'}")
+            else:
+                differences.extend(diff_outputs(expected[key], actual[key], check_dtypes, f"{path}[{key!r}]"))
+        return differences
+    if expected != actual:
+        return [f"{path}: {expected!r:.120} became {actual!r:.120}"]
+    return []
+
+def load_manifest(fixture_dir):
+    with open(os.path.join(fixture_dir, MANIFEST_FILE), encoding="utf-8") as f:
+        return json.load(f)
+
+def load_node(fixture_dir, node):
+    """
+    Recorded args, kwargs and output of one node, with the input placeholder
+    pointing at this fixture's input.csv.
+    """
+    with open(os.path.join(fixture_dir, node["file"]), encoding="utf-8") as f:
+        recording = {key: _decode(value, fixture_dir) for key, value in json.load(f).items()}
+    input_path = os.path.join(fixture_dir, INPUT_FILE)
+    recording["args"] = [input_path if _is_path(arg, INPUT_PLACEHOLDER) else arg for arg in recording["args"]]
+    return recording
+
+def write_sample_input(path, count, seed, target_week_start, app_name="Groww"):
+    """
+    Write generated reviews for the 8 weeks up to the end of the target week.
+    The same count, seed and week always give the same file.
+    """
+    import pandas as pd
+    from scrape_playstore_real import generate_sample_reviews
+
+    end_date = datetime.strptime(target_week_start, "%Y-%m-%d") + timedelta(days=6)
+    reviews = generate_sample_reviews(app_name, count, seed=seed, end_date=end_date)
+    pd.DataFrame(reviews)[["date", "rating", "review_text", "review_title"]].to_csv(path, index=False)
+
+def _run_pipeline(input_path, manifest, node_hook):
+    from app_profiles import GROWW_PROFILE
+    from main_pipeline import run_app_review_analysis
+
+    # Side-effect nodes (snapshots, summaries, search index, email) are off so
+    # the run depends only on the recorded input
+    return run_app_review_analysis(
+        input_path, manifest["target_week_start"], None, manifest.get("app_profile") or GROWW_PROFILE,
+        snapshot_dir=None, dedup=manifest.get("dedup", True), summary_db=None, search_db=None,
+        node_hook=node_hook, ingest_source="replay",
+    )
+
+def record_run(fixture_dir, target_week_start, csv_path=None, sample=None, seed=0, app_profile=None, dedup=True,
+               force=False):
+    """
+    Run the pipeline once and record every node into fixture_dir.
+
+    Args:
+        fixture_dir (str): Output directory; an existing fixture there is replaced
+        target_week_start (str): Week start date "YYYY-MM-DD"
+        csv_path (str): Reviews to record on
+        sample (int): Generate this many reviews instead of reading csv_path
+        seed (int): Seed for the generated reviews
+        app_profile (dict): App profile; defaults to Groww
+        dedup (bool): Run with near-duplicate detection
+        force (bool): Also replace a non-empty directory that is not a fixture
+
+    Returns:
+        dict: The manifest
+
+    Raises:
+        ValueError: If fixture_dir is a non-empty directory without a
+            manifest.json and force is not set
+    """
+    if os.path.isdir(fixture_dir):
+        is_fixture = os.path.exists(os.path.join(fixture_dir, MANIFEST_FILE))
+        if not is_fixture and os.listdir(fixture_dir) and not force:
+            raise ValueError(f"{fixture_dir} is not empty and has no {MANIFEST_FILE}; "
+                             f"refusing to replace it (use --force)")
+        shutil.rmtree(fixture_dir)
+    os.makedirs(fixture_dir)
+    input_path = os.path.join(fixture_dir, INPUT_FILE)
+    if sample:
+        write_sample_input(input_path, sample, seed, target_week_start)
+    else:
+        shutil.copyfile(csv_path, input_path)
+
+    manifest = {
+        "recorded_at": datetime.now().isoformat(timespec="seconds"),
+        "source": f"sample:{sample}:seed={seed}" if sample else os.path.basename(csv_path),
+        "target_week_start": target_week_start,
+        "app_profile": app_profile,
+        "dedup": dedup,
+        "python": sys.version.split()[0],
+    }
+    recorder = NodeRecorder(fixture_dir, input_path)
+    _run_pipeline(input_path, manifest, recorder)
+
+    import pandas as pd
+    import pyarrow
+
+    manifest["pandas"] = pd.__version__
+    manifest["pyarrow"] = pyarrow.__version__
+    manifest["nodes"] = recorder.nodes
+    with open(os.path.join(fixture_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+def replay_run(fixture_dir, check_dtypes=True):
+    """
+    Re-run the whole pipeline on the recorded input, diffing each node's output.
+
+    Returns:
+        list of dict: Per-node name, recorded and new run time, differences
+    """
+    manifest = load_manifest(fixture_dir)
+    comparer = NodeComparer(fixture_dir, manifest, check_dtypes)
+    _run_pipeline(os.path.join(fixture_dir, INPUT_FILE), manifest, comparer)
+
+    replayed = {result["name"] for result in comparer.results}
+    missing = [node for node in manifest["nodes"] if node["name"] not in replayed]
+    return comparer.results + [node_result(node["name"], node, None, ["node did not run"]) for node in missing]
+
+def replay_nodes(fixture_dir, names=None, repeat=1, check_dtypes=True):
+    """
+    Run nodes on their recorded inputs, diffing outputs and timing them.
+
+    Args:
+        fixture_dir (str): Recorded fixture
+        names (list of str): Nodes to replay; all recorded nodes if None
+        repeat (int): Runs per node; the median time is reported
+        check_dtypes (bool): Treat DataFrame dtype changes as differences
+
+    Returns:
+        list of dict: Per-node name, recorded and new run time, differences
+    """
+    manifest = load_manifest(fixture_dir)
+    nodes = [node for node in manifest["nodes"] if names is None or node["name"] in names]
+    unknown = set(names or []) - {node["name"] for node in nodes}
+    if unknown:
+        raise ValueError(f"Nodes not in the recording: {sorted(unknown)}")
+
+    results = []
+    for node in nodes:
+        fn = getattr(importlib.import_module(node["module"]), node["function"])
+        times = []
+        for _ in range(max(1, repeat)):
+            # Fresh copies of the inputs each time, in case the node mutates them
+            recording = load_node(fixture_dir, node)
+            start = time.perf_counter()
+            output = fn(*recording["args"], **recording["kwargs"])
+            times.append(time.perf_counter() - start)
+        differences = diff_outputs(recording["output"], output, check_dtypes)
+        results.append(node_result(node["name"], node, statistics.median(times), differences))
+    return results
+
+def print_results(results):
+    print(f"\n{'node':<26} {'recorded':>10} {'replay':>10} {'speedup':>8}  result")
+    for result in results:
+        recorded, seconds = result["recorded_seconds"], result["seconds"]
+        speedup = f"{recorded / seconds:.2f}x" if recorded and seconds else "-"
+        fmt = lambda value: f"{value * 1000:.1f}ms" if value is not None else "-"
+        status = "same" if not result["differences"] else "DIFFERENT"
+        print(f"{result['name']:<26} {fmt(recorded):>10} {fmt(seconds):>10} {speedup:>8}  {status}")
+        for difference in result["differences"]:
+            print(f"    {difference}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Record and replay pipeline runs")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record = commands.add_parser("record", help="Record a pipeline run into a fixture directory")
+    record.add_argument("--out", required=True, help="Fixture directory")
+    record.add_argument("--week", default="2025-11-17", help="Target week start (YYYY-MM-DD)")
+    source = record.add_mutually_exclusive_group(required=True)
+    source.add_argument("--csv", help="Reviews CSV to record on")
+    source.add_argument("--sample", type=int, help="Record on this many generated reviews")
+    record.add_argument("--seed", type=int, default=0, help="Seed for --sample")
+    record.add_argument("--no-dedup", action="store_true", help="Record without near-duplicate detection")
+    record.add_argument("--force", action="store_true",
+                        help="Replace --out even if it is a non-empty directory that is not a fixture")
+
+    replay = commands.add_parser("replay", help="Replay a fixture and diff node outputs")
+    replay.add_argument("fixtures", nargs="+", help="Fixture directories")
+    replay.add_argument("--node", action="append", help="Replay only this node (repeatable)")
+    replay.add_argument("--isolated", action="store_true", help="Run every node on its recorded inputs")
+    replay.add_argument("--repeat", type=int, default=1, help="Runs per node in isolated mode")
+    replay.add_argument("--ignore-dtypes", action="store_true", help="Do not report dtype-only changes")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        try:
+            manifest = record_run(args.out, args.week, args.csv, args.sample, args.seed,
+                                  dedup=not args.no_dedup, force=args.force)
+        except ValueError as e:
+            parser.error(str(e))
+        print(f"\nRecorded {len(manifest['nodes'])} nodes to {args.out}")
+        for node in manifest["nodes"]:
+            print(f"  {node['name']:<26} {node['seconds'] * 1000:>9.1f}ms")
+        return
+
+    failed = []
+    for fixture_dir in args.fixtures:
+        if args.node or args.isolated:
+            results = replay_nodes(fixture_dir, args.node, args.repeat, not args.ignore_dtypes)
+        else:
+            results = replay_run(fixture_dir, not args.ignore_dtypes)
+        print(f"\nReplayed {fixture_dir}")
+        print_results(results)
+        if any(result["differences"] for result in results):
+            failed.append(fixture_dir)
+
+    if failed:
+        print(f"\nOutputs differ in: {', '.join(failed)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
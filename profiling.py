@@ -0,0 +1,235 @@
+"""
+On-demand profiling of pipeline runs and /analyze requests.
+
+    from profiling import profiled
+
+    with profiled("analyze-2025-11-17") as run:
+        run_app_review_analysis(...)
+    print(run.paths)
+
+Two modes:
+
+    sample    (default) a background thread records the profiled thread's
+              Python stack every SAMPLE_INTERVAL seconds. Low overhead, so
+              timings stay close to an unprofiled run. Writes
+              <name>.collapsed (one "frame;frame;frame count" line per stack,
+              the input of flamegraph.pl, speedscope and inferno) and
+              <name>.txt (top-N functions by own and total samples).
+    cprofile  deterministic cProfile of every call. Exact call counts, but
+              adds overhead to call-heavy code (iterrows, apply). Writes
+              <name>.prof (pstats; open with snakeviz or flameprof) and
+              <name>.txt (top-N by own and cumulative time).
+
+Time spent inside C code (read_csv, to_markdown's tabulate, numpy) is
+attributed to the Python function that called it.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+PROFILES_DIR = os.environ.get("PROFILES_DIR", os.path.join(BASE_DIR, "profiles"))
+
+PROFILE_MODES = ("sample", "cprofile")
+
+# Seconds between stack samples
+SAMPLE_INTERVAL = 0.005
+
+# Functions listed in the .txt summary
+TOP_N = 25
+
+class SamplingProfiler:
+    """
+    Samples one thread's Python stack from a background thread.
+    """
+
+    def __init__(self, interval=SAMPLE_INTERVAL, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.stacks = Counter()
+        self._labels = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            filename = code.co_filename
+            if filename.startswith(BASE_DIR + os.sep):
+                filename = os.path.relpath(filename, BASE_DIR)
+            else:
+                # .../site-packages/pandas/core/frame.py -> pandas/core/frame.py
+                parts = re.split(r"[\\/]", filename)
+                packages = [i for i, part in enumerate(parts) if part in ("site-packages", "dist-packages")]
+                filename = "/".join(parts[packages[-1] + 1:] if packages else parts[-2:])
+            # ";" separates frames in the collapsed format
+            label = f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ":")
+            self._labels[code] = label
+        return label
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+
+    def collapsed(self):
+        """
+        Stacks in the collapsed format, root frame first.
+        """
+        return [f"{';'.join(stack)} {count}" for stack, count in sorted(self.stacks.items())]
+
+    def hotspots(self, top=TOP_N):
+        """
+        Functions with the most samples.
+
+        Returns:
+            list of tuple: (function, own samples, total samples), by own samples
+        """
+        own = Counter()
+        total = Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            # A recursive function counts once per sample
+            for label in set(stack):
+                total[label] += count
+        return [(label, own[label], total[label]) for label, _ in own.most_common(top)]
+
+class ProfileRun:
+    """
+    Result of a profiled block; paths is filled in when the block exits.
+    """
+
+    def __init__(self, name, mode, out_dir):
+        self.name = name
+        self.mode = mode
+        self.out_dir = out_dir
+        self.paths = {}
+        self.seconds = None
+
+    def _path(self, suffix):
+        return os.path.join(self.out_dir, f"{self.name}{suffix}")
+
+    def save_samples(self, profiler, top):
+        samples = sum(profiler.stacks.values())
+        lines = [
+            f"{self.name}: {self.seconds:.2f}s wall, {samples} samples every {profiler.interval * 1000:g} ms",
+            "",
+            f"{'own':>7} {'own %':>6} {'total':>7} {'total %':>7}  function",
+        ]
+        for label, own, total in profiler.hotspots(top):
+            lines.append(f"{own:>7} {own / samples:>6.1%} {total:>7} {total / samples:>7.1%}  {label}")
+        if not samples:
+            lines.append("(no samples; the block finished within one interval)")
+        with open(self._path(".collapsed"), "w", encoding="utf-8") as f:
+            f.write("\n".join(profiler.collapsed()) + "\n")
+        with open(self._path(".txt"), "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        self.paths = {"flamegraph": self._path(".collapsed"), "summary": self._path(".txt")}
+
+    def save_cprofile(self, profile, top):
+        profile.dump_stats(self._path(".prof"))
+        out = io.StringIO()
+        out.write(f"{self.name}: {self.seconds:.2f}s wall (cProfile)\n")
+        stats = pstats.Stats(profile, stream=out).strip_dirs()
+        stats.sort_stats("tottime").print_stats(top)
+        stats.sort_stats("cumulative").print_stats(top)
+        with open(self._path(".txt"), "w", encoding="utf-8") as f:
+            f.write(out.getvalue())
+        self.paths = {"flamegraph": self._path(".prof"), "summary": self._path(".txt")}
+
+@contextmanager
+def profiled(name, mode="sample", out_dir=None, top=TOP_N):
+    """
+    Profile the with-block and save its flamegraph and hotspot summary.
+
+    Args:
+        name (str): Label for the run; files are named <name>-<timestamp>.*
+        mode (str): "sample" or "cprofile"
+        out_dir (str): Output directory, PROFILES_DIR by default
+        top (int): Functions listed in the summary
+
+    Yields:
+        ProfileRun: paths ("flamegraph", "summary") are set once the block exits
+    """
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"mode must be one of {PROFILE_MODES}, got {mode!r}")
+    out_dir = out_dir or PROFILES_DIR
+    os.makedirs(out_dir, exist_ok=True)
+    safe_name = re.sub(r"[^A-Za-z0-9_.-]+", "_", name)
+    run = ProfileRun(f"{safe_name}-{datetime.now():%Y%m%d-%H%M%S-%f}", mode, out_dir)
+
+    if mode == "sample":
+        profiler = SamplingProfiler()
+        profiler.start()
+    else:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    start = time.perf_counter()
+    try:
+        yield run
+    finally:
+        run.seconds = time.perf_counter() - start
+        if mode == "sample":
+            profiler.stop()
+            run.save_samples(profiler, top)
+        else:
+            profiler.disable()
+            run.save_cprofile(profiler, top)
+        print(f"Profile of {name} saved to {run.paths['summary']} and {run.paths['flamegraph']}")
+
+def profile_if_requested(name, argv=None):
+    """
+    Context manager for command-line scripts: profiles the block when argv
+    contains --profile (sample mode) or --profile=<mode>, otherwise does nothing.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    for arg in argv:
+        if arg == "--profile":
+            return profiled(name)
+        if arg.startswith("--profile="):
+            return profiled(name, mode=arg.split("=", 1)[1])
+    return nullcontext()
+
+# Example usage
+if __name__ == "__main__":
+    import tempfile
+
+    import pandas as pd
+
+    from nodes.clean_and_bucket import clean_and_bucket
+
+    reviews = pd.DataFrame({
+        "date": ["2025-11-17", "2025-11-18", "2025-11-19"] * 100000,
+        "rating": [5, 1, 3] * 100000,
+        "review_text": ["Great app", "Keeps crashing", "Slow to load"] * 100000,
+    })
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in PROFILE_MODES:
+            with profiled("clean_and_bucket", mode=mode, out_dir=tmp, top=8) as run:
+                clean_and_bucket(reviews)
+            with open(run.paths["summary"], encoding="utf-8") as f:
+                print(f.read())
@@ -0,0 +1,492 @@
+"""
+Streaming ingest: reviews posted to POST /ingest (app.py) are tagged in small
+batches a few seconds after they arrive, so the current week's theme stats
+are always fresh without waiting for run_weekly_job.
+
+    stream_log      durable append log of accepted reviews, one JSON record
+                    per row; rows are pending until a micro-batch tags them
+    stream_reviews  the tagged reviews (clean_and_bucket + tagger output),
+                    keyed by their log id
+    spike_state     each dataset's theme spike detector (spike_detector.py)
+
+Both live in one SQLite database (STREAM_DB, default stream.db), so a batch
+is on disk before /ingest answers, and every gunicorn worker sees the same
+log. Each worker that serves /ingest or /ingest/stats runs a MicroBatcher
+thread. Every BATCH_INTERVAL seconds it claims up to MAX_BATCH_ROWS pending
+rows, cleans, buckets and tags them, and stores the tagged rows and marks the
+log rows done in one transaction. The same transaction feeds the reviews to
+the dataset's spike detector, so its hourly counts cover every worker's
+batches. Alerts are handed to an AlertSender thread, so a slow mail server
+never holds up tagging. Claims of a worker that died expire after
+CLAIM_TIMEOUT, so another worker picks the rows up again.
+
+A dataset named after an app_id in APPS_CONFIG is tagged with that app's
+theme legend and alerts go to its recipients; other datasets (including the
+default "stream") use STREAM_DEFAULT_APP's profile.
+
+The pending rows are the queue, and it is bounded: /ingest refuses a batch
+with 503 (and Retry-After) while more than MAX_PENDING_REVIEWS rows wait to
+be tagged, and with 413 if one request carries more than MAX_INGEST_REVIEWS.
+"""
+
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+
+from metrics import NODE_SECONDS, REVIEWS_INGESTED, REVIEWS_TAGGED, STREAM_LAG_SECONDS, STREAM_REJECTED
+from upload_store import REQUIRED_COLUMNS
+
+DEFAULT_STREAM_DB = os.environ.get(
+    "STREAM_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "stream.db")
+)
+
+# Local backend, so a micro-batch takes milliseconds (see llm_tag_theme_sentiment)
+STREAM_TAGGING_BACKEND = os.environ.get("STREAM_TAGGING_BACKEND", "embedding")
+
+BATCH_INTERVAL = float(os.environ.get("STREAM_BATCH_INTERVAL", 5))
+MAX_BATCH_ROWS = 5000
+
+# Backpressure limits
+MAX_INGEST_REVIEWS = 10000
+MAX_PENDING_REVIEWS = 50000
+
+# Seconds after which another worker may take over a claimed batch
+CLAIM_TIMEOUT = 300
+
+# Seconds to wait for another process's write to finish
+BUSY_TIMEOUT = 30
+
+DEFAULT_DATASET = "stream"
+
+# App whose profile is used for datasets that are not an app_id in APPS_CONFIG
+STREAM_DEFAULT_APP = os.environ.get("STREAM_DEFAULT_APP", "groww")
+
+# Spike alert batches waiting to be emailed; more are dropped (and logged)
+MAX_QUEUED_ALERTS = 100
+
+# Tagged columns kept per review
+STORED_COLUMNS = ["dataset", "week_start", "date", "rating", "source", "theme", "sentiment",
+                  "summary_1line", "full_text", "tagged_by"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS stream_log (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    dataset TEXT NOT NULL,
+    received_at REAL NOT NULL,
+    record TEXT NOT NULL,
+    claimed_by TEXT,
+    claimed_at REAL,
+    done INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS stream_log_pending ON stream_log (done, id);
+CREATE TABLE IF NOT EXISTS stream_reviews (
+    log_id INTEGER PRIMARY KEY,
+    dataset TEXT NOT NULL,
+    week_start TEXT NOT NULL,
+    date TEXT NOT NULL,
+    rating INTEGER,
+    source TEXT,
+    theme TEXT,
+    sentiment TEXT,
+    summary_1line TEXT,
+    full_text TEXT,
+    tagged_by TEXT,
+    tagged_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS stream_reviews_week ON stream_reviews (dataset, week_start);
+CREATE TABLE IF NOT EXISTS spike_state (
+    dataset TEXT PRIMARY KEY,
+    state TEXT NOT NULL
+);
+"""
+
+class IngestRejected(Exception):
+    """
+    Batch refused: invalid (422), too large (413) or the queue is full (503).
+    """
+
+    def __init__(self, message, status=422, retry_after=None):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+        self.retry_after = retry_after
+
+def dataset_profile(dataset):
+    """
+    App profile for a stream dataset: the APPS_CONFIG entry with the dataset
+    as app_id, else STREAM_DEFAULT_APP's entry, else the Groww defaults.
+    """
+    from app_profiles import get_app_profile, make_profile
+
+    return get_app_profile(dataset) or get_app_profile(STREAM_DEFAULT_APP) or make_profile()
+
+def connect(db_path=DEFAULT_STREAM_DB):
+    """
+    Open the stream database, creating its tables on first use.
+    """
+    db_dir = os.path.dirname(db_path)
+    if db_dir:
+        os.makedirs(db_dir, exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+def parse_batch(body):
+    """
+    Parse a JSON lines batch into review records.
+
+    Args:
+        body (bytes): Request body, one review object per line
+
+    Returns:
+        list: Records (dicts with lower-case keys)
+
+    Raises:
+        IngestRejected: Invalid JSON, missing columns or too many reviews
+    """
+    records = []
+    for line_no, line in enumerate(body.decode("utf-8-sig", errors="replace").splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            raise IngestRejected(f"Line {line_no} is not valid JSON")
+        if not isinstance(record, dict):
+            raise IngestRejected(f"Line {line_no} is not a JSON object")
+        record = {str(k).strip().lower(): v for k, v in record.items()}
+        missing = [c for c in REQUIRED_COLUMNS if c not in record]
+        if missing:
+            raise IngestRejected(f"Line {line_no}: missing required columns {missing}")
+        records.append(record)
+        if len(records) > MAX_INGEST_REVIEWS:
+            raise IngestRejected(f"At most {MAX_INGEST_REVIEWS} reviews per request", 413)
+    if not records:
+        raise IngestRejected("Batch is empty")
+    return records
+
+def pending_count(conn):
+    return conn.execute("SELECT COUNT(*) FROM stream_log WHERE done = 0").fetchone()[0]
+
+def append_batch(records, dataset=DEFAULT_DATASET, db_path=DEFAULT_STREAM_DB):
+    """
+    Append reviews to the log, unless too many are already waiting.
+
+    Returns:
+        dict: accepted and pending row counts
+
+    Raises:
+        IngestRejected: The queue is full (503)
+    """
+    conn = connect(db_path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        pending = pending_count(conn)
+        if pending + len(records) > MAX_PENDING_REVIEWS:
+            conn.execute("ROLLBACK")
+            STREAM_REJECTED.inc(reason="backpressure")
+            raise IngestRejected(f"{pending} reviews are waiting to be tagged (limit {MAX_PENDING_REVIEWS}); "
+                                 "retry later", 503, retry_after=int(BATCH_INTERVAL) + 1)
+        now = time.time()
+        conn.executemany(
+            "INSERT INTO stream_log (dataset, received_at, record) VALUES (?, ?, ?)",
+            [(dataset, now, json.dumps(record, ensure_ascii=False)) for record in records],
+        )
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+    REVIEWS_INGESTED.inc(len(records), source="stream")
+    return {"accepted": len(records), "pending": pending + len(records)}
+
+def claim_batch(conn, worker, max_rows=MAX_BATCH_ROWS):
+    """
+    Claim the oldest pending rows nobody is working on.
+
+    Returns:
+        list: sqlite3.Row (id, dataset, received_at, record)
+    """
+    now = time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    rows = conn.execute(
+        "SELECT id, dataset, received_at, record FROM stream_log "
+        "WHERE done = 0 AND (claimed_at IS NULL OR claimed_at < ?) ORDER BY id LIMIT ?",
+        (now - CLAIM_TIMEOUT, max_rows),
+    ).fetchall()
+    conn.executemany("UPDATE stream_log SET claimed_by = ?, claimed_at = ? WHERE id = ?",
+                     [(worker, now, row["id"]) for row in rows])
+    conn.execute("COMMIT")
+    return rows
+
+def tag_batch(rows, backend=STREAM_TAGGING_BACKEND):
+    """
+    Clean, bucket and tag claimed log rows, each dataset with its app's
+    name and theme legend.
+
+    Returns:
+        pandas.DataFrame: Tagged reviews indexed by log id (rows with an
+        unparseable date are dropped)
+    """
+    import pandas as pd
+    from nodes.clean_and_bucket import clean_and_bucket
+    from nodes.llm_tag_theme_sentiment import llm_tag_theme_sentiment
+
+    raw = pd.DataFrame([json.loads(row["record"]) for row in rows], index=[row["id"] for row in rows])
+    raw["dataset"] = [row["dataset"] for row in rows]
+    with NODE_SECONDS.time(node="stream_clean_and_bucket"):
+        clean = clean_and_bucket(raw)
+    if clean.empty:
+        return clean
+    tagged = []
+    with NODE_SECONDS.time(node="stream_tag"):
+        for dataset, reviews in clean.groupby("dataset", sort=False, observed=True):
+            profile = dataset_profile(dataset)
+            tagged.append(llm_tag_theme_sentiment(reviews, profile["app_name"], profile["theme_keywords"],
+                                                  backend=backend))
+    return pd.concat(tagged)
+
+def update_spike_detectors(conn, rows, tagged):
+    """
+    Feed tagged reviews to their dataset's spike detector (spike_detector.py),
+    by arrival time. Call inside the transaction that stores them.
+
+    Returns:
+        list: New alerts, each with its dataset
+    """
+    from spike_detector import SpikeDetector
+
+    received_at = {row["id"]: row["received_at"] for row in rows}
+    alerts = []
+    for dataset, reviews in tagged.groupby("dataset", sort=False):
+        state = conn.execute("SELECT state FROM spike_state WHERE dataset = ?", (dataset,)).fetchone()
+        detector = SpikeDetector.from_state(json.loads(state[0]) if state else None)
+        for alert in detector.observe_frame(reviews, [received_at[log_id] for log_id in reviews.index]):
+            alerts.append(dict(alert, dataset=dataset))
+        conn.execute("INSERT OR REPLACE INTO spike_state (dataset, state) VALUES (?, ?)",
+                     (dataset, json.dumps(detector.to_state())))
+    return alerts
+
+def store_batch(conn, rows, tagged):
+    """
+    Store tagged reviews, update the spike detectors and mark the log rows
+    done, in one transaction.
+
+    Returns:
+        list: Spike alerts raised by the batch
+    """
+    stored = tagged.reindex(columns=STORED_COLUMNS)
+    if not stored.empty:
+        stored["date"] = stored["date"].dt.strftime("%Y-%m-%d")
+        stored["week_start"] = stored["week_start"].astype(str)
+    stored = stored.astype(object)
+    stored = stored.where(stored.notna(), None)
+    now = time.time()
+
+    conn.execute("BEGIN IMMEDIATE")
+    conn.executemany(
+        f"INSERT OR REPLACE INTO stream_reviews (log_id, {', '.join(STORED_COLUMNS)}, tagged_at) "
+        f"VALUES ({', '.join('?' * (len(STORED_COLUMNS) + 2))})",
+        [(int(log_id),) + values + (now,)
+         for log_id, values in zip(stored.index, stored.itertuples(index=False, name=None))],
+    )
+    alerts = update_spike_detectors(conn, rows, tagged) if not tagged.empty else []
+    conn.executemany("UPDATE stream_log SET done = 1 WHERE id = ?", [(row["id"],) for row in rows])
+    conn.execute("COMMIT")
+    return alerts
+
+def process_pending(db_path=DEFAULT_STREAM_DB, max_rows=MAX_BATCH_ROWS, backend=STREAM_TAGGING_BACKEND):
+    """
+    Run micro-batches until no unclaimed rows are pending.
+
+    Returns:
+        int: Log rows processed
+    """
+    worker = f"{os.getpid()}-{threading.get_ident()}"
+    processed = 0
+    conn = connect(db_path)
+    try:
+        while True:
+            rows = claim_batch(conn, worker, max_rows)
+            if not rows:
+                return processed
+            tagged = tag_batch(rows, backend)
+            alerts = store_batch(conn, rows, tagged)
+            now = time.time()
+            for row in rows:
+                STREAM_LAG_SECONDS.observe(now - row["received_at"])
+            if "tagged_by" in tagged.columns:
+                for tagged_by, count in tagged["tagged_by"].value_counts().items():
+                    REVIEWS_TAGGED.inc(int(count), tagged_by=tagged_by)
+            processed += len(rows)
+            print(f"Stream: tagged {len(tagged)} of {len(rows)} reviews")
+            for dataset in dict.fromkeys(alert["dataset"] for alert in alerts):
+                ensure_alert_sender().submit(
+                    [alert for alert in alerts if alert["dataset"] == dataset], dataset_profile(dataset)
+                )
+    finally:
+        conn.close()
+
+def current_week_start(today=None):
+    today = today or date.today()
+    return (today - timedelta(days=today.weekday())).strftime("%Y-%m-%d")
+
+def week_reviews(week_start, dataset=DEFAULT_DATASET, db_path=DEFAULT_STREAM_DB):
+    """
+    Tagged stream reviews of one week.
+
+    Returns:
+        pandas.DataFrame: Same columns as the tagger output used by theme_stats
+    """
+    import pandas as pd
+
+    conn = connect(db_path)
+    try:
+        return pd.read_sql_query(
+            "SELECT log_id, date, week_start, rating, source, theme, sentiment, summary_1line, full_text, tagged_by "
+            "FROM stream_reviews WHERE dataset = ? AND week_start = ? ORDER BY log_id",
+            conn, params=(dataset, week_start),
+        )
+    finally:
+        conn.close()
+
+def week_stats(week_start=None, dataset=DEFAULT_DATASET, db_path=DEFAULT_STREAM_DB):
+    """
+    Theme stats of the tagged stream reviews so far, plus the queue state.
+
+    Returns:
+        dict: week, week_reviews, pending, last_tagged_at and themes_week_stats
+    """
+    from nodes.theme_stats import theme_stats
+
+    week_start = week_start or current_week_start()
+    reviews = week_reviews(week_start, dataset, db_path)
+    conn = connect(db_path)
+    try:
+        pending = pending_count(conn)
+        last_tagged_at = conn.execute(
+            "SELECT MAX(tagged_at) FROM stream_reviews WHERE dataset = ?", (dataset,)
+        ).fetchone()[0]
+    finally:
+        conn.close()
+    return {
+        "week": week_start,
+        "week_reviews": len(reviews),
+        "pending": pending,
+        "last_tagged_at": last_tagged_at,
+        "themes_week_stats": theme_stats(reviews),
+    }
+
+class MicroBatcher:
+    """
+    Background thread that tags pending stream reviews every BATCH_INTERVAL seconds.
+    """
+
+    def __init__(self, db_path=DEFAULT_STREAM_DB, interval=BATCH_INTERVAL, backend=STREAM_TAGGING_BACKEND):
+        self.db_path = db_path
+        self.interval = interval
+        self.backend = backend
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="stream-micro-batch", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self.stopped.set()
+        self.thread.join(timeout)
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                process_pending(self.db_path, backend=self.backend)
+            except Exception as e:
+                # Claimed rows stay pending and are retried after CLAIM_TIMEOUT
+                print(f"Stream micro-batch failed: {e}")
+
+class AlertSender:
+    """
+    Background thread that emails spike alerts queued by the micro-batches.
+    """
+
+    def __init__(self, maxsize=MAX_QUEUED_ALERTS):
+        self.queue = queue.Queue(maxsize)
+        self.thread = threading.Thread(target=self._run, name="stream-alerts", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def submit(self, alerts, profile):
+        """
+        Queue one app's alerts; never blocks the caller.
+        """
+        try:
+            self.queue.put_nowait((alerts, profile))
+        except queue.Full:
+            print(f"Stream: alert queue full, dropping {len(alerts)} spike alerts for {profile['app_id']}")
+
+    def _run(self):
+        from spike_detector import send_spike_alerts
+
+        while True:
+            alerts, profile = self.queue.get()
+            try:
+                send_spike_alerts(alerts, profile["app_name"], profile["recipients"] or None,
+                                  profile["recipients_env"])
+            except Exception as e:
+                print(f"Stream: sending spike alerts failed: {e}")
+            finally:
+                self.queue.task_done()
+
+_batcher = None
+_batcher_pid = None
+_batcher_lock = threading.Lock()
+_alert_sender = None
+_alert_sender_pid = None
+
+def ensure_batcher(db_path=DEFAULT_STREAM_DB):
+    """
+    Start this process's MicroBatcher if it is not running (also in a
+    worker forked after the parent started one).
+    """
+    global _batcher, _batcher_pid
+    with _batcher_lock:
+        if _batcher_pid != os.getpid():
+            _batcher = MicroBatcher(db_path).start()
+            _batcher_pid = os.getpid()
+        return _batcher
+
+def ensure_alert_sender():
+    """
+    This process's AlertSender, started on first use (and again in a forked
+    worker).
+    """
+    global _alert_sender, _alert_sender_pid
+    with _batcher_lock:
+        if _alert_sender_pid != os.getpid():
+            _alert_sender = AlertSender().start()
+            _alert_sender_pid = os.getpid()
+        return _alert_sender
+
+# Example usage
+if __name__ == "__main__":
+    import tempfile
+
+    db_path = os.path.join(tempfile.mkdtemp(), "stream.db")
+    batch = "\n".join(json.dumps(record) for record in [
+        {"date": date.today().isoformat(), "rating": 1, "review_text": "UPI payment failed, money debited"},
+        {"date": date.today().isoformat(), "rating": 5, "review_text": "Smooth app, easy SIP setup"},
+        {"date": "not a date", "rating": 3, "review_text": "Dropped by clean_and_bucket"},
+    ]).encode("utf-8")
+
+    print(append_batch(parse_batch(batch), db_path=db_path))
+    print(f"Processed {process_pending(db_path)} log rows")
+    stats = week_stats(db_path=db_path)
+    print({key: value for key, value in stats.items() if key != "themes_week_stats"})
+    print(stats["themes_week_stats"])
@@ -1,61 +1,127 @@
 import os
 import sys
 from datetime import datetime, timedelta
-import pandas as pd
 
-# Import real scrapers
-from scrape_playstore_real import scrape_playstore_reviews_real, save_reviews_to_csv as save_playstore_csv
-from scrape_trustpilot import scrape_trustpilot_reviews, save_reviews_to_csv as save_trustpilot_csv
-from main_pipeline import run_app_review_analysis
+# Scrapers (google_play_scraper, requests, bs4), pandas and the pipeline are
+# imported inside the functions below only for the sources that are enabled,
+# so short cron invocations don't pay for dependencies they never use.
 
-def main():
-    print("Starting Weekly App Review Job")
-    print("=" * 40)
+def source_enabled(name):
+    """
+    Check whether a review source is enabled via its ENABLE_<NAME> env var.
+    Sources are enabled unless the variable is set to 0/false/no/off.
+    """
+    value = os.getenv(f"ENABLE_{name}", "1").strip().lower()
+    return value not in ("0", "false", "no", "off")
 
-    # 1. Configuration
-    recipient_email = os.getenv("RECIPIENT_EMAIL")
+def enabled_sources(profile):
+    """
+    Sources configured for an app that are not disabled via ENABLE_<NAME>.
+    """
+    return [s for s in profile.get("sources", []) if source_enabled(s.upper())]
+
+def build_email_config(recipients=None, recipients_env=None):
+    """
+    Build the email config from SENDER_* env vars.
+
+    Args:
+        recipients (list): Recipients for this report
+        recipients_env (str): Env var with comma-separated recipients, used
+            only when recipients is empty (e.g. "RECIPIENT_EMAIL")
+
+    Returns:
+        dict or None: Email config, or None if anything is missing
+    """
+    if recipients:
+        recipient_email = ", ".join(recipients)
+    else:
+        recipient_email = os.getenv(recipients_env) if recipients_env else None
     sender_email = os.getenv("SENDER_EMAIL")
     sender_password = os.getenv("SENDER_PASSWORD")
-    
+
     print("Debug: Checking Environment Variables...")
-    print(f"RECIPIENT_EMAIL: {'Found' if recipient_email else 'MISSING'}")
+    print(f"Recipients{f' ({recipients_env})' if not recipients and recipients_env else ''}: "
+          f"{'Found' if recipient_email else 'MISSING'}")
     print(f"SENDER_EMAIL: {'Found' if sender_email else 'MISSING'}")
     print(f"SENDER_PASSWORD: {'Found' if sender_password else 'MISSING'}")
-    
-    email_config = None
+
     if recipient_email and sender_email and sender_password:
-        email_config = {
+        print("✓ Email configuration found. Will send report.")
+        return {
             "recipient_email": recipient_email,
             "sender_email": sender_email,
             "sender_password": sender_password
         }
-        print("✓ Email configuration found. Will send report.")
+
+    print("! Email configuration missing. Will NOT send report.")
+    print("  Set the app's recipients (or RECIPIENT_EMAIL), SENDER_EMAIL, and SENDER_PASSWORD.")
+    return None
+
+def fetch_reviews(profile, session=None):
+    """
+    Fetch reviews for one app from all of its enabled sources.
+
+    Args:
+        profile (dict): App profile (see app_profiles.py)
+        session (requests.Session): Optional HTTP session to reuse for Trustpilot
+
+    Returns:
+        pandas.DataFrame: Combined reviews with a source column. Sources that
+        could not be reached are skipped and listed in df.attrs["failed_sources"]
+    """
+    sources = enabled_sources(profile)
+    failed_sources = []
+
+    from fetch_control import FetchError
+
+    # Fetch Play Store reviews
+    playstore_reviews = []
+    if "playstore" in sources:
+        from scrape_playstore_real import scrape_playstore_reviews_real
+
+        print(f"\n  Fetching Play Store reviews for {profile['app_name']}...")
+        try:
+            # Never report on generated sample reviews: skip the source instead
+            playstore_reviews = scrape_playstore_reviews_real(
+                profile["playstore_id"], count=profile["playstore_count"], app_name=profile["app_name"],
+                fallback_to_sample=False
+            )
+        except FetchError as e:
+            print(f"  ! Play Store unreachable, skipping it this run: {e}")
+            failed_sources.append("playstore")
     else:
-        print("! Email configuration missing. Will NOT send report.")
-        print("  Set RECIPIENT_EMAIL, SENDER_EMAIL, and SENDER_PASSWORD env vars.")
+        print("\n  Play Store source disabled. Skipping.")
 
-    # 2. Scrape/Generate Data from Multiple Sources
-    print("\nStep 1: Fetching reviews from multiple sources...")
-    
-    # 2a. Fetch Play Store reviews
-    print("\n  Fetching Play Store reviews...")
-    playstore_app_id = "com.nextbillion.groww"  # Real Groww app ID
-    playstore_reviews = scrape_playstore_reviews_real(playstore_app_id, count=100)
-    
-    # 2b. Fetch Trustpilot reviews
-    print("\n  Fetching Trustpilot reviews...")
-    trustpilot_url = "https://www.trustpilot.com/review/groww.in"
-    trustpilot_reviews = scrape_trustpilot_reviews(trustpilot_url, max_pages=3)
-    
-    # 2c. Combine reviews from both sources
+    # Fetch Trustpilot reviews
+    trustpilot_reviews = []
+    if "trustpilot" in sources and profile.get("trustpilot_url"):
+        from scrape_trustpilot import scrape_trustpilot_reviews
+
+        print(f"\n  Fetching Trustpilot reviews for {profile['app_name']}...")
+        try:
+            # A partial scrape is dropped too, so the report and the daily
+            # scrape cache never hold an incomplete source
+            trustpilot_reviews = scrape_trustpilot_reviews(
+                profile["trustpilot_url"], max_pages=profile["trustpilot_pages"], session=session,
+                raise_on_error=True
+            )
+        except FetchError as e:
+            print(f"  ! Trustpilot unreachable, skipping it this run: {e}")
+            failed_sources.append("trustpilot")
+    else:
+        print("\n  Trustpilot source disabled. Skipping.")
+
+    import pandas as pd
+
+    # Combine reviews from both sources
     print(f"\n  Combining reviews...")
     print(f"    Play Store: {len(playstore_reviews)} reviews")
     print(f"    Trustpilot: {len(trustpilot_reviews)} reviews")
-    
+
     # Convert to DataFrames and combine
     df_playstore = pd.DataFrame(playstore_reviews)
     df_trustpilot = pd.DataFrame(trustpilot_reviews)
-    
+
     # Ensure both have the same columns
     required_cols = ['date', 'rating', 'review_text', 'review_title']
     for col in required_cols:
@@ -63,34 +129,102 @@ def main():
             df_playstore[col] = ''
         if col not in df_trustpilot.columns:
             df_trustpilot[col] = ''
-    
+
     # Add source column to track where reviews came from
     df_playstore['source'] = 'Play Store'
     df_trustpilot['source'] = 'Trustpilot'
-    
-    # Combine
+
     combined_df = pd.concat([df_playstore, df_trustpilot], ignore_index=True)
-    
+    combined_df.attrs["failed_sources"] = failed_sources
+    return combined_df
+
+def last_completed_week_start(today=None):
+    """
+    Monday of the last completed week.
+    """
+    # We pick a date 7 days ago to ensure we have data, aligned to Monday.
+    today = today or datetime.now()
+    target_date = today - timedelta(days=7)
+    return (target_date - timedelta(days=target_date.weekday())).strftime("%Y-%m-%d")
+
+def last_completed_bucket(granularity="week", now=None):
+    """
+    Label of the last completed hour, day, week or month, e.g. "2025-11" for
+    a monthly run in December 2025.
+    """
+    if granularity == "week":
+        return last_completed_week_start(now)
+    from nodes.time_buckets import bucket_label, check_granularity
+
+    check_granularity(granularity)
+    now = now or datetime.now()
+    if granularity == "month":
+        previous = now.replace(day=1) - timedelta(days=1)
+    else:
+        previous = now - (timedelta(hours=1) if granularity == "hour" else timedelta(days=1))
+    return bucket_label(previous.strftime("%Y-%m-%d %H:%M"), granularity)
+
+def granularity_arg(argv=None):
+    """
+    Report granularity from --granularity=<g> or --granularity <g>, or None.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    for i, arg in enumerate(argv):
+        if arg.startswith("--granularity="):
+            return arg.split("=", 1)[1]
+        if arg == "--granularity" and i + 1 < len(argv):
+            return argv[i + 1]
+    return None
+
+def main():
+    if "--apps" in sys.argv:
+        # Configuration-driven run over a portfolio of apps
+        from multi_app_runner import main as multi_app_main
+        multi_app_main()
+        return
+
+    from app_profiles import make_profile
+
+    # --granularity day|month|hour reports on the last completed bucket instead of the week
+    profile = make_profile({"granularity": granularity_arg() or "week"})
+
+    print("Starting Weekly App Review Job")
+    print("=" * 40)
+
+    # 1. Configuration
+    email_config = build_email_config(profile["recipients"], "RECIPIENT_EMAIL")
+
+    # 2. Scrape/Generate Data from Multiple Sources
+    print("\nStep 1: Fetching reviews from multiple sources...")
+    combined_df = fetch_reviews(profile)
+    if combined_df.empty:
+        print("\n✗ No reviews could be fetched from any source. Not sending a report.")
+        sys.exit(1)
+    if combined_df.attrs["failed_sources"]:
+        print(f"  ! Report will not include: {', '.join(combined_df.attrs['failed_sources'])}")
+
     # Save combined reviews
+    required_cols = ['date', 'rating', 'review_text', 'review_title']
     csv_filename = "combined_reviews.csv"
     combined_df[required_cols].to_csv(csv_filename, index=False)
     print(f"  Total combined reviews: {len(combined_df)}")
     print(f"  Saved to: {csv_filename}")
-    
+
     # 3. Determine Target Week
-    # We want to analyze the last completed week.
-    # We'll pick a date 7 days ago to ensure we have data.
-    today = datetime.now()
-    target_date = today - timedelta(days=7)
-    # Align to Monday
-    target_week_start = (target_date - timedelta(days=target_date.weekday())).strftime("%Y-%m-%d")
-    
-    print(f"\nTarget week start: {target_week_start}")
+    # We want to analyze the last completed week (or hour, day, month).
+    target_week_start = last_completed_bucket(profile["granularity"])
+
+    print(f"\nTarget {profile['granularity']}: {target_week_start}")
 
     # 4. Run Analysis
     print("\nStep 2: Running analysis pipeline...")
+    from main_pipeline import run_app_review_analysis
+    from profiling import profile_if_requested
+
     try:
-        run_app_review_analysis(csv_filename, target_week_start, email_config)
+        # --profile saves a flamegraph and hotspot summary of the run to profiles/
+        with profile_if_requested(f"{profile['app_id']}-{target_week_start}"):
+            run_app_review_analysis(csv_filename, target_week_start, email_config, profile)
         print("\n✓ Job completed successfully.")
     except Exception as e:
         print(f"\n✗ Job failed: {e}")
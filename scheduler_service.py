@@ -0,0 +1,457 @@
+"""
+Long-running scheduler service for review updates.
+
+Replaces the inline `schedule` loop in auto_update_reviews with a service that:
+- persists the last successful run window to a JSON state file,
+- catches up a missed window after a restart or crash,
+- adds per-window jitter so several hosts don't fire at the same second,
+- prevents overlapping runs (across processes) with a file lock,
+- runs scrape / combine / analyze as separate stages, with the scrapers in
+  parallel on a worker pool,
+- records per-stage and per-run durations in the state file (--status) and
+  as histograms on /metrics (metrics.py).
+
+The analyze stage runs the pipeline with an app profile (--app from --apps,
+Groww by default) and writes snapshots, summary rows and the search index to
+the same absolute paths the web app reads (SUMMARY_DB / SEARCH_DB).
+"""
+
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from metrics import SCHEDULER_RUN_SECONDS, SCHEDULER_STAGE_SECONDS
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_STATE_PATH = os.path.join(BASE_DIR, "scheduler_state.json")
+DEFAULT_LOCK_PATH = os.path.join(BASE_DIR, "scheduler.lock")
+
+# Outputs of the analyze stage; the database defaults match app.py's
+DEFAULT_SNAPSHOT_DIR = os.path.join(BASE_DIR, "snapshots")
+DEFAULT_SUMMARY_DB = os.environ.get("SUMMARY_DB", os.path.join(BASE_DIR, "summaries.db"))
+DEFAULT_SEARCH_DB = os.environ.get("SEARCH_DB", os.path.join(BASE_DIR, "review_search.db"))
+
+# How many past runs to keep in the state file for metrics
+RUN_HISTORY_LIMIT = 50
+
+class FileLock:
+    """
+    Non-blocking exclusive lock on a file, held for the duration of a run.
+    Uses fcntl on POSIX and msvcrt on Windows.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._handle = None
+
+    def acquire(self):
+        """
+        Try to take the lock.
+
+        Returns:
+            bool: True if the lock was acquired, False if another process holds it
+        """
+        handle = open(self.path, "a+")
+        try:
+            if os.name == "nt":
+                import msvcrt
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+
+        handle.seek(0)
+        handle.truncate()
+        handle.write(str(os.getpid()))
+        handle.flush()
+        self._handle = handle
+        return True
+
+    def release(self):
+        if self._handle is None:
+            return
+        try:
+            if os.name == "nt":
+                import msvcrt
+                self._handle.seek(0)
+                msvcrt.locking(self._handle.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(self._handle.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._handle.close()
+            self._handle = None
+
+def load_state(path):
+    """
+    Load scheduler state from disk, returning an empty state if missing or corrupt.
+    """
+    if os.path.exists(path):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Warning: could not read scheduler state {path}: {e}")
+    return {"last_success_window": None, "last_attempt_at": None, "last_error": None, "runs": []}
+
+def save_state(path, state):
+    """
+    Atomically write scheduler state to disk.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+class SchedulerService:
+    """
+    Scheduler that runs the review update stages once per window.
+
+    A window is either a daily wall-clock time (`daily_at="02:00"`) or a fixed
+    interval (`interval_minutes=30`). A window is due once the current time
+    passes the window start plus its jitter and it has not yet succeeded.
+    """
+
+    def __init__(self, daily_at="02:00", interval_minutes=None, jitter_seconds=300,
+                 state_path=DEFAULT_STATE_PATH, lock_path=DEFAULT_LOCK_PATH,
+                 scrapers=None, combine_pattern="*reviews*.csv", combined_file="all_reviews.csv",
+                 analyze=True, max_workers=2, retry_seconds=600, poll_seconds=30, app_profile=None,
+                 snapshot_dir=DEFAULT_SNAPSHOT_DIR, summary_db=DEFAULT_SUMMARY_DB, search_db=DEFAULT_SEARCH_DB):
+        self.daily_at = daily_at
+        self.interval_minutes = interval_minutes
+        self.jitter_seconds = jitter_seconds
+        self.state_path = state_path
+        self.lock = FileLock(lock_path)
+        self.scrapers = scrapers if scrapers is not None else ["scrape_playstore.py"]
+        self.combine_pattern = combine_pattern
+        self.combined_file = combined_file
+        self.analyze = analyze
+        self.app_profile = app_profile
+        self.snapshot_dir = snapshot_dir
+        self.summary_db = summary_db
+        self.search_db = search_db
+        self.retry_seconds = retry_seconds
+        self.poll_seconds = poll_seconds
+
+        self.state = load_state(state_path)
+        self._state_lock = threading.Lock()
+        self._scrape_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scrape")
+        self._run_thread = None
+        self._stop = threading.Event()
+
+    # ------------------------------------------------------------------
+    # Window computation
+    # ------------------------------------------------------------------
+
+    def latest_window(self, now):
+        """
+        Start of the most recent scheduled window at or before `now`.
+        """
+        if self.interval_minutes:
+            step = int(self.interval_minutes * 60)
+            epoch = int(now.timestamp())
+            return datetime.fromtimestamp(epoch - epoch % step)
+
+        hour, minute = (int(part) for part in self.daily_at.split(":"))
+        window = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if window > now:
+            window -= timedelta(days=1)
+        return window
+
+    def window_jitter(self, window):
+        """
+        Deterministic jitter for a window, so a restart doesn't reshuffle it.
+        """
+        if not self.jitter_seconds:
+            return 0.0
+        return random.Random(window.isoformat()).uniform(0, self.jitter_seconds)
+
+    def missed_windows(self, now):
+        """
+        Number of windows that passed without a successful run.
+        """
+        last = self.state.get("last_success_window")
+        if not last:
+            return 1
+        last = datetime.fromisoformat(last)
+        latest = self.latest_window(now)
+        if latest <= last:
+            return 0
+        period = timedelta(minutes=self.interval_minutes) if self.interval_minutes else timedelta(days=1)
+        return int((latest - last) / period)
+
+    def due_window(self, now=None):
+        """
+        Return the window that should run now, or None if nothing is due.
+
+        Missed windows are coalesced: after downtime only the most recent one
+        is run, since each run scrapes the latest reviews anyway.
+        """
+        now = now or datetime.now()
+        window = self.latest_window(now)
+
+        last = self.state.get("last_success_window")
+        if last and datetime.fromisoformat(last) >= window:
+            return None
+
+        # A catch-up (window already passed while we were down) runs
+        # immediately; an on-time window waits for its jitter.
+        catching_up = self.missed_windows(now) > 1 or (
+            last is None and now - window > timedelta(seconds=self.jitter_seconds)
+        )
+        if not catching_up and now < window + timedelta(seconds=self.window_jitter(window)):
+            return None
+
+        last_attempt = self.state.get("last_attempt_at")
+        if last_attempt and self.state.get("last_error"):
+            since = now - datetime.fromisoformat(last_attempt)
+            if since < timedelta(seconds=self.retry_seconds):
+                return None
+
+        return window
+
+    # ------------------------------------------------------------------
+    # Stages
+    # ------------------------------------------------------------------
+
+    def _run_script(self, script, *args):
+        result = subprocess.run(
+            [sys.executable, os.path.join(BASE_DIR, script), *args],
+            capture_output=True, text=True, cwd=BASE_DIR
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"{script} failed: {result.stderr.strip()[-1000:]}")
+        return result.stdout
+
+    def stage_scrape(self):
+        # Scrapers are independent, so they run concurrently on the pool
+        futures = [self._scrape_pool.submit(self._run_script, script) for script in self.scrapers]
+        for future in futures:
+            future.result()
+
+    def stage_combine(self):
+        from combine_reviews import combine_review_files
+
+        output_path = os.path.join(BASE_DIR, self.combined_file)
+        combine_review_files(os.path.join(BASE_DIR, self.combine_pattern), output_path)
+        if not os.path.exists(output_path):
+            raise RuntimeError(f"Combine stage produced no {self.combined_file}")
+
+    def stage_analyze(self):
+        from app_profiles import GROWW_PROFILE
+        from main_pipeline import run_app_review_analysis
+        from run_weekly_job import last_completed_bucket
+
+        profile = self.app_profile or GROWW_PROFILE
+        run_app_review_analysis(
+            os.path.join(BASE_DIR, self.combined_file), last_completed_bucket(profile["granularity"]), None,
+            profile, snapshot_dir=self.snapshot_dir, summary_db=self.summary_db, search_db=self.search_db,
+            ingest_source="scheduler",
+        )
+
+    def stages(self):
+        stages = [("scrape", self.stage_scrape), ("combine", self.stage_combine)]
+        if self.analyze:
+            stages.append(("analyze", self.stage_analyze))
+        return stages
+
+    # ------------------------------------------------------------------
+    # Running
+    # ------------------------------------------------------------------
+
+    def run_once(self, window=None):
+        """
+        Run all stages for a window, holding the file lock for the whole run.
+
+        Returns:
+            dict: The run record, or None if another run holds the lock
+        """
+        window = window or self.latest_window(datetime.now())
+        if not self.lock.acquire():
+            print(f"[{datetime.now()}] Another update run is in progress. Skipping window {window}.")
+            return None
+
+        started = time.perf_counter()
+        record = {
+            "window": window.isoformat(),
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "status": "success",
+            "stages": {},
+            "error": None,
+        }
+        print(f"[{datetime.now()}] Starting update run for window {window}")
+        try:
+            for name, stage in self.stages():
+                stage_start = time.perf_counter()
+                status = "failed"
+                try:
+                    stage()
+                    status = "success"
+                finally:
+                    seconds = time.perf_counter() - stage_start
+                    record["stages"][name] = round(seconds, 3)
+                    SCHEDULER_STAGE_SECONDS.observe(seconds, stage=name, status=status)
+                print(f"  Stage {name} finished in {record['stages'][name]}s")
+        except Exception as e:
+            record["status"] = "failed"
+            record["error"] = str(e)
+            print(f"[{datetime.now()}] Update run failed: {e}")
+            traceback.print_exc()
+        finally:
+            record["duration_s"] = round(time.perf_counter() - started, 3)
+            SCHEDULER_RUN_SECONDS.observe(record["duration_s"], status=record["status"])
+            self._record(record, window)
+            self.lock.release()
+
+        print(f"[{datetime.now()}] Update run {record['status']} in {record['duration_s']}s")
+        return record
+
+    def _record(self, record, window):
+        with self._state_lock:
+            self.state["last_attempt_at"] = record["started_at"]
+            if record["status"] == "success":
+                self.state["last_success_window"] = window.isoformat()
+                self.state["last_error"] = None
+            else:
+                self.state["last_error"] = record["error"]
+            self.state["runs"] = (self.state.get("runs", []) + [record])[-RUN_HISTORY_LIMIT:]
+            save_state(self.state_path, self.state)
+
+    def tick(self, now=None):
+        """
+        Start a run in the background if a window is due and none is in flight.
+        """
+        if self._run_thread is not None and self._run_thread.is_alive():
+            return False
+        window = self.due_window(now)
+        if window is None:
+            return False
+        missed = self.missed_windows(now or datetime.now())
+        if missed > 1:
+            print(f"[{datetime.now()}] Catching up: {missed} windows missed, running latest ({window})")
+        self._run_thread = threading.Thread(target=self.run_once, args=(window,), daemon=True)
+        self._run_thread.start()
+        return True
+
+    def run_forever(self):
+        """
+        Poll for due windows until stopped (Ctrl+C).
+        """
+        schedule_desc = (f"every {self.interval_minutes} minutes" if self.interval_minutes
+                         else f"daily at {self.daily_at}")
+        print(f"Scheduler started: updates run {schedule_desc} (jitter up to {self.jitter_seconds}s)")
+        print(f"State file: {self.state_path}")
+        print("Press Ctrl+C to stop")
+        try:
+            while not self._stop.is_set():
+                self.tick()
+                self._stop.wait(self.poll_seconds)
+        except KeyboardInterrupt:
+            print("Stopping scheduler...")
+        finally:
+            if self._run_thread is not None:
+                self._run_thread.join()
+            self._scrape_pool.shutdown(wait=True)
+
+    def stop(self):
+        self._stop.set()
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def metrics(self):
+        """
+        Summarize run and stage durations from the persisted run history.
+
+        Returns:
+            dict: Counts, last/avg/max durations per run and per stage
+        """
+        runs = self.state.get("runs", [])
+
+        def summarize(values):
+            if not values:
+                return {"count": 0, "last": None, "avg": None, "max": None}
+            return {
+                "count": len(values),
+                "last": values[-1],
+                "avg": round(sum(values) / len(values), 3),
+                "max": max(values),
+            }
+
+        stage_names = []
+        for run in runs:
+            for name in run.get("stages", {}):
+                if name not in stage_names:
+                    stage_names.append(name)
+
+        return {
+            "runs_total": len(runs),
+            "runs_failed": sum(1 for run in runs if run.get("status") != "success"),
+            "last_success_window": self.state.get("last_success_window"),
+            "last_error": self.state.get("last_error"),
+            "run_duration_s": summarize([run["duration_s"] for run in runs if "duration_s" in run]),
+            "stage_duration_s": {
+                name: summarize([run["stages"][name] for run in runs if name in run.get("stages", {})])
+                for name in stage_names
+            },
+        }
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Review update scheduler service")
+    parser.add_argument("--daily-at", default="02:00", help="Daily run time (HH:MM)")
+    parser.add_argument("--interval-minutes", type=float, help="Run every N minutes instead of daily")
+    parser.add_argument("--jitter-seconds", type=int, default=300)
+    parser.add_argument("--no-analyze", action="store_true", help="Only scrape and combine")
+    parser.add_argument("--once", action="store_true", help="Run one update now and exit")
+    parser.add_argument("--status", action="store_true", help="Print run metrics and exit")
+    parser.add_argument("--apps", default=os.path.join(BASE_DIR, "apps.json"), help="App config JSON")
+    parser.add_argument("--app", default="groww", help="app_id in --apps whose profile the analyze stage uses")
+    parser.add_argument("--snapshot-dir", default=DEFAULT_SNAPSHOT_DIR)
+    parser.add_argument("--summary-db", default=DEFAULT_SUMMARY_DB)
+    parser.add_argument("--search-db", default=DEFAULT_SEARCH_DB)
+    args = parser.parse_args()
+
+    from app_profiles import GROWW_PROFILE, get_app_profile
+
+    app_profile = get_app_profile(args.app, args.apps)
+    if app_profile is None:
+        if args.app != GROWW_PROFILE["app_id"]:
+            parser.error(f"app '{args.app}' not found in {args.apps}")
+        app_profile = GROWW_PROFILE
+
+    service = SchedulerService(
+        daily_at=args.daily_at,
+        interval_minutes=args.interval_minutes,
+        jitter_seconds=args.jitter_seconds,
+        analyze=not args.no_analyze,
+        app_profile=app_profile,
+        snapshot_dir=args.snapshot_dir,
+        summary_db=args.summary_db,
+        search_db=args.search_db,
+    )
+
+    if args.status:
+        print(json.dumps(service.metrics(), indent=2))
+    elif args.once:
+        record = service.run_once()
+        sys.exit(0 if record and record["status"] == "success" else 1)
+    else:
+        service.run_forever()
+
+if __name__ == "__main__":
+    main()
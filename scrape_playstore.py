@@ -47,13 +47,15 @@ def scrape_playstore_reviews(package_name, max_pages=5):
     
     return sample_reviews
 
-def generate_sample_reviews(app_name, count=50):
+def generate_sample_reviews(app_name, count=50, seed=None, end_date=None):
     """
     Generate sample reviews for demonstration
     
     Args:
         app_name (str): Name of the app
         count (int): Number of reviews to generate
+        seed (int): Random seed; the same seed and end_date give the same reviews
+        end_date (datetime): Last day of the 8-week window; defaults to now
         
     Returns:
         list: List of review dictionaries
@@ -121,26 +123,27 @@ def generate_sample_reviews(app_name, count=50):
     
     # Generate reviews for the past 8 weeks
     reviews = []
-    base_date = datetime.now() - timedelta(weeks=8)
+    base_date = (end_date or datetime.now()) - timedelta(weeks=8)
+    rng = random.Random(seed)
     
     for i in range(count):
         # Randomly select sentiment
-        rand_val = random.random()
+        rand_val = rng.random()
         if rand_val < 0.6:  # 60% positive
-            review_text = random.choice(positive_reviews)
-            review_title = random.choice(positive_titles)
-            rating = random.randint(4, 5)
+            review_text = rng.choice(positive_reviews)
+            review_title = rng.choice(positive_titles)
+            rating = rng.randint(4, 5)
         elif rand_val < 0.8:  # 20% negative
-            review_text = random.choice(negative_reviews)
-            review_title = random.choice(negative_titles)
-            rating = random.randint(1, 2)
+            review_text = rng.choice(negative_reviews)
+            review_title = rng.choice(negative_titles)
+            rating = rng.randint(1, 2)
         else:  # 20% neutral
-            review_text = random.choice(neutral_reviews)
-            review_title = random.choice(neutral_titles)
+            review_text = rng.choice(neutral_reviews)
+            review_title = rng.choice(neutral_titles)
             rating = 3
         
         # Random date within the past 8 weeks
-        days_offset = random.randint(0, 56)  # 8 weeks = 56 days
+        days_offset = rng.randint(0, 56)  # 8 weeks = 56 days
         review_date = base_date + timedelta(days=days_offset)
         
         reviews.append({
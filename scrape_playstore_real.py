@@ -6,14 +6,23 @@ from google_play_scraper import Sort, reviews
 import pandas as pd
 from datetime import datetime, timedelta
 
-def scrape_playstore_reviews_real(app_id, count=100, country='in'):
+from fetch_control import FetchError, get_controller
+from metrics import SCRAPE_SAMPLE_FALLBACKS
+
+def scrape_playstore_reviews_real(app_id, count=100, country='in', app_name='Groww', fallback_to_sample=True):
     """
     Scrape real reviews from Google Play Store using google-play-scraper
     
+    The request goes through the shared rate limiter and is retried with
+    backoff on errors (see fetch_control.py).
+    
     Args:
         app_id (str): Package name of the app (e.g., 'com.nextbillion.groww')
         count (int): Number of reviews to fetch
         country (str): Country code for reviews (default: 'in' for India)
+        app_name (str): App name used for fallback sample data
+        fallback_to_sample (bool): Return sample reviews instead of raising
+            FetchError when the Play Store cannot be reached
         
     Returns:
         list: List of review dictionaries
@@ -23,42 +32,49 @@ def scrape_playstore_reviews_real(app_id, count=100, country='in'):
     
     try:
         # Fetch reviews sorted by newest first
-        result, continuation_token = reviews(
+        result, continuation_token = get_controller().call(
+            reviews,
             app_id,
             lang='en',
             country=country,
             sort=Sort.NEWEST,
-            count=count
+            count=count,
+            source="playstore",
+            host="play.google.com"
         )
-        
-        print(f"Successfully fetched {len(result)} reviews")
-        
-        # Transform to match our pipeline format
-        transformed_reviews = []
-        for review in result:
-            transformed_reviews.append({
-                'review_id': review.get('reviewId', ''),
-                'date': review.get('at', datetime.now()).strftime('%Y-%m-%d'),
-                'rating': review.get('score', 0),
-                'review_title': review.get('userName', 'Anonymous'),  # Play Store doesn't have titles
-                'review_text': review.get('content', '')
-            })
-        
-        return transformed_reviews
-        
-    except Exception as e:
+    except FetchError as e:
         print(f"Error fetching Play Store reviews: {e}")
-        print("Falling back to sample data...")
-        return generate_sample_reviews('Groww', count=50)
+        if not fallback_to_sample:
+            raise
+        print("WARNING: Falling back to SAMPLE data; these Play Store reviews are not real.")
+        SCRAPE_SAMPLE_FALLBACKS.inc(source="playstore")
+        return generate_sample_reviews(app_name, count=50)
+    
+    print(f"Successfully fetched {len(result)} reviews")
+    
+    # Transform to match our pipeline format
+    transformed_reviews = []
+    for review in result:
+        transformed_reviews.append({
+            'review_id': review.get('reviewId', ''),
+            'date': review.get('at', datetime.now()).strftime('%Y-%m-%d'),
+            'rating': review.get('score', 0),
+            'review_title': review.get('userName', 'Anonymous'),  # Play Store doesn't have titles
+            'review_text': review.get('content', '')
+        })
+    
+    return transformed_reviews
 
 
-def generate_sample_reviews(app_name, count=50):
+def generate_sample_reviews(app_name, count=50, seed=None, end_date=None):
     """
     Generate sample reviews for demonstration (fallback)
     
     Args:
         app_name (str): Name of the app
         count (int): Number of reviews to generate
+        seed (int): Random seed; the same seed and end_date give the same reviews
+        end_date (datetime): Last day of the 8-week window; defaults to now
         
     Returns:
         list: List of review dictionaries
@@ -127,26 +143,27 @@ def generate_sample_reviews(app_name, count=50):
     
     # Generate reviews for the past 8 weeks
     reviews = []
-    base_date = datetime.now() - timedelta(weeks=8)
+    base_date = (end_date or datetime.now()) - timedelta(weeks=8)
+    rng = random.Random(seed)
     
     for i in range(count):
         # Randomly select sentiment
-        rand_val = random.random()
+        rand_val = rng.random()
         if rand_val < 0.6:  # 60% positive
-            review_text = random.choice(positive_reviews)
-            review_title = random.choice(positive_titles)
-            rating = random.randint(4, 5)
+            review_text = rng.choice(positive_reviews)
+            review_title = rng.choice(positive_titles)
+            rating = rng.randint(4, 5)
         elif rand_val < 0.8:  # 20% negative
-            review_text = random.choice(negative_reviews)
-            review_title = random.choice(negative_titles)
-            rating = random.randint(1, 2)
+            review_text = rng.choice(negative_reviews)
+            review_title = rng.choice(negative_titles)
+            rating = rng.randint(1, 2)
         else:  # 20% neutral
-            review_text = random.choice(neutral_reviews)
-            review_title = random.choice(neutral_titles)
+            review_text = rng.choice(neutral_reviews)
+            review_title = rng.choice(neutral_titles)
             rating = 3
         
         # Random date within the past 8 weeks
-        days_offset = random.randint(0, 56)  # 8 weeks = 56 days
+        days_offset = rng.randint(0, 56)  # 8 weeks = 56 days
         review_date = base_date + timedelta(days=days_offset)
         
         reviews.append({
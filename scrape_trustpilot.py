@@ -2,25 +2,263 @@
 Script to scrape reviews from Trustpilot and save them as CSV
 """
 
+import json
 import requests
 from bs4 import BeautifulSoup
 import pandas as pd
-import time
-import random
 from urllib.parse import urljoin, urlparse
 import re
 from datetime import datetime
 
-def scrape_trustpilot_reviews(url, max_pages=5):
+from fetch_control import ChallengeError, FetchError, get_controller
+from metrics import SCRAPE_CAPTCHA_STOPS
+
+# Start of the script element holding the page's Next.js data
+NEXT_DATA_MARKER = 'id="__NEXT_DATA__"'
+
+def extract_next_data(html):
+    """
+    Decode the JSON payload Trustpilot embeds in its pages
+    (<script id="__NEXT_DATA__" type="application/json">).
+
+    Finds the script with plain string searches instead of parsing the DOM.
+
+    Args:
+        html (str): Page HTML
+
+    Returns:
+        dict or None: Decoded payload, or None if the page has none
+    """
+    marker = html.find(NEXT_DATA_MARKER)
+    if marker == -1:
+        return None
+    start = html.find('>', marker) + 1
+    end = html.find('</script>', start)
+    if start == 0 or end == -1:
+        return None
+    try:
+        return json.loads(html[start:end])
+    except ValueError:
+        return None
+
+def parse_reviews_next_data(data):
+    """
+    Map the reviews of a decoded __NEXT_DATA__ payload to review dictionaries.
+
+    Args:
+        data (dict): Output of extract_next_data
+
+    Returns:
+        list or None: Review dictionaries (empty past the last page), or None
+        if the payload has no review list
+    """
+    page_props = (data.get('props') or {}).get('pageProps') or {}
+    items = page_props.get('reviews')
+    if not isinstance(items, list):
+        return None
+    
+    reviews = []
+    for i, item in enumerate(items):
+        title = (item.get('title') or '').strip()
+        review_text = (item.get('text') or '').strip()
+        if not (title or review_text):
+            continue
+        dates = item.get('dates') or {}
+        consumer = item.get('consumer') or {}
+        reviews.append({
+            'review_id': item.get('id') or f'unknown_{i}',
+            'date': dates.get('publishedDate') or dates.get('experiencedDate') or '',
+            'rating': int(item.get('rating') or 0),
+            'review_title': title,
+            'review_text': review_text,
+            'full_text': f"{title} - {review_text}" if title else review_text,
+            'reviewer_name': consumer.get('displayName') or 'Anonymous'
+        })
+    return reviews
+
+def parse_review_card(card, i):
+    """
+    Extract one review from a review card element (DOM fallback).
+
+    Args:
+        card (bs4.element.Tag): Review card
+        i (int): Position of the card on the page
+
+    Returns:
+        dict or None: Review dictionary, or None if the card has no content
+    """
+    # Extract review ID
+    review_id = card.get('data-review-id', f'unknown_{i}')
+    if not review_id or review_id == 'unknown_0':
+        # Try alternative ways to get ID
+        review_id = card.get('id', f'unknown_{i}')
+    
+    # Extract rating
+    rating = 0
+    # Look for star rating elements
+    rating_elements = card.find_all(['img', 'div', 'span'], 
+                                   attrs={'alt': re.compile(r'(\d+)\s*out of 5 stars', re.I)})
+    if rating_elements:
+        for elem in rating_elements:
+            alt_text = elem.get('alt', '')
+            rating_match = re.search(r'(\d+)\s*out of 5 stars', alt_text, re.I)
+            if rating_match:
+                rating = int(rating_match.group(1))
+                break
+    
+    # Alternative: look for data-rating attributes
+    if rating == 0:
+        for attr in ['data-rating', 'data-score', 'rating']:
+            rating_attr = card.get(attr)
+            if rating_attr and rating_attr.isdigit():
+                rating = int(rating_attr)
+                break
+    
+    # Extract title
+    title = ''
+    title_elements = card.find_all(['h2', 'h3', 'h4'], 
+                                  attrs={'data-review-title-typography': True})
+    if not title_elements:
+        # Try other common title selectors
+        title_elements = card.find_all(['h2', 'h3', 'h4'], 
+                                     class_=re.compile('.*title.*', re.I))
+    
+    if title_elements:
+        title = title_elements[0].get_text(strip=True)
+    
+    # Extract review text
+    review_text = ''
+    text_elements = card.find_all('p', 
+                                 attrs={'data-review-content-typography': True})
+    if not text_elements:
+        # Try other common text selectors
+        text_elements = card.find_all('p')
+    
+    if text_elements:
+        review_text = text_elements[0].get_text(strip=True)
+    
+    # Extract date
+    date_str = ''
+    date_elements = card.find_all('time')
+    if date_elements:
+        date_str = date_elements[0].get('datetime', 
+                                       date_elements[0].get_text(strip=True))
+    
+    # Extract reviewer name
+    reviewer_name = 'Anonymous'
+    name_elements = card.find_all('span', 
+                                 attrs={'data-consumer-name-typography': True})
+    if not name_elements:
+        name_elements = card.find_all('span', 
+                                    class_=re.compile('.*consumer.*', re.I))
+    
+    if name_elements:
+        reviewer_name = name_elements[0].get_text(strip=True)
+    
+    # Create full review text combining title and content
+    full_text = f"{title} - {review_text}" if title else review_text
+    
+    # Only keep reviews with content
+    if not (full_text.strip() and (title or review_text)):
+        return None
+    return {
+        'review_id': review_id,
+        'date': date_str,
+        'rating': rating,
+        'review_title': title,
+        'review_text': review_text,
+        'full_text': full_text,
+        'reviewer_name': reviewer_name
+    }
+
+def parse_reviews_dom(html, page=1):
+    """
+    Extract reviews by walking the page's review cards; used when the page
+    has no embedded JSON.
+
+    Args:
+        html (str): Page HTML
+        page (int): Page number, for log messages
+
+    Returns:
+        list: Review dictionaries
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    
+    # Find review cards - Trustpilot structure
+    review_cards = soup.find_all('article', {'data-review-id': True})
+    
+    # Alternative selectors if the above doesn't work
+    if not review_cards:
+        review_cards = soup.find_all('div', class_=re.compile('.*reviewCard.*', re.I))
+    
+    if not review_cards:
+        review_cards = soup.find_all('article')
+    
+    if not review_cards:
+        # Print a snippet of the page content for debugging
+        print(f"Page title: {soup.title.string if soup.title else 'No title'}")
+        return []
+    
+    reviews = []
+    for i, card in enumerate(review_cards):
+        try:
+            review = parse_review_card(card, i)
+        except Exception as e:
+            print(f"Error parsing review {i} on page {page}: {e}")
+            continue
+        if review is not None:
+            reviews.append(review)
+    return reviews
+
+def looks_like_challenge(html):
+    """
+    Whether a page is a CAPTCHA / bot challenge instead of a review page.
+    Pages carrying the review payload are never challenges, even when a
+    review mentions either word.
+    """
+    if NEXT_DATA_MARKER in html:
+        return False
+    lowered = html.lower()
+    return 'captcha' in lowered or 'challenge' in lowered
+
+def parse_review_page(html, page=1):
+    """
+    Extract the reviews of one Trustpilot page: from the embedded JSON when
+    the page has it, from the DOM otherwise.
+
+    Args:
+        html (str): Page HTML
+        page (int): Page number, for log messages
+
+    Returns:
+        tuple: (list of review dictionaries, "json" or "dom")
+    """
+    data = extract_next_data(html)
+    if data is not None:
+        reviews = parse_reviews_next_data(data)
+        if reviews is not None:
+            return reviews, 'json'
+    return parse_reviews_dom(html, page), 'dom'
+
+def scrape_trustpilot_reviews(url, max_pages=5, session=None, raise_on_error=False):
     """
     Scrape reviews from Trustpilot website
     
     Args:
         url (str): Trustpilot URL to scrape
         max_pages (int): Maximum number of pages to scrape
+        session (requests.Session): Optional session to reuse, so several
+            scrapes share one connection pool
+        raise_on_error (bool): Raise FetchError when a page cannot be fetched
+            or the first page has no reviews, instead of returning the
+            reviews scraped so far
         
     Returns:
         list: List of review dictionaries
+    
+    Raises:
+        FetchError: Only with raise_on_error
     """
     
     reviews = []
@@ -40,7 +278,8 @@ def scrape_trustpilot_reviews(url, max_pages=5):
     }
     
     # Create a session to persist cookies
-    session = requests.Session()
+    if session is None:
+        session = requests.Session()
     session.headers.update(headers)
     
     # Get base URL for constructing full URLs
@@ -56,134 +295,35 @@ def scrape_trustpilot_reviews(url, max_pages=5):
         page_url = f"{url}?page={page}" if page > 1 else url
         
         try:
-            # Send request with headers to mimic a browser
-            response = session.get(page_url, timeout=10)
-            response.raise_for_status()
-            
-            # Check if we got redirected to a challenge page
-            if 'captcha' in response.text.lower() or 'challenge' in response.text.lower():
-                print("Encountered CAPTCHA or challenge page. Stopping scraping.")
-                break
-            
-            # Parse HTML content
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Find review cards - Trustpilot structure
-            review_cards = soup.find_all('article', {'data-review-id': True})
+            # Rate-limited, retried on 429/5xx; see fetch_control.py
+            response = get_controller().get(session, page_url, source="trustpilot",
+                                            is_challenge=looks_like_challenge)
             
-            # Alternative selectors if the above doesn't work
-            if not review_cards:
-                review_cards = soup.find_all('div', class_=re.compile('.*reviewCard.*', re.I))
-            
-            if not review_cards:
-                review_cards = soup.find_all('article')
-            
-            if not review_cards:
+            page_reviews, parsed_from = parse_review_page(response.text, page)
+            if not page_reviews:
                 print(f"No reviews found on page {page}")
-                # Print a snippet of the page content for debugging
-                print(f"Page title: {soup.title.string if soup.title else 'No title'}")
+                if page == 1 and raise_on_error:
+                    raise FetchError(f"no reviews found on {url}")
                 break
-                
-            print(f"Found {len(review_cards)} review elements on page {page}")
             
-            # Extract data from each review card
-            for i, card in enumerate(review_cards):
-                try:
-                    # Extract review ID
-                    review_id = card.get('data-review-id', f'unknown_{i}')
-                    if not review_id or review_id == 'unknown_0':
-                        # Try alternative ways to get ID
-                        review_id = card.get('id', f'unknown_{i}')
-                    
-                    # Extract rating
-                    rating = 0
-                    # Look for star rating elements
-                    rating_elements = card.find_all(['img', 'div', 'span'], 
-                                                   attrs={'alt': re.compile(r'(\d+)\s*out of 5 stars', re.I)})
-                    if rating_elements:
-                        for elem in rating_elements:
-                            alt_text = elem.get('alt', '')
-                            rating_match = re.search(r'(\d+)\s*out of 5 stars', alt_text, re.I)
-                            if rating_match:
-                                rating = int(rating_match.group(1))
-                                break
-                    
-                    # Alternative: look for data-rating attributes
-                    if rating == 0:
-                        for attr in ['data-rating', 'data-score', 'rating']:
-                            rating_attr = card.get(attr)
-                            if rating_attr and rating_attr.isdigit():
-                                rating = int(rating_attr)
-                                break
-                    
-                    # Extract title
-                    title = ''
-                    title_elements = card.find_all(['h2', 'h3', 'h4'], 
-                                                  attrs={'data-review-title-typography': True})
-                    if not title_elements:
-                        # Try other common title selectors
-                        title_elements = card.find_all(['h2', 'h3', 'h4'], 
-                                                     class_=re.compile('.*title.*', re.I))
-                    
-                    if title_elements:
-                        title = title_elements[0].get_text(strip=True)
-                    
-                    # Extract review text
-                    review_text = ''
-                    text_elements = card.find_all('p', 
-                                                 attrs={'data-review-content-typography': True})
-                    if not text_elements:
-                        # Try other common text selectors
-                        text_elements = card.find_all('p')
-                    
-                    if text_elements:
-                        review_text = text_elements[0].get_text(strip=True)
-                    
-                    # Extract date
-                    date_str = ''
-                    date_elements = card.find_all('time')
-                    if date_elements:
-                        date_str = date_elements[0].get('datetime', 
-                                                       date_elements[0].get_text(strip=True))
-                    
-                    # Extract reviewer name
-                    reviewer_name = 'Anonymous'
-                    name_elements = card.find_all('span', 
-                                                 attrs={'data-consumer-name-typography': True})
-                    if not name_elements:
-                        name_elements = card.find_all('span', 
-                                                    class_=re.compile('.*consumer.*', re.I))
-                    
-                    if name_elements:
-                        reviewer_name = name_elements[0].get_text(strip=True)
-                    
-                    # Create full review text combining title and content
-                    full_text = f"{title} - {review_text}" if title else review_text
-                    
-                    # Only add reviews with content
-                    if full_text.strip() and (title or review_text):
-                        reviews.append({
-                            'review_id': review_id,
-                            'date': date_str,
-                            'rating': rating,
-                            'review_title': title,
-                            'review_text': review_text,
-                            'full_text': full_text,
-                            'reviewer_name': reviewer_name
-                        })
-                        
-                except Exception as e:
-                    print(f"Error parsing review {i} on page {page}: {e}")
-                    continue
+            print(f"Parsed {len(page_reviews)} reviews on page {page} from {parsed_from}")
+            reviews.extend(page_reviews)
             
-            # Add delay to be respectful to the server
-            time.sleep(random.uniform(2, 5))
-            
-        except requests.RequestException as e:
+        except ChallengeError as e:
+            print(f"Encountered CAPTCHA or challenge page. Stopping scraping. ({e})")
+            SCRAPE_CAPTCHA_STOPS.inc(source="trustpilot")
+            if raise_on_error:
+                raise
+            break
+        except (FetchError, requests.RequestException) as e:
             print(f"Error fetching page {page}: {e}")
+            if raise_on_error:
+                raise FetchError(f"page {page}: {e}") from e
             break
         except Exception as e:
             print(f"Unexpected error on page {page}: {e}")
+            if raise_on_error:
+                raise FetchError(f"page {page}: {e}") from e
             break
     
     print(f"Scraped {len(reviews)} reviews in total")
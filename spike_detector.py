@@ -0,0 +1,309 @@
+"""
+Theme spike detection over the review stream (review_stream.py), with alert
+emails sent as soon as a spike shows up instead of in Monday's pulse.
+
+Each theme keeps one counter for the current hour and a baseline of what an
+hour of that theme normally looks like:
+
+- volume: an EWMA level of hourly review counts, scaled by a multiplicative
+  hour-of-day profile (reviews are quieter at night), and an EWMA of how far
+  hours stray from it relative to Poisson noise;
+- negative share: EWMAs of hourly negative and total counts.
+
+observe() adds one review in O(1): it bumps the hour's counts and compares
+them with the baseline. The hour so far is compared with a whole expected
+hour, so a spike is flagged as soon as enough reviews have arrived and never
+because the hour is young. When a review of a later hour arrives, the
+finished hour (and any empty hours in between) is folded into the baseline;
+volume above the alert threshold is capped first, so an outage does not
+become the new normal.
+
+A theme needs WARMUP_HOURS of history before it can alert, and alerts at
+most once per kind per ALERT_COOLDOWN_HOURS. The state is plain JSON, which
+review_stream.py stores next to the log so all web workers share one
+detector per dataset.
+"""
+
+import math
+import os
+
+from metrics import EMAILS_SENT, SPIKE_ALERTS
+
+# Weight of the newest hour in the level / dispersion / negative share EWMAs
+EWMA_ALPHA = 0.05
+# Weight of the newest day in each hour-of-day factor
+SEASONAL_ALPHA = 0.1
+
+# z-scores above which an hour is a spike, and the least evidence needed
+VOLUME_Z = 4.0
+NEG_SHARE_Z = 4.0
+MIN_SPIKE_REVIEWS = 10
+MIN_SPIKE_NEGATIVE = 8
+
+WARMUP_HOURS = 48
+ALERT_COOLDOWN_HOURS = 6
+
+# Empty hours folded in at once after a gap; a longer silence is treated as a week
+MAX_GAP_HOURS = 24 * 7
+
+# Comma-separated alert recipients for callers that pass none; otherwise the
+# recipients_env fallback (RECIPIENT_EMAIL by default) is used
+ALERT_RECIPIENTS = os.environ.get("SPIKE_ALERT_RECIPIENTS", "")
+
+def volume_z(count, expected, sd):
+    """
+    z-score of an hour's count on the square-root scale, where Poisson-like
+    counts are close to normal even when they are small.
+    """
+    root_expected = math.sqrt(max(expected, 1.0))
+    return (math.sqrt(count) - root_expected) * 2 * root_expected / sd
+
+def share_z(negative, count, baseline_share):
+    """
+    z-score of an hour's negative share on the arcsine scale (variance 1/4n),
+    which keeps a handful of negative reviews from looking significant.
+    """
+    observed = math.asin(math.sqrt(negative / count))
+    return (observed - math.asin(math.sqrt(baseline_share))) * 2 * math.sqrt(count)
+
+class ThemeBaseline:
+    """
+    Current-hour counters and baselines of one theme.
+    """
+
+    def __init__(self, hour):
+        self.hour = hour
+        self.count = 0
+        self.negative = 0
+        self.hours = 0
+        self.level = 0.0
+        self.dispersion = 1.0
+        self.count_ewma = 0.0
+        self.negative_ewma = 0.0
+        self.seasonal = [1.0] * 24
+        self.alerted = {}
+
+    def expected(self, hour):
+        """
+        Expected review count and standard deviation for a whole hour.
+        """
+        expected = self.level * self.seasonal[hour % 24]
+        # At least Poisson noise, so quiet themes do not alert on a handful of reviews
+        return expected, math.sqrt(max(self.dispersion, 1.0) * max(expected, 1.0))
+
+    def close_hour(self, count, negative):
+        """
+        Fold a finished hour into the baselines.
+        """
+        slot = self.hour % 24
+        if self.hours == 0:
+            self.level = float(count)
+            self.count_ewma = float(count)
+            self.negative_ewma = float(negative)
+        else:
+            expected, sd = self.expected(self.hour)
+            count = min(count, expected + VOLUME_Z * sd)
+            negative = min(negative, count)
+            self.level += EWMA_ALPHA * (count / self.seasonal[slot] - self.level)
+            # Squared residual relative to Poisson noise; the same scale at night and at peak
+            residual = (count - expected) ** 2 / max(expected, 1.0)
+            self.dispersion += EWMA_ALPHA * (residual - self.dispersion)
+            self.count_ewma += EWMA_ALPHA * (count - self.count_ewma)
+            self.negative_ewma += EWMA_ALPHA * (negative - self.negative_ewma)
+            if self.level > 0:
+                ratio = min(max(count / self.level, 0.2), 5.0)
+                self.seasonal[slot] += SEASONAL_ALPHA * (ratio - self.seasonal[slot])
+        self.hours += 1
+
+    def advance(self, hour):
+        """
+        Move the counters to a later hour, closing the hours in between.
+        """
+        gap = min(hour - self.hour, MAX_GAP_HOURS)
+        self.close_hour(self.count, self.negative)
+        for _ in range(gap - 1):
+            self.hour += 1
+            self.close_hour(0, 0)
+        self.hour, self.count, self.negative = hour, 0, 0
+
+    def neg_share_baseline(self):
+        if self.count_ewma <= 0:
+            return 0.0
+        return min(max(self.negative_ewma / self.count_ewma, 0.01), 0.99)
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+    @classmethod
+    def from_dict(cls, data):
+        baseline = cls(data["hour"])
+        baseline.__dict__.update(data)
+        baseline.alerted = dict(data.get("alerted", {}))
+        return baseline
+
+class SpikeDetector:
+    """
+    Per-theme hourly counters and baselines; observe() returns new alerts.
+    """
+
+    def __init__(self, themes=None):
+        self.themes = themes or {}
+
+    def observe(self, theme, timestamp, negative):
+        """
+        Count one tagged review.
+
+        Args:
+            theme (str): Review theme
+            timestamp (float): Unix time the review arrived (or was written, in a replay)
+            negative (bool): Sentiment is NEGATIVE
+
+        Returns:
+            list: Alert dicts (theme, kind, hour_start, count, expected,
+            negative_count, neg_share, baseline_neg_share, z), usually empty
+        """
+        hour = int(timestamp // 3600)
+        baseline = self.themes.get(theme)
+        if baseline is None:
+            baseline = self.themes[theme] = ThemeBaseline(hour)
+        elif hour > baseline.hour:
+            baseline.advance(hour)
+        # Late reviews count towards the current hour
+
+        baseline.count += 1
+        baseline.negative += int(negative)
+        if baseline.hours < WARMUP_HOURS:
+            return []
+
+        alerts = []
+        expected, sd = baseline.expected(baseline.hour)
+        if baseline.count >= MIN_SPIKE_REVIEWS:
+            z = volume_z(baseline.count, expected, sd)
+            if z >= VOLUME_Z:
+                alerts.append(self._alert(theme, baseline, "volume", z, expected))
+        if baseline.negative >= MIN_SPIKE_NEGATIVE:
+            z = share_z(baseline.negative, baseline.count, baseline.neg_share_baseline())
+            if z >= NEG_SHARE_Z:
+                alerts.append(self._alert(theme, baseline, "negative_share", z, expected))
+        return [alert for alert in alerts if alert is not None]
+
+    def _alert(self, theme, baseline, kind, z, expected):
+        last = baseline.alerted.get(kind)
+        if last is not None and baseline.hour - last < ALERT_COOLDOWN_HOURS:
+            return None
+        baseline.alerted[kind] = baseline.hour
+        SPIKE_ALERTS.inc(kind=kind)
+        return {
+            "theme": theme,
+            "kind": kind,
+            "hour_start": baseline.hour * 3600,
+            "count": baseline.count,
+            "expected": round(expected, 1),
+            "negative_count": baseline.negative,
+            "neg_share": round(baseline.negative / baseline.count, 2),
+            "baseline_neg_share": round(baseline.neg_share_baseline(), 2),
+            "z": round(z, 1),
+        }
+
+    def observe_frame(self, reviews_df, timestamps):
+        """
+        Observe tagged reviews in order.
+
+        Args:
+            reviews_df (pandas.DataFrame): Tagged reviews (theme, sentiment)
+            timestamps: Unix time per review
+
+        Returns:
+            list: Alerts raised
+        """
+        alerts = []
+        negative = (reviews_df["sentiment"].astype(str) == "NEGATIVE").tolist()
+        for theme, timestamp, is_negative in zip(reviews_df["theme"].astype(str), timestamps, negative):
+            alerts.extend(self.observe(theme, timestamp, is_negative))
+        return alerts
+
+    def to_state(self):
+        return {theme: baseline.to_dict() for theme, baseline in self.themes.items()}
+
+    @classmethod
+    def from_state(cls, state):
+        return cls({theme: ThemeBaseline.from_dict(data) for theme, data in (state or {}).items()})
+
+def describe_alert(alert):
+    """
+    One line per alert, e.g. "Payments & SIP: 38 negative of 45 reviews (84%)
+    since 2025-11-19 14:00 UTC, usually 20% negative".
+    """
+    from datetime import datetime, timezone
+
+    since = datetime.fromtimestamp(alert["hour_start"], tz=timezone.utc).strftime("%Y-%m-%d %H:00 UTC")
+    if alert["kind"] == "volume":
+        return (f"{alert['theme']}: {alert['count']} reviews since {since}, "
+                f"about {alert['expected']:g} expected in a normal hour")
+    return (f"{alert['theme']}: {alert['negative_count']} negative of {alert['count']} reviews "
+            f"({alert['neg_share']:.0%}) since {since}, usually {alert['baseline_neg_share']:.0%} negative")
+
+def send_spike_alerts(alerts, app_name="Groww", recipients=None, recipients_env="RECIPIENT_EMAIL"):
+    """
+    Email alerts through the weekly email path (send_weekly_email).
+
+    Args:
+        alerts (list): Alerts from SpikeDetector.observe
+        app_name (str): App name for the subject
+        recipients (list): Recipients, e.g. the app profile's; defaults to
+            SPIKE_ALERT_RECIPIENTS
+        recipients_env (str): Env var with recipients used when there are
+            none (see build_email_config); None sends nothing then
+
+    Returns:
+        bool: True if an email was sent
+    """
+    if not alerts:
+        return False
+    lines = [describe_alert(alert) for alert in alerts]
+    for line in lines:
+        print(f"Spike alert: {line}")
+
+    from nodes.send_weekly_email import send_weekly_email
+    from run_weekly_job import build_email_config
+
+    if recipients is None:
+        recipients = [r.strip() for r in ALERT_RECIPIENTS.split(",") if r.strip()]
+    email_config = build_email_config(recipients, recipients_env)
+    if not email_config:
+        return False
+
+    themes = sorted({alert["theme"] for alert in alerts})
+    subject = f"[Alert] {app_name} review spike: {', '.join(themes)}"
+    body = "\n".join(
+        [f"{app_name} App – Review Spike Alert", ""]
+        + [f"  - {line}" for line in lines]
+        + ["", "Sent by the streaming ingest as soon as the spike was detected; "
+               "the weekly pulse will include these reviews as usual."]
+    )
+    success = send_weekly_email(
+        email_subject=subject,
+        email_body=body,
+        to_email=email_config["recipient_email"],
+        sender_email=email_config["sender_email"],
+        sender_password=email_config["sender_password"],
+    )
+    EMAILS_SENT.inc(outcome="sent" if success else "failed")
+    return success
+
+# Example usage
+if __name__ == "__main__":
+    import random
+
+    rng = random.Random(0)
+    detector = SpikeDetector()
+    start = 1763337600  # 2025-11-17 00:00 UTC
+    alerts = []
+    for hour in range(72):
+        outage = hour >= 70
+        for _ in range(rng.randint(3, 7) + (25 if outage else 0)):
+            timestamp = start + hour * 3600 + rng.uniform(0, 3600)
+            negative = rng.random() < (0.9 if outage else 0.2)
+            alerts.extend(detector.observe("Payments & SIP", timestamp, negative))
+    for alert in alerts:
+        print(describe_alert(alert))
@@ -0,0 +1,239 @@
+"""
+Streaming, validated, content-addressed storage for uploaded review files.
+
+Uploads are written to disk chunk by chunk while their SHA-256 is computed.
+The header and the first sample rows are checked as soon as they arrive, so
+a file with the wrong schema is rejected before the rest of it is read. The
+finished file is stored as uploads/<sha256>.<ext>. Re-uploading identical
+content finds the existing file, and because the file is left untouched the
+cached analysis for it is reused as well.
+
+Used by app.py in two ways:
+- multipart forms, through UploadRequest, which makes werkzeug write file
+  parts into an UploadWriter;
+- raw request bodies posted to the JSON API, through store_stream.
+"""
+
+import csv
+import hashlib
+import io
+import json
+import os
+import tempfile
+
+from flask import Request, current_app
+
+REQUIRED_COLUMNS = ["date", "rating", "review_text"]
+
+# Validation runs once this many rows (or bytes) have arrived
+SAMPLE_ROWS = 20
+SAMPLE_BYTES = 64 * 1024
+
+# Reject when more than this share of sample rows has a bad date or rating
+MAX_BAD_SAMPLE_SHARE = 0.5
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+class UploadRejected(Exception):
+    """
+    Upload failed validation or exceeded the size limit.
+
+    Deliberately not a ValueError: werkzeug's form parser silently swallows
+    ValueErrors, which would turn a rejection into an empty form.
+    """
+
+    def __init__(self, message, status=422):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+def _sample_problems(rows):
+    """
+    Describe sample rows whose date or rating cannot be parsed.
+    """
+    import pandas as pd
+
+    problems = []
+    for line_no, row in rows:
+        rating = pd.to_numeric(row.get("rating"), errors="coerce")
+        if pd.isna(rating) or not 1 <= rating <= 5:
+            problems.append(f"line {line_no}: rating {row.get('rating')!r} is not 1-5")
+        elif pd.isna(pd.to_datetime(row.get("date"), errors="coerce")):
+            problems.append(f"line {line_no}: date {row.get('date')!r} is not a date")
+    return problems
+
+def validate_sample(head, ext, final=False):
+    """
+    Check the header and sample rows at the start of an upload.
+
+    Args:
+        head (bytes): First bytes of the upload
+        ext (str): ".csv" or ".jsonl"
+        final (bool): head is the whole file
+
+    Returns:
+        bool: True once validated, False if more data is needed
+
+    Raises:
+        UploadRejected: Missing columns or mostly unparseable sample rows
+    """
+    # Only complete lines are inspected unless the file has ended
+    text = head.decode("utf-8-sig", errors="replace")
+    if not final:
+        if len(head) < SAMPLE_BYTES and text.count("\n") <= SAMPLE_ROWS:
+            return False
+        text = text[:text.rfind("\n") + 1]
+    lines = text.splitlines()
+
+    if ext == ".jsonl":
+        rows = []
+        for line_no, line in enumerate(lines[:SAMPLE_ROWS], start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                raise UploadRejected(f"Line {line_no} is not valid JSON")
+            if not isinstance(record, dict):
+                raise UploadRejected(f"Line {line_no} is not a JSON object")
+            rows.append((line_no, {str(k).strip().lower(): v for k, v in record.items()}))
+        columns = set(rows[0][1]) if rows else set()
+    else:
+        reader = csv.reader(io.StringIO("\n".join(lines[:SAMPLE_ROWS + 1])))
+        header = [c.strip().lower() for c in next(reader, [])]
+        columns = set(header)
+        rows = [(i, dict(zip(header, values))) for i, values in enumerate(reader, start=2)]
+
+    if not columns:
+        raise UploadRejected("Upload is empty")
+    missing = [c for c in REQUIRED_COLUMNS if c not in columns]
+    if missing:
+        raise UploadRejected(f"Missing required columns: {missing}")
+
+    problems = _sample_problems(rows)
+    if rows and len(problems) > MAX_BAD_SAMPLE_SHARE * len(rows):
+        raise UploadRejected("Sample rows look invalid: " + "; ".join(problems[:3]))
+    return True
+
+class StoredUpload:
+    def __init__(self, dataset_id, path, size, reused):
+        self.dataset_id = dataset_id
+        self.path = path
+        self.size = size
+        self.reused = reused
+
+    @property
+    def filename(self):
+        return os.path.basename(self.path)
+
+class UploadWriter:
+    """
+    Writable file object that hashes, size-checks and validates an upload as
+    it is written to a temporary file in the upload folder.
+    """
+
+    def __init__(self, upload_folder, ext=".csv", max_bytes=None):
+        self.upload_folder = upload_folder
+        self.ext = ext
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.validated = False
+        self._head = bytearray()
+        self._hash = hashlib.sha256()
+        os.makedirs(upload_folder, exist_ok=True)
+        fd, self._tmp_path = tempfile.mkstemp(suffix=".part", dir=upload_folder)
+        self._file = os.fdopen(fd, "w+b")
+
+    def write(self, data):
+        self.size += len(data)
+        if self.max_bytes is not None and self.size > self.max_bytes:
+            self.discard()
+            raise UploadRejected(f"Upload exceeds the {self.max_bytes // (1024 * 1024)} MB limit", 413)
+
+        self._hash.update(data)
+        self._file.write(data)
+        if not self.validated:
+            self._head += data
+            try:
+                self.validated = validate_sample(bytes(self._head), self.ext)
+            except UploadRejected:
+                self.discard()
+                raise
+            if self.validated:
+                self._head = bytearray()
+        return len(data)
+
+    def finish(self):
+        """
+        Validate anything not yet checked and move the file to its content-hash name.
+
+        Returns:
+            StoredUpload
+        """
+        if not self.validated:
+            try:
+                validate_sample(bytes(self._head), self.ext, final=True)
+            except UploadRejected:
+                self.discard()
+                raise
+        self._file.close()
+
+        dataset_id = self._hash.hexdigest()
+        path = os.path.join(self.upload_folder, f"{dataset_id}{self.ext}")
+        reused = os.path.exists(path)
+        if reused:
+            os.remove(self._tmp_path)
+        else:
+            os.replace(self._tmp_path, path)
+        return StoredUpload(dataset_id, path, self.size, reused)
+
+    def discard(self):
+        if not self._file.closed:
+            self._file.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+    def close(self):
+        """
+        Called by werkzeug when the request ends; drops the temp file of an
+        upload that was never finished.
+        """
+        self.discard()
+
+    # werkzeug reads the container back (seek(0)) after writing a file part
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+def upload_extension(filename):
+    return ".jsonl" if filename and filename.lower().endswith(".jsonl") else ".csv"
+
+def store_stream(stream, upload_folder, ext=".csv", max_bytes=None):
+    """
+    Stream a raw request body into the upload store.
+
+    Returns:
+        StoredUpload
+    """
+    writer = UploadWriter(upload_folder, ext, max_bytes)
+    try:
+        while True:
+            chunk = stream.read(STREAM_CHUNK_SIZE)
+            if not chunk:
+                break
+            writer.write(chunk)
+    except Exception:
+        writer.discard()
+        raise
+    return writer.finish()
+
+class UploadRequest(Request):
+    """
+    Request class whose multipart file parts go straight into an UploadWriter.
+    """
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return UploadWriter(
+            current_app.config["UPLOAD_FOLDER"],
+            upload_extension(filename),
+            current_app.config.get("MAX_CONTENT_LENGTH"),
+        )